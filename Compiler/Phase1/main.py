@@ -1,18 +1,18 @@
+import argparse
 from lexer import Lexer   # Import the Lexer class for tokenization.
+from tokenFile import record_tokens   # Import record_tokens to save the tokens for the later phases.
 
 if __name__ == '__main__':
-    # Create an instance of the Lexer class.
-    lexer = Lexer()
-    tokens = [] # List to store tokens.
-
-    # Open the input file and read its content.
-    with open('input.txt', 'r') as input:
-        lines = ''.join(input.readlines())  # Read all lines and join them into a single string.
-        tokens = lexer.tokenize(lines)  # Tokenize the input content.
+    # Optional command line arguments.
+    arguments = argparse.ArgumentParser(description='List the tokens of input.txt in output.txt.')
+    arguments.add_argument('--scanner', choices=Lexer.ENGINES, default='ply',
+                           help='scanner engine of the lexer (default: ply)')
+    arguments.add_argument('--tokens', metavar='FILE',
+                           help='also save the tokens and symbol table in the binary token file FILE')
+    args = arguments.parse_args()
 
-    # Close the input file (On most systems, file is closed at the end of `with` block).
-    input.close()
-    
+    # Create an instance of the Lexer class.
+    lexer = Lexer(engine=args.scanner)
 
     # Open the output file for writing.
     with open('output.txt', 'w') as output:
@@ -21,18 +21,20 @@ if __name__ == '__main__':
             'Mohammad Taha Karbalaee Esmaeili - 40121803' + ' ' * 10 + 'محمد طاها کربلای اسمعیلی - ۴۰۱۲۱۸۰۳\n'
             )
 
-        # Write each token in the formatted output.
+        # Read the input file in chunks and write each token as soon as it is produced.
+        tokens = lexer.tokenize_file('input.txt')
+        if args.tokens:
+            # Save the tokens as they are written, for `--tokens` of the later phases.
+            tokens = record_tokens(args.tokens, tokens, lexer)
         for token in tokens:
             if token.type in ('IDENTIFIER', 'INTEGER_NUMBER', 'REAL_NUMBER'):
-                # For specific tokens, include their value and symbol table index.
+                # For specific tokens, include their value and symbol table index (the token value).
+                lexeme = lexer.lexeme(token)
                 output.write(
-                    str(token.value[0]) + ' ' * (30 - len(str(token.value[0]))) + f'<{token.type}, {token.value[1]}>\n'
+                    lexeme + ' ' * (30 - len(lexeme)) + f'<{token.type}, {token.value}>\n'
                     )
             else:
                 # For other tokens, only include their value and type.
                 output.write(
                     token.value + ' ' * (30 - len(token.value)) + f'<{token.type}, ->\n'
                     )
-    
-    # Close the output file.
-    output.close()
\ No newline at end of file
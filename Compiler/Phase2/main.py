@@ -1,21 +1,22 @@
+import argparse
 from lexer import Lexer     # Import the Lexer class to tokenize the input.
 from parser import Parser   # Import the Parser class to parse the tokenized input.
 
 if __name__ == '__main__':
-    # Create an object of the Parser class to process the input program.
-    parser = Parser()
-
-    # Open the input file and read its content.
-    with open('input.txt', 'r') as input:
-        program = ''.join(input.readlines())  # Read all lines and combine them into a single string.
-    
+    # Optional command line arguments.
+    arguments = argparse.ArgumentParser(description='Parse input.txt and write the applied production rules to output.txt.')
+    arguments.add_argument('--table-cache', metavar='DIR',
+                           help='load precompiled lexer and parser tables from DIR (built on first use)')
+    arguments.add_argument('--scanner', choices=Lexer.ENGINES, default='ply',
+                           help='scanner engine of the lexer (default: ply)')
+    arguments.add_argument('--tokens', metavar='FILE',
+                           help='parse the token file FILE saved by phase 1 (main.py --tokens) instead of lexing input.txt')
+    arguments.add_argument('--histogram', action='store_true',
+                           help='write how many times each rule was applied instead of every applied rule')
+    args = arguments.parse_args()
 
-    # Close the input file (On most systems, file is closed at the end of `with` block).
-    input.close()
-
-    # Parse the program using the `Parser` object.
-    # The `parse` method analyzes the input string and applies the grammar rules.
-    result = parser.parse(program)
+    # Create an object of the Parser class to process the input program.
+    parser = Parser(table_cache=args.table_cache, engine=args.scanner)
 
     # Open the output file for writing.
     with open('output.txt', 'w') as output:
@@ -24,9 +25,15 @@ if __name__ == '__main__':
             'Mohammad Taha Karbalaee Esmaeili - 40121803' + ' ' * 10 + 'محمد طاها کربلای اسمعیلی - ۴۰۱۲۱۸۰۳\n'
             )
 
-        # write each rule and the relevant number on each line.
-        for key, value in parser.Productions.items():
-            output.write(f"{value[0]}{' ' * (10 - len(str(value[0])))}{value[1]}\n")
- 
+        # Write each rule and the relevant number on each line while parsing (or only count them).
+        parser.stream_trace(output, histogram=args.histogram)
+
+        # Parse the program using the `Parser` object.
+        # The `parse_file` method streams tokens from the input file and applies the grammar rules.
+        result = parser.parse_token_file(args.tokens) if args.tokens else parser.parse_file('input.txt')
+
+        # Write the rest of the rules, or their histogram.
+        parser.end_trace()
+
     # Close the output file.
-    output.close()
\ No newline at end of file
+    output.close()
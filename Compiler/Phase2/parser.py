@@ -1,24 +1,89 @@
+import os
+from array import array
+from collections import Counter
 import ply.yacc as yacc
+import tableCache       # Precompiled lexer and parser tables
 from lexer import Lexer # The lexer implemented in phase 1
+from tokenFile import read_token_file   # Tokens saved by phase 1
+
+# Text of each production rule, by rule number (the trace only records the numbers).
+RULES = (
+    None,
+    "start -> program id ; decList funcList block",           # 1
+    "decList -> decs",                                        # 2
+    "decList -> decs decList",                                # 3
+    "decs -> type varList ;",                                 # 4
+    "decs -> ε",                                              # 5
+    "type -> integer",                                        # 6
+    "type -> real",                                           # 7
+    "type -> boolean",                                        # 8
+    "varList -> id",                                          # 9
+    "varList -> varList, id",                                 # 10
+    "funcList -> funcList funcDec",                           # 11
+    "funcList -> ε",                                          # 12
+    "funcDec -> function id parameters : type decList block", # 13
+    "parameters -> ( decList )",                              # 14
+    "block -> begin stmtList end",                            # 15
+    "stmtList -> stmt",                                       # 16
+    "stmtList -> stmtList stmt",                              # 17
+    "stmt -> id := expr ;",                                   # 18
+    "stmt -> if expr then stmt",                              # 19
+    "stmt -> if expr then stmt else stmt",                    # 20
+    "stmt -> while expr do stmt",                             # 21
+    "stmt -> for id := expr to expr do stmt",                 # 22
+    "stmt -> return expr ;",                                  # 23
+    "stmt -> block",                                          # 24
+    "expr -> expr and expr",                                  # 25
+    "expr -> expr or expr",                                   # 26
+    "expr -> expr * expr",                                    # 27
+    "expr -> expr / expr",                                    # 28
+    "expr -> expr + expr",                                    # 29
+    "expr -> expr - expr",                                    # 30
+    "expr -> expr relop expr",                                # 31
+    "expr -> ( expr )",                                       # 32
+    "expr -> integerNumber",                                  # 33
+    "expr -> realNumber",                                     # 34
+    "expr -> true",                                           # 35
+    "expr -> false",                                          # 36
+    "expr -> id ( actualparamlist )",                         # 37
+    "expr -> id",                                             # 38
+    "actualparamlist -> expr",                                # 39
+    "actualparamlist -> actualparamlist, expr",               # 40
+    "actualparamlist -> id",                                  # 41
+    "actualparamlist -> ε",                                   # 42
+    "relop -> <",                                             # 43
+    "relop -> <=",                                            # 44
+    "relop -> =",                                             # 45
+    "relop -> <>",                                            # 46
+    "relop -> >=",                                            # 47
+    "relop -> >",                                             # 48
+)
+
+# Line of the trace written for each rule: its number padded to 10 columns, then its text.
+TRACE_LINES = (None,) + tuple(f"{number:<10}{text}\n" for number, text in enumerate(RULES) if text)
+
+TRACE_CHUNK = 1 << 14   # Rules recorded before a streamed trace is written out.
+
 
 class Parser:
     """
     A parser implementation using PLY (Python Lex-Yacc) for a predefined grammar.
     This parser processes tokens generated by the Lexer class, checks the input against
-    the grammar rules, and returns the list of applied production rules.
+    the grammar rules, and records the numbers of the applied production rules (see `RULES`).
 
 
     Attributes:
         tokens (list): List of tokens imported from the Lexer.
-        Productions (dict): Stores production rules with their rule numbers and definitions.
-        rule_count (int): Counter for production rule numbers.
+        trace (array): Numbers of the production rules applied, in order, since the
+            trace was last written out.
+        output (file): Text file the trace is streamed to, or None to keep it all in `trace`.
+        histogram (Counter): Number of applications of each rule when only a histogram
+            of the trace is kept, None otherwise.
         precedence (tuple): Operator precedence and associativity rules for the grammar.
     """
 
 
     tokens = Lexer.tokens  # Import token definitions from the Lexer.
-    Productions = {}       # Stores production rules and their corresponding definitions.
-    rule_count = 1         # Rule counter for numbering productions.
 
     # Operator precedence and associativity rules.
     precedence = (
@@ -29,219 +94,284 @@ class Parser:
         ('left', 'OR_KW')   # Logical OR.
     )
 
-    def __init__(self):
+    def __init__(self, table_cache=None, engine='ply'):
         """
         Initializes the Parser.
         - Creates a Lexer instance for tokenizing input.
         - Builds the parser using PLY's yacc module.
+
+        Args:
+            table_cache (str, optional): Root directory of a table cache. When given,
+                the lexer and LALR tables are loaded from a directory keyed by the
+                grammar hash (built on first use) and no parsetab.py or parser.out
+                is written. Raises `tableCache.StaleTableError` on stale tables.
+            engine (str, optional): Scanner engine of the lexer ('ply', 'regex' or 'mmap',
+                see `Lexer`).
         """
-        self.lexer = Lexer()
-        self.parser = yacc.yacc(module=self, debug=False)
+        self.trace = array('H')
+        self.output = None
+        self.histogram = None
+        if table_cache is None:
+            self.lexer = Lexer(engine=engine)
+            self.parser = yacc.yacc(module=self, debug=False)
+            return
+
+        directory = tableCache.cache_dir(table_cache, Lexer, self)
+        if os.path.isdir(directory):
+            self.lexer = Lexer(lextab=tableCache.load_lextab(directory, Lexer.tokens), engine=engine)
+        else:
+            # The lexer compiled from its rules is kept once its tables are written.
+            self.lexer = Lexer(engine=engine)
+            tableCache.build(self.lexer, self, directory)
+        self.parser = tableCache.load_parser(self, directory)
     
 
-    def log_productions(self, rule_no, production):
+    def log_productions(self, rule_no):
+        """
+        Records the application of a production rule, writing the trace out once
+        TRACE_CHUNK rules are recorded when it is streamed.
+
+        Args:
+            rule_no (int): Rule number (an index in `RULES`).
+        """
+        trace = self.trace
+        trace.append(rule_no)
+        if len(trace) >= TRACE_CHUNK and self.output is not None:
+            self.flush_trace()
+
+    def stream_trace(self, output, histogram=False):
         """
-        Logs a production rule for debugging and analysis purposes.
+        Streams the trace of the following parses to a text file, one line per
+        applied rule (its number and its text), in chunks of TRACE_CHUNK rules.
 
         Args:
-            rule_no (int): Rule number.
-            production (str): The production rule as a string.
+            output (file): Text file to write to.
+            histogram (bool, optional): Only count the applications of each rule, and
+                write their histogram in `end_trace` instead of the trace.
+        """
+        self.output = output
+        self.histogram = Counter() if histogram else None
+        del self.trace[:]
+
+    def flush_trace(self):
+        """
+        Writes out (or counts, for a histogram) the rules recorded so far and empties the
+        trace. Without a streamed trace, the rules are kept in `trace`.
+        """
+        if self.output is None:
+            return
+        if self.histogram is not None:
+            self.histogram.update(self.trace)
+        else:
+            self.output.write(''.join(map(TRACE_LINES.__getitem__, self.trace)))
+        del self.trace[:]
+
+    def end_trace(self):
+        """
+        Writes out the rest of a streamed trace, or the histogram of the rules: the
+        number and text of each applied rule with its count, by rule number. Does
+        nothing when the trace is not streamed.
         """
-        self.Productions[self.rule_count] = (rule_no, production)
-        self.rule_count += 1
+        if self.output is None:
+            return
+        self.flush_trace()
+        if self.histogram is not None:
+            for rule_no, count in sorted(self.histogram.items()):
+                self.output.write(f"{rule_no:<10}{count:<10}{RULES[rule_no]}\n")
+        self.output = self.histogram = None
 
     # Grammar rules start here. Each rule is defined as a method with a docstring.
     def p_start(self, p):
         '''start : PROGRAM_KW IDENTIFIER SEMICOLON decList funcList block'''
-        self.log_productions(1, "start -> program id ; decList funcList block")
+        self.log_productions(1)
 
     def p_decList_1(self, p):
         '''decList : decs'''
-        self.log_productions(2, "decList -> decs")
+        self.log_productions(2)
 
     def p_decList_2(self, p):
         '''decList : decs decList'''
-        self.log_productions(3, "decList -> decs decList")
+        self.log_productions(3)
 
     def p_decs_1(self, p):
         '''decs : type varList SEMICOLON'''
-        self.log_productions(4, "decs -> type varList ;")
+        self.log_productions(4)
 
     def p_decs_2(self, p):
         '''decs : empty'''
-        self.log_productions(5, "decs -> ε")
+        self.log_productions(5)
 
     def p_type_1(self, p):
         '''type : INTEGER_KW'''
-        self.log_productions(6, "type -> integer")
+        self.log_productions(6)
 
     def p_type_2(self, p):
         '''type : REAL_KW'''
-        self.log_productions(7, "type -> real")
+        self.log_productions(7)
 
     def p_type_3(self, p):
         '''type : BOOLEAN_KW'''
-        self.log_productions(8, "type -> boolean")
+        self.log_productions(8)
 
     def p_varList_1(self, p):
         '''varList : IDENTIFIER'''
-        self.log_productions(9, "varList -> id")
+        self.log_productions(9)
 
     def p_varList_2(self, p):
         '''varList : varList COMMA IDENTIFIER'''
-        self.log_productions(10, "varList -> varList, id")
+        self.log_productions(10)
 
     def p_funcList_1(self, p):
         '''funcList : funcList funcDec'''
-        self.log_productions(11, "funcList -> funcList funcDec")
+        self.log_productions(11)
 
     def p_funcList_2(self, p):
         '''funcList : empty'''
-        self.log_productions(12, "funcList -> ε")
+        self.log_productions(12)
 
     def p_funcDec(self, p):
         '''funcDec : FUNCTION_KW IDENTIFIER parameters COLON type decList block'''
-        self.log_productions(13, "funcDec -> function id parameters : type decList block")
+        self.log_productions(13)
 
     def p_parameters(self, p):
         '''parameters : LEFT_PA decList RIGHT_PA'''
-        self.log_productions(14, "parameters -> ( decList )")
+        self.log_productions(14)
 
     def p_block(self, p):
         '''block : BEGIN_KW stmtList END_KW'''
-        self.log_productions(15, "block -> begin stmtList end")
+        self.log_productions(15)
 
     def p_stmtList_1(self, p):
         '''stmtList : stmt'''
-        self.log_productions(16, "stmtList -> stmt")
+        self.log_productions(16)
 
     def p_stmtList_2(self, p):
         '''stmtList : stmtList stmt'''
-        self.log_productions(17, "stmtList -> stmtList stmt")
+        self.log_productions(17)
 
     def p_stmt_1(self, p):
         '''stmt : IDENTIFIER ASSIGN_OP expr SEMICOLON'''
-        self.log_productions(18, "stmt -> id := expr ;")
+        self.log_productions(18)
 
     def p_stmt_2(self, p):
         '''stmt : IF_KW expr THEN_KW stmt'''
-        self.log_productions(19, "stmt -> if expr then stmt")
+        self.log_productions(19)
 
     def p_stmt_3(self, p):
         '''stmt : IF_KW expr THEN_KW stmt ELSE_KW stmt'''
-        self.log_productions(20, "stmt -> if expr then stmt else stmt")
+        self.log_productions(20)
 
     def p_stmt_4(self, p):
         '''stmt : WHILE_KW expr DO_KW stmt'''
-        self.log_productions(21, "stmt -> while expr do stmt")
+        self.log_productions(21)
 
     def p_stmt_5(self, p):
         '''stmt : FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmt'''
-        self.log_productions(22, "stmt -> for id := expr to expr do stmt")
+        self.log_productions(22)
 
     def p_stmt_6(self, p):
         '''stmt : RETURN_KW expr SEMICOLON'''
-        self.log_productions(23, "stmt -> return expr ;")
+        self.log_productions(23)
 
     def p_stmt_7(self, p):
         '''stmt : block'''
-        self.log_productions(24, "stmt -> block")
+        self.log_productions(24)
 
     def p_expr_1(self, p):
         '''expr : expr AND_KW expr'''
-        self.log_productions(25, "expr -> expr and expr")
+        self.log_productions(25)
 
     def p_expr_2(self, p):
         '''expr : expr OR_KW expr'''
-        self.log_productions(26, "expr -> expr or expr")
+        self.log_productions(26)
 
     def p_expr_3(self, p):
         '''expr : expr MUL_OP expr'''
-        self.log_productions(27, "expr -> expr * expr")
+        self.log_productions(27)
 
     def p_expr_4(self, p):
         '''expr : expr DIV_OP expr'''
-        self.log_productions(28, "expr -> expr / expr")
+        self.log_productions(28)
 
     def p_expr_5(self, p):
         '''expr : expr ADD_OP expr'''
-        self.log_productions(29, "expr -> expr + expr")
+        self.log_productions(29)
 
     def p_expr_6(self, p):
         '''expr : expr SUB_OP expr'''
-        self.log_productions(30, "expr -> expr - expr")
+        self.log_productions(30)
 
     def p_expr_7(self, p):
         '''expr : expr relop expr'''
-        self.log_productions(31, "expr -> expr relop expr")
+        self.log_productions(31)
 
     def p_expr_8(self, p):
         '''expr : LEFT_PA expr RIGHT_PA'''
-        self.log_productions(32, "expr -> ( expr )")
+        self.log_productions(32)
 
     def p_expr_9(self, p):
         '''expr : INTEGER_NUMBER'''
-        self.log_productions(33, "expr -> integerNumber")
+        self.log_productions(33)
 
     def p_expr_10(self, p):
         '''expr : REAL_NUMBER'''
-        self.log_productions(34, "expr -> realNumber")
+        self.log_productions(34)
 
     def p_expr_11(self, p):
         '''expr : TRUE_KW'''
-        self.log_productions(35, "expr -> true")
+        self.log_productions(35)
 
     def p_expr_12(self, p):
         '''expr : FALSE_KW'''
-        self.log_productions(36, "expr -> false")
+        self.log_productions(36)
 
     def p_expr_13(self, p):
         '''expr : IDENTIFIER LEFT_PA actualparamlist RIGHT_PA'''
-        self.log_productions(37, "expr -> id ( actualparamlist )")
+        self.log_productions(37)
 
     def p_expr_14(self, p):
         '''expr : IDENTIFIER'''
-        self.log_productions(38, "expr -> id")
+        self.log_productions(38)
 
     def p_actualparamlist_1(self, p):
         '''actualparamlist : expr'''
-        self.log_productions(39, "actualparamlist -> expr")
+        self.log_productions(39)
 
     def p_actualparamlist_2(self, p):
         '''actualparamlist : actualparamlist COMMA expr'''
-        self.log_productions(40, "actualparamlist -> actualparamlist, expr")
+        self.log_productions(40)
 
     def p_actualparamlist_3(self, p):
         '''actualparamlist : IDENTIFIER'''
-        self.log_productions(41, "actualparamlist -> id")
+        self.log_productions(41)
 
     def p_actualparamlist_4(self, p):
         '''actualparamlist : empty'''
-        self.log_productions(42, "actualparamlist -> ε")
+        self.log_productions(42)
 
     def p_relop_1(self, p):
         '''relop : LT_OP'''
-        self.log_productions(43, "relop -> <")
+        self.log_productions(43)
 
     def p_relop_2(self, p):
         '''relop : LE_OP'''
-        self.log_productions(44, "relop -> <=")
+        self.log_productions(44)
 
     def p_relop_3(self, p):
         '''relop : EQ_OP'''
-        self.log_productions(45, "relop -> =")
+        self.log_productions(45)
 
     def p_relop_4(self, p):
         '''relop : NE_OP'''
-        self.log_productions(46, "relop -> <>")
+        self.log_productions(46)
 
     def p_relop_5(self, p):
         '''relop : GE_OP'''
-        self.log_productions(47, "relop -> >=")
+        self.log_productions(47)
 
     def p_relop_6(self, p):
         '''relop : GT_OP'''
-        self.log_productions(48, "relop -> >")
+        self.log_productions(48)
 
     # Rule for empty production.
     def p_empty(self, p):
@@ -251,7 +381,7 @@ class Parser:
     # Error handling rule.
     def p_error(self, p):
         if p:
-            print(f"Syntax error at token '{p.type}' with value '{p.value}' on line {p.lineno}")
+            print(f"Syntax error at token '{p.type}' with value '{self.lexer.lexeme(p)}' on line {p.lineno}")
         else:
             print("Syntax error at EOF")
 
@@ -265,4 +395,31 @@ class Parser:
         Returns:
             The result of the parsing process.
         """
-        return self.parser.parse(data)
\ No newline at end of file
+        return self.parser.parse(data)
+
+    def parse_file(self, path):
+        """
+        Parses a source file while it is being read, without loading it into memory.
+
+        Args:
+            path (str): Path of the source file to be parsed.
+
+        Returns:
+            The result of the parsing process.
+        """
+        tokens = self.lexer.tokenize_file(path)
+        return self.parser.parse(lexer=self.lexer.lexer, tokenfunc=lambda: next(tokens, None))
+
+    def parse_token_file(self, path):
+        """
+        Parses the tokens of a token file written by phase 1 (see `tokenFile`),
+        without lexing the source again. Its symbols are added to the symbol table.
+
+        Args:
+            path (str): Path of the token file to be parsed.
+
+        Returns:
+            The result of the parsing process.
+        """
+        tokens = read_token_file(path, self.lexer)
+        return self.parser.parse(lexer=self.lexer.lexer, tokenfunc=lambda: next(tokens, None))
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Abstract Syntax Tree node classes built by the Phase 3 parser.
+
+Every node stores its children in `__slots__`, so a node costs a few machine
+words instead of a dict, and the code generator dispatches on the node class
+instead of comparing type strings. The list productions of the grammar
+(decList, varList, funcList, stmtList, actualparamlist) are flattened into
+Python lists. Identifiers and literal values are SymbolTable handles.
+"""
+
+
+class Node:
+    """Base class of all AST nodes."""
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class Program(Node):
+    """start → program id ; decList funcList block (decList and funcList are lists)"""
+    __slots__ = ('id', 'decList', 'funcList', 'block')
+
+    def __init__(self, id, decList, funcList, block):
+        self.id = id
+        self.decList = decList
+        self.funcList = funcList
+        self.block = block
+
+
+class Decs(Node):
+    """decs → type varList ; (empty declarations are left out of declaration lists)"""
+    __slots__ = ('typeName', 'varList')
+
+    def __init__(self, typeName, varList):
+        self.typeName = typeName
+        self.varList = varList          # List of the declared identifiers.
+
+
+class FuncDec(Node):
+    """funcDec → function id parameters : type decList block"""
+    __slots__ = ('id', 'scope', 'parameters', 'returnType', 'decList', 'block')
+
+    def __init__(self, id, scope, parameters, returnType, decList, block):
+        self.id = id
+        self.scope = scope              # Scope holding the parameters and locals.
+        self.parameters = parameters    # List of Decs of the parameters.
+        self.returnType = returnType
+        self.decList = decList
+        self.block = block
+
+
+class Block(Node):
+    """block → begin stmtList end (also used as the `stmt → block` statement)"""
+    __slots__ = ('stmtList',)
+
+    def __init__(self, stmtList):
+        self.stmtList = stmtList        # List of statements.
+
+
+class Assign(Node):
+    """stmt → id := expr ;"""
+    __slots__ = ('id', 'expr')
+
+    def __init__(self, id, expr):
+        self.id = id
+        self.expr = expr
+
+
+class IfThen(Node):
+    """stmt → if expr then stmt"""
+    __slots__ = ('expr', 'then_stmt')
+
+    def __init__(self, expr, then_stmt):
+        self.expr = expr
+        self.then_stmt = then_stmt
+
+
+class IfThenElse(Node):
+    """stmt → if expr then stmt else stmt"""
+    __slots__ = ('expr', 'then_stmt', 'else_stmt')
+
+    def __init__(self, expr, then_stmt, else_stmt):
+        self.expr = expr
+        self.then_stmt = then_stmt
+        self.else_stmt = else_stmt
+
+
+class While(Node):
+    """stmt → while expr do stmt"""
+    __slots__ = ('expr', 'stmt')
+
+    def __init__(self, expr, stmt):
+        self.expr = expr
+        self.stmt = stmt
+
+
+class For(Node):
+    """stmt → for id := expr to expr do stmt"""
+    __slots__ = ('id', 'start_expr', 'end_expr', 'stmt')
+
+    def __init__(self, id, start_expr, end_expr, stmt):
+        self.id = id
+        self.start_expr = start_expr
+        self.end_expr = end_expr
+        self.stmt = stmt
+
+
+class Return(Node):
+    """stmt → return expr ;"""
+    __slots__ = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class BinaryOp(Node):
+    """expr → expr and|or|*|/|+|- expr"""
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class RelOp(Node):
+    """expr → expr relop expr"""
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class Literal(Node):
+    """expr → integerNumber | realNumber | true | false"""
+    __slots__ = ('literalType', 'value')
+
+    def __init__(self, literalType, value):
+        self.literalType = literalType  # 'integer', 'real' or 'boolean'.
+        self.value = value              # SymbolTable handle of the literal.
+
+
+class Id(Node):
+    """expr → id"""
+    __slots__ = ('id',)
+
+    def __init__(self, id):
+        self.id = id
+
+
+class FunctionCall(Node):
+    """expr → id ( actualparamlist )"""
+    __slots__ = ('id', 'actualParamList')
+
+    def __init__(self, id, actualParamList):
+        self.id = id
+        self.actualParamList = actualParamList  # List of argument expressions.
@@ -0,0 +1,171 @@
+"""
+Batch compilation driver.
+
+Compiles many programs to TAC across a process pool. Every worker builds one
+Parser and one TACGenerator (loading the parser tables from a shared table
+cache) and reuses them for all the files it is given.
+
+Usage:
+    python batch.py SOURCE [SOURCE ...] [-o OUTDIR] [-j JOBS] [--table-cache DIR] [-O] [--registers K]
+                    [--lint] [--max-errors N]
+
+Each SOURCE is a file, a directory (all `*.txt` files in it) or a glob pattern.
+The TAC of `<dir>/<name>.txt` is written to `OUTDIR/<dir>/<name>.tac` (paths are
+relative to the common directory of all sources), and `OUTDIR/summary.json`
+lists the status, timings and syntax errors and illegal characters (line, token
+and message, up to `--max-errors` per file) of every file. With `--lint` the
+files are only parsed, to report their errors.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from parser import Parser, MAX_ERRORS
+from codeGenerator import TACGenerator
+from optimizer import Optimizer
+from registerAllocator import LinearScanAllocator
+
+# Per-worker compiler objects, created once by `init_worker`.
+_parser = None
+_tacgenerator = None
+_optimizer = None
+_allocator = None
+_lint = False
+
+
+def init_worker(table_cache, optimize=False, registers=None, lint=False, max_errors=MAX_ERRORS):
+    """Builds the Parser, TACGenerator and (when asked for) Optimizer and allocator used by this worker process."""
+    global _parser, _tacgenerator, _optimizer, _allocator, _lint
+    _parser = Parser(table_cache=table_cache, max_errors=max_errors)
+    _lint = lint
+    _tacgenerator = TACGenerator(_parser.symbol_table, copy_literals=not optimize)
+    _optimizer = Optimizer(_parser.symbol_table) if optimize else None
+    _allocator = LinearScanAllocator(registers) if registers else None
+
+
+def compile_file(job):
+    """
+    Compiles one source file with the worker's Parser and TACGenerator.
+
+    Args:
+        job (tuple): (source path, output path).
+
+    Returns:
+        dict: Status, error message (if any), syntax errors and timings in milliseconds.
+    """
+    source, target = job
+    result = {'source': source, 'output': None, 'ok': False, 'error': None, 'diagnostics': [],
+              'parse_ms': 0.0, 'codegen_ms': 0.0}
+    try:
+        start = time.perf_counter()
+        ast = _parser.parse_file(source)
+        parsed = time.perf_counter()
+        result['parse_ms'] = (parsed - start) * 1000
+        result['diagnostics'] = [diagnostic.to_dict() for diagnostic in _parser.diagnostics]
+        if ast is None:
+            errors = [str(diagnostic) for diagnostic in _parser.diagnostics]
+            result['error'] = '\n'.join(errors) or 'Parsing failed, no TAC generated.'
+            return result
+        if _lint:
+            result['ok'] = True
+            return result
+
+        if _optimizer:
+            _optimizer.optimize_program(ast)
+        _tacgenerator.generate_program_quadruples(ast)
+        if _optimizer:
+            _tacgenerator.quadruples = _optimizer.optimize_quadruples(_tacgenerator.quadruples)
+        if _allocator:
+            _tacgenerator.quadruples = _allocator.allocate(_tacgenerator.quadruples)
+        result['codegen_ms'] = (time.perf_counter() - parsed) * 1000
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w') as output:
+            _tacgenerator.write_tac(output)
+        result['output'] = target
+        result['ok'] = True
+    except Exception as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+    return result
+
+
+def collect_sources(patterns):
+    """
+    Expands files, directories and glob patterns into a sorted list of source files.
+
+    Args:
+        patterns (list): Command line SOURCE arguments.
+
+    Returns:
+        list: Absolute paths of the source files, without duplicates.
+    """
+    sources = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.txt')
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path):
+                sources.add(os.path.abspath(path))
+    return sorted(sources)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='+', metavar='SOURCE', help='source file, directory or glob pattern')
+    arguments.add_argument('-o', '--output', default='tac', metavar='OUTDIR', help='output directory (default: tac)')
+    arguments.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    arguments.add_argument('--table-cache', metavar='DIR',
+                           help='table cache directory (default: a temporary directory)')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='optimize the AST and the TAC (see optimizer.py)')
+    arguments.add_argument('--registers', type=int, metavar='K', help='rename the temps onto K registers and spill slots')
+    arguments.add_argument('--lint', action='store_true', help='only parse the files and report their syntax errors')
+    arguments.add_argument('--max-errors', type=int, default=MAX_ERRORS, metavar='N',
+                           help=f'syntax errors reported per file before it is abandoned (default: {MAX_ERRORS})')
+    args = arguments.parse_args()
+
+    sources = collect_sources(args.sources)
+    if not sources:
+        sys.exit('No source files found.')
+    root = os.path.commonpath([os.path.dirname(source) for source in sources])
+    jobs = [(source, os.path.join(args.output, os.path.splitext(os.path.relpath(source, root))[0] + '.tac'))
+            for source in sources]
+
+    with contextlib.ExitStack() as stack:
+        table_cache = args.table_cache or stack.enter_context(tempfile.TemporaryDirectory())
+        Parser(table_cache=table_cache)     # Build the tables once, before the workers load them.
+
+        start = time.perf_counter()
+        chunksize = max(1, len(jobs) // (args.jobs * 8))
+        initargs = (table_cache, args.optimize, args.registers, args.lint, args.max_errors)
+        with ProcessPoolExecutor(args.jobs, initializer=init_worker, initargs=initargs) as pool:
+            results = list(pool.map(compile_file, jobs, chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+
+    failures = [result for result in results if not result['ok']]
+    summary = {
+        'files': len(results),
+        'failures': len(failures),
+        'syntax_errors': sum(len(result['diagnostics']) for result in results),
+        'wall_s': elapsed,
+        'parse_ms': sum(result['parse_ms'] for result in results),
+        'codegen_ms': sum(result['codegen_ms'] for result in results),
+        'results': results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'summary.json'), 'w') as output:
+        json.dump(summary, output, indent=2)
+
+    for failure in failures:
+        print(f"FAILED {failure['source']}: {failure['error']}")
+    print(f"{len(results) - len(failures)}/{len(results)} {'checked' if args.lint else 'compiled'} in {elapsed:.2f}s with {args.jobs} workers")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
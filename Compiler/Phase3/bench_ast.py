@@ -0,0 +1,254 @@
+"""
+Memory and throughput benchmark of the slotted AST against the former dict AST.
+
+The dict AST is rebuilt from the parsed nodes with the layout the parser used
+to produce (`{'type': 'stmt', 'stmtType': 'assign', ...}`, with list
+productions nested as linked chains), and it is walked by a copy of the former
+recursive, string-comparing TAC generator.
+
+Usage:
+    python bench_ast.py [--statements N] [--repeat R]
+"""
+import argparse
+import sys
+import time
+
+import astNodes
+from codeGenerator import TACGenerator
+from parser import Parser
+from quadStore import Opcode, OPERATORS, NONE, VAR, CONST, KIND_MASK, operand
+from synthetic import generate_program
+
+
+def chain(items, key, item_key, right_recursive=False):
+    """Rebuilds a linked chain of list nodes the way the former parser nested them."""
+    node = None
+    if right_recursive:
+        for item in reversed(items):
+            node = {'type': key, item_key: item, key: node}
+    else:
+        for item in items:
+            node = {'type': key, key: node, item_key: item}
+    return node
+
+
+def to_dict(node):
+    """Converts an AST node (or list of nodes) into the dict layout of the former parser."""
+    if isinstance(node, astNodes.Program):
+        funcList = {'type': 'funcList', 'empty': True}
+        for funcDec in node.funcList:
+            funcList = {'type': 'funcList', 'funcList': funcList, 'funcDec': to_dict(funcDec)}
+        return {'type': 'program', 'id': node.id, 'decList': decList_to_dict(node.decList),
+                'funcList': funcList, 'block': to_dict(node.block)}
+    if isinstance(node, astNodes.Decs):
+        return {'type': 'decs', 'type_node': {'type': 'type', 'typeName': node.typeName},
+                'varList': chain(node.varList, 'varList', 'identifier')}
+    if isinstance(node, astNodes.FuncDec):
+        return {'type': 'funcDec', 'id': node.id,
+                'parameters': {'type': 'parameters', 'decList': decList_to_dict(node.parameters)},
+                'returnType': {'type': 'type', 'typeName': node.returnType}, 'decList': decList_to_dict(node.decList),
+                'block': to_dict(node.block)}
+    if isinstance(node, astNodes.Block):
+        return {'type': 'block', 'stmtList': chain([stmt_to_dict(stmt) for stmt in node.stmtList], 'stmtList', 'stmt')}
+    if isinstance(node, (astNodes.BinaryOp, astNodes.RelOp)):
+        exprType = 'binary_op' if isinstance(node, astNodes.BinaryOp) else 'rel_op'
+        return {'type': 'expr', 'exprType': exprType, 'op': node.op, 'left': to_dict(node.left), 'right': to_dict(node.right)}
+    if isinstance(node, astNodes.Literal):
+        return {'type': 'expr', 'exprType': 'literal', 'literalType': node.literalType, 'value': node.value}
+    if isinstance(node, astNodes.Id):
+        return {'type': 'expr', 'exprType': 'id', 'id': node.id}
+    if isinstance(node, astNodes.FunctionCall):
+        return {'type': 'expr', 'exprType': 'function_call', 'id': node.id,
+                'actualParamList': {'type': 'actualparamlist', 'actualParamList': [to_dict(arg) for arg in node.actualParamList]}}
+    raise TypeError(f'Unknown node {node!r}')
+
+
+def decList_to_dict(decs):
+    """Converts a list of declarations into the former right-recursive decList chain."""
+    items = [to_dict(dec) for dec in decs] or [{'type': 'decs', 'empty': True}]
+    return chain(items, 'decList', 'decs', right_recursive=True)
+
+
+def stmt_to_dict(node):
+    """Converts a statement node into the dict layout of the former parser."""
+    if isinstance(node, astNodes.Assign):
+        return {'type': 'stmt', 'stmtType': 'assign', 'id': node.id, 'expr': to_dict(node.expr)}
+    if isinstance(node, astNodes.IfThen):
+        return {'type': 'stmt', 'stmtType': 'if_then', 'expr': to_dict(node.expr), 'then_stmt': stmt_to_dict(node.then_stmt)}
+    if isinstance(node, astNodes.IfThenElse):
+        return {'type': 'stmt', 'stmtType': 'if_then_else', 'expr': to_dict(node.expr),
+                'then_stmt': stmt_to_dict(node.then_stmt), 'else_stmt': stmt_to_dict(node.else_stmt)}
+    if isinstance(node, astNodes.While):
+        return {'type': 'stmt', 'stmtType': 'while', 'expr': to_dict(node.expr), 'stmt': stmt_to_dict(node.stmt)}
+    if isinstance(node, astNodes.For):
+        return {'type': 'stmt', 'stmtType': 'for', 'id': node.id, 'start_expr': to_dict(node.start_expr),
+                'end_expr': to_dict(node.end_expr), 'stmt': stmt_to_dict(node.stmt)}
+    if isinstance(node, astNodes.Return):
+        return {'type': 'stmt', 'stmtType': 'return', 'expr': to_dict(node.expr)}
+    return {'type': 'stmt', 'stmtType': 'block', 'block': to_dict(node)}
+
+
+class DictTACGenerator(TACGenerator):
+    """The former TAC generator: walks the dict AST and dispatches on type strings."""
+
+    def generate_program_tac(self, program_node):
+        self.reset_counters()
+        self.generate_block_tac(program_node['block'])
+        return self.get_tac_code()
+
+    def generate_block_tac(self, block_node):
+        if block_node['type'] == 'block':
+            self.generate_stmtList_tac(block_node['stmtList'])
+
+    def generate_stmtList_tac(self, stmtList_node):
+        if stmtList_node['type'] == 'stmtList':
+            if stmtList_node['stmtList']:
+                self.generate_stmtList_tac(stmtList_node['stmtList'])
+            self.generate_stmt_tac(stmtList_node['stmt'])
+
+    def generate_stmt_tac(self, stmt_node):
+        if stmt_node['type'] == 'stmt':
+            stmt_type = stmt_node['stmtType']
+            if stmt_type == 'assign':
+                expr_result = self.generate_expr_tac(stmt_node['expr'])
+                self.quadruples.append(Opcode.COPY, expr_result, NONE, operand(VAR, stmt_node['id']))
+            elif stmt_type == 'if_then':
+                expr_result = self.generate_expr_tac(stmt_node['expr'])
+                label_true, label_end_if = self.generate_label(), self.generate_label()
+                self.quadruples.append(Opcode.IFGOTO, expr_result, label_true)
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end_if)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_true)
+                self.generate_stmt_tac(stmt_node['then_stmt'])
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_end_if)
+            elif stmt_type == 'if_then_else':
+                expr_result = self.generate_expr_tac(stmt_node['expr'])
+                label_true, label_false, label_end_if = self.generate_label(), self.generate_label(), self.generate_label()
+                self.quadruples.append(Opcode.IFGOTO, expr_result, label_true)
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_false)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_true)
+                self.generate_stmt_tac(stmt_node['then_stmt'])
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end_if)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_false)
+                self.generate_stmt_tac(stmt_node['else_stmt'])
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_end_if)
+            elif stmt_type == 'while':
+                label_start, label_body, label_end = self.generate_label(), self.generate_label(), self.generate_label()
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_start)
+                expr_result = self.generate_expr_tac(stmt_node['expr'])
+                self.quadruples.append(Opcode.IFGOTO, expr_result, label_body)
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_body)
+                self.generate_stmt_tac(stmt_node['stmt'])
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_start)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_end)
+            elif stmt_type == 'for':
+                var_name = operand(VAR, stmt_node['id'])
+                start_result = self.generate_expr_tac(stmt_node['start_expr'])
+                end_result = self.generate_expr_tac(stmt_node['end_expr'])
+                if end_result & KIND_MASK == VAR:
+                    bound = self.generate_temp_var()
+                    self.quadruples.append(Opcode.COPY, end_result, NONE, bound)
+                    end_result = bound
+                self.quadruples.append(Opcode.COPY, start_result, NONE, var_name)
+                label_start, label_body, label_end = self.generate_label(), self.generate_label(), self.generate_label()
+                condition = self.generate_temp_var()
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_start)
+                self.quadruples.append(Opcode.LE, var_name, end_result, condition)
+                self.quadruples.append(Opcode.IFGOTO, condition, label_body)
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_body)
+                self.generate_stmt_tac(stmt_node['stmt'])
+                one, next_value = self.generate_temp_var(), self.generate_temp_var()
+                self.quadruples.append(Opcode.COPY, operand(CONST, self.symbols.integer(1)), NONE, one)
+                self.quadruples.append(Opcode.ADD, var_name, one, next_value)
+                self.quadruples.append(Opcode.COPY, next_value, NONE, var_name)
+                self.quadruples.append(Opcode.GOTO, NONE, NONE, label_start)
+                self.quadruples.append(Opcode.LABEL, NONE, NONE, label_end)
+            elif stmt_type == 'return':
+                expr_result = self.generate_expr_tac(stmt_node['expr'])
+                self.quadruples.append(Opcode.RETURN, expr_result)
+            elif stmt_type == 'block':
+                self.generate_block_tac(stmt_node['block'])
+
+    def generate_expr_tac(self, expr_node):
+        if expr_node['type'] == 'expr':
+            expr_type = expr_node['exprType']
+            if expr_type == 'binary_op' or expr_type == 'rel_op':
+                left_result = self.generate_expr_tac(expr_node['left'])
+                right_result = self.generate_expr_tac(expr_node['right'])
+                temp_var = self.generate_temp_var()
+                self.quadruples.append(OPERATORS[expr_node['op']], left_result, right_result, temp_var)
+                return temp_var
+            elif expr_type == 'literal':
+                temp_var = self.generate_temp_var()
+                self.quadruples.append(Opcode.COPY, operand(CONST, expr_node['value']), NONE, temp_var)
+                return temp_var
+            elif expr_type == 'id':
+                return operand(VAR, expr_node['id'])
+        return NONE
+
+
+def deep_size(root):
+    """Returns the bytes held by the nodes, dicts and lists of a tree (shared ints and strings excluded)."""
+    total, stack = 0, [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            total += sys.getsizeof(item)
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            total += sys.getsizeof(item)
+            stack.extend(item)
+        elif isinstance(item, astNodes.Node):
+            total += sys.getsizeof(item)
+            stack.extend(getattr(item, name) for name in item.__slots__ if name != 'scope')
+    return total
+
+
+def count_nodes(root):
+    """Returns the number of AST nodes in a tree."""
+    count, stack = 0, [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, astNodes.Node):
+            count += 1
+            stack.extend(getattr(item, name) for name in item.__slots__ if name != 'scope')
+    return count
+
+
+def best_time(function, repeat):
+    """Returns the fastest of `repeat` runs of `function()` in seconds, and its result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--statements', type=int, default=400, help='top-level statements of the program')
+    arguments.add_argument('--repeat', type=int, default=5, help='timing repetitions (best is reported)')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    ast = parser.parse(generate_program(args.statements))
+    dict_ast = to_dict(ast)
+    nodes = count_nodes(ast)
+
+    node_time, node_tac = best_time(lambda: TACGenerator(parser.symbol_table).generate_program_tac(ast), args.repeat)
+    dict_time, dict_tac = best_time(lambda: DictTACGenerator(parser.symbol_table).generate_program_tac(dict_ast), args.repeat)
+    assert node_tac == dict_tac, 'slotted and dict ASTs produced different TAC'
+
+    print(f'{nodes} AST nodes, {node_tac.count(chr(10))} TAC lines')
+    print(f"{'AST':<8}{'bytes':>12}{'bytes/node':>12}{'codegen ms':>12}")
+    for name, tree, elapsed in (('dict', dict_ast, dict_time), ('slotted', ast, node_time)):
+        size = deep_size(tree)
+        print(f'{name:<8}{size:>12}{size / nodes:>12.1f}{elapsed * 1000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Reports the quadruples and temps saved by constant folding.
+
+Every program is compiled twice, as `main.py` does without and with `-O`, and
+the number of quadruples, temps and labels of both compilations is printed.
+
+Usage:
+    python bench_fold.py [SOURCE ...]   (default: input.txt and the Phase 2 examples)
+"""
+import argparse
+import os
+
+from codeGenerator import TACGenerator
+from constantFolder import ConstantFolder
+from exampleSources import DEFAULT_SOURCES, HERE
+from parser import Parser
+
+
+def compile_counts(parser, path, optimize):
+    """Compiles a file and returns its (quadruples, temps, labels) counts."""
+    ast = parser.parse_file(path)
+    if optimize:
+        ConstantFolder(parser.symbol_table).fold_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not optimize)
+    tacgenerator.generate_program_quadruples(ast)
+    return len(tacgenerator.quadruples), tacgenerator.temp_var_counter, tacgenerator.label_counter
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, metavar='SOURCE', help='source files')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    print(f"{'program':<32}{'quads':>12}{'temps':>12}{'labels':>12}")
+    totals = [0] * 6
+    for path in args.sources:
+        counts = compile_counts(parser, path, False) + compile_counts(parser, path, True)
+        totals = [total + count for total, count in zip(totals, counts)]
+        name = os.path.relpath(path, HERE)
+        print(f'{name:<32}' + ''.join(f'{counts[i]:>6} → {counts[i + 3]:<3}' for i in range(3)))
+    print(f"{'total':<32}" + ''.join(f'{totals[i]:>6} → {totals[i + 3]:<3}' for i in range(3)))
+
+
+if __name__ == '__main__':
+    main()
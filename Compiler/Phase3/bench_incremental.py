@@ -0,0 +1,111 @@
+"""
+Benchmark of incremental compilation (compileCache.py) after a one-line edit.
+
+A synthetic program of about 10k lines (synthetic.py) is compiled as `main.py`
+does, then incrementally with an empty cache, again without changes, and after
+changing one assignment of one function; every incremental compilation must
+give the same TAC text as a full compilation of the same source.
+
+Usage:
+    python bench_incremental.py [--statements N] [--functions F] [--repeat R] [-O]   (default: 2600 statements, 200 functions)
+"""
+import argparse
+import io
+import re
+import shutil
+import tempfile
+import time
+
+from codeGenerator import TACGenerator
+from compileCache import IncrementalCompiler
+from optimizer import Optimizer
+from parser import Parser
+from synthetic import generate_program
+
+
+def tac_text(parser, quadruples):
+    """Formats quadruples as the text `main.py` writes."""
+    tacgenerator = TACGenerator(parser.symbol_table)
+    tacgenerator.quadruples = quadruples
+    output = io.StringIO()
+    tacgenerator.write_tac(output)
+    return output.getvalue()
+
+
+def compile_full(parser, source, optimize):
+    """Compiles a source text as `main.py` does and returns its quadruples."""
+    ast = parser.parse(source)
+    optimizer = Optimizer(parser.symbol_table) if optimize else None
+    if optimizer:
+        optimizer.optimize_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not optimize)
+    tacgenerator.generate_program_quadruples(ast)
+    quadruples = tacgenerator.quadruples
+    return optimizer.optimize_quadruples(quadruples) if optimizer else quadruples
+
+
+def compile_incremental(parser, source, cache, optimize):
+    """Compiles a source text with the cache and returns its quadruples and the unit counts."""
+    optimizer = Optimizer(parser.symbol_table) if optimize else None
+    compiler = IncrementalCompiler(parser, cache, optimizer)
+    quadruples = compiler.compile(source)
+    return (optimizer.optimize_quadruples(quadruples) if optimizer else quadruples), compiler.stats
+
+
+def edit_one_line(source, number):
+    """Returns the source with `number + ` inserted in the first assignment of the last function."""
+    start = source.rindex('function ')
+    match = re.compile(r':= ').search(source, start)
+    return source[:match.end()] + f'{number} + ' + source[match.end():]
+
+
+def measure(parser, cache, name, sources, fresh, optimize, full_time):
+    """
+    Compiles each source incrementally (from an empty cache when `fresh`), checks the
+    TAC of the last one against a full compilation and prints the best run.
+    """
+    best = float('inf')
+    for source in sources:
+        if fresh:
+            shutil.rmtree(cache, ignore_errors=True)
+        start = time.perf_counter()
+        quadruples, stats = compile_incremental(parser, source, cache, optimize)
+        tac = tac_text(parser, quadruples)
+        best = min(best, time.perf_counter() - start)
+    assert tac == tac_text(parser, compile_full(parser, source, optimize)), \
+        f'{name}: the incremental TAC differs from a full compilation'
+    print(f"{name:<24}{stats['units']:>8}{stats['compiled']:>10}{best:>10.3f}{full_time / best:>9.1f}")
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--statements', type=int, default=2600, help='top-level statements of the program')
+    arguments.add_argument('--functions', type=int, default=200, help='functions of the program')
+    arguments.add_argument('--repeat', type=int, default=3, help='runs per measure, the best is reported')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='compile with -O')
+    args = arguments.parse_args()
+
+    source = generate_program(args.statements, args.functions)
+    parser = Parser()
+    cache = tempfile.mkdtemp(prefix='tac-cache-')
+    try:
+        print(f"{source.count(chr(10))} lines, {args.functions} functions{', -O' if args.optimize else ''}")
+        print(f"{'compilation':<24}{'units':>8}{'compiled':>10}{'seconds':>10}{'speedup':>9}")
+        full_time = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            tac_text(parser, compile_full(parser, source, args.optimize))
+            full_time = min(full_time, time.perf_counter() - start)
+        print(f"{'full':<24}{'':>8}{'':>10}{full_time:>10.3f}{1:>9.1f}")
+
+        measure(parser, cache, 'empty cache', [source] * args.repeat, True, args.optimize, full_time)
+        measure(parser, cache, 'unchanged', [source] * args.repeat, False, args.optimize, full_time)
+        # A different edit every run, so that the edited function is never cached yet.
+        edited = [edit_one_line(source, number) for number in range(1, args.repeat + 1)]
+        measure(parser, cache, 'one line edited', edited, False, args.optimize, full_time)
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput of the scanner engines of the Lexer (lexer.py): PLY against the
+combined regular expression (`engine='regex'`) and its memory-mapped bytes
+variant (`engine='mmap'`).
+
+The input of each size is a synthetic program (synthetic.py) whose text is
+repeated up to that size, and scanned by the PLY and regex engines with
+`iter_tokens` (interning the same symbols); it is also written to a file and
+scanned by the mmap engine with `tokenize_file`. The table gives the tokens per
+second and MB per second of the best run. All engines must give the same number
+of tokens and the same last token.
+
+Usage:
+    python bench_lexer.py [--sizes MB ...] [--repeat R]   (default: 1 and 10 MB)
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from lexer import Lexer
+from synthetic import generate_program
+
+
+def build_input(size):
+    """Returns a source text of about `size` characters made of repeated synthetic programs."""
+    program = generate_program(4000, 100)
+    return program * max(1, round(size / len(program)))
+
+
+def scan(lexer, data):
+    """Scans the data; returns the number of tokens and the fields of the last one."""
+    lexer.reset()
+    count, token = 0, None
+    for token in lexer.iter_tokens(data):
+        count += 1
+    return count, (token.type, token.value, token.lineno, token.lexpos)
+
+
+def scan_file(lexer, path):
+    """Scans a file; returns the number of tokens and the fields of the last one."""
+    lexer.reset()
+    count, token = 0, None
+    for token in lexer.tokenize_file(path):
+        count += 1
+    return count, (token.type, token.value, token.lineno, token.lexpos)
+
+
+def measure(scanner, repeat, *args):
+    """Returns the tokens, last token and best time of a scan."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count, last = scanner(*args)
+        best = min(best, time.perf_counter() - start)
+    return count, last, best
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--sizes', type=float, nargs='+', default=[1, 10], metavar='MB', help='input sizes in MB')
+    arguments.add_argument('--repeat', type=int, default=3, help='runs per engine, the best is reported')
+    args = arguments.parse_args()
+
+    lexers = {engine: Lexer(engine=engine) for engine in Lexer.ENGINES}
+    print(f"{'MB':>8}{'engine':>8}{'tokens':>12}{'seconds':>10}{'tokens/s':>12}{'MB/s':>8}{'speedup':>9}")
+    for size in args.sizes:
+        data = build_input(int(size * (1 << 20)))
+        megabytes = len(data) / (1 << 20)
+        results = {engine: measure(scan, args.repeat, lexers[engine], data) for engine in ('ply', 'regex')}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            with open(path, 'w') as output:
+                output.write(data)
+            results['mmap'] = measure(scan_file, args.repeat, lexers['mmap'], path)
+        assert len({result[:2] for result in results.values()}) == 1, 'the engines gave different tokens'
+        for engine, (count, _, seconds) in results.items():
+            print(f"{megabytes:>8.1f}{engine:>8}{count:>12}{seconds:>10.3f}{count / seconds:>12.0f}"
+                  f"{megabytes / seconds:>8.2f}{results['ply'][2] / seconds:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Counts what the loop optimizations (loopOptimizer.py) save on loop-heavy programs.
+
+Each program is compiled with `-O` without and with the loop pass, and run by the
+virtual machine with its binary operations wrapped in counters: the table gives
+the quadruples, the executed steps, multiplications and divisions, and the best
+run time of each version.
+
+    prime       the prime check of input.txt as a function of num, so that
+                `divisor <= (num / 2)` cannot be folded and is recomputed on every iteration
+    products    nested for loops summing products of their induction variables with literals
+
+Usage:
+    python bench_loops.py [NUMBER] [--size N] [--repeat R]   (default: prime 1000003, products of size 300)
+"""
+import argparse
+import time
+from collections import Counter
+
+from codeGenerator import TACGenerator
+from optimizer import Optimizer
+from parser import Parser
+from quadStore import Opcode
+from virtualMachine import VirtualMachine, BINARY, OPERATIONS
+
+PRIME = """program prime;
+integer result;
+function isprime(integer num;) : boolean
+integer divisor, quotient;
+begin
+    divisor := 2;
+    while divisor <= (num / 2) do
+    begin
+        quotient := num / divisor;
+        if divisor * quotient = num then
+            return false;
+        divisor := divisor + 1;
+    end
+    return true;
+end
+begin
+    result := 0;
+    if isprime({number}) then
+        result := 1;
+    return result;
+end
+"""
+
+PRODUCTS = """program products;
+integer total;
+function products(integer n, scale;) : integer
+integer i, j, sum;
+begin
+    sum := 0;
+    for i := 1 to n do
+        for j := 1 to n do
+            sum := sum + i * 8 + j * 4 + scale * n;
+    return sum;
+end
+begin
+    total := products({size}, 3);
+    return total;
+end
+"""
+
+
+def compile_program(parser, source, loops):
+    """Compiles a source text as `main.py -O` does, with the loop pass turned off unless `loops`."""
+    ast = parser.parse(source)
+    optimizer = Optimizer(parser.symbol_table)
+    if not loops:
+        optimizer.loops.max_rounds = 0
+    optimizer.optimize_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=False)
+    tacgenerator.generate_program_quadruples(ast)
+    return optimizer.optimize_quadruples(tacgenerator.quadruples)
+
+
+def count_operations(vm):
+    """Wraps the binary operations of a loaded machine in counters; returns the Counter of opcode names."""
+    counts = Counter()
+    names = {operation: Opcode(opcode).name for opcode, operation in enumerate(OPERATIONS) if operation}
+
+    def counted(operation):
+        name = names[operation]
+
+        def run(left, right):
+            counts[name] += 1
+            return operation(left, right)
+        return run
+
+    for position, (kind, operation, a, b, r) in enumerate(vm.code):
+        if kind == BINARY:
+            vm.code[position] = (kind, counted(operation), a, b, r)
+    return counts
+
+
+def measure(parser, name, source, repeat):
+    """Runs a program compiled with -O without and with the loop pass and prints the counts of each."""
+    results = []
+    for loops in (False, True):
+        quadruples = compile_program(parser, source, loops)
+        vm = VirtualMachine(parser.symbol_table).load(quadruples)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = vm.run()
+            best = min(best, time.perf_counter() - start)
+        steps = vm.steps
+        counts = count_operations(vm)
+        vm.run()
+        results.append(result)
+        print(f"{name:>16}{'loops' if loops else '':>7}{len(quadruples):>7}{str(result):>12}{steps:>12}"
+              f"{counts['MUL']:>10}{counts['DIV']:>10}{best:>10.3f}")
+    assert results[0] == results[1], f'{name}: the loop pass changed the result'
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('number', nargs='?', type=int, default=1000003, help='number checked by prime')
+    arguments.add_argument('--size', type=int, default=300, help='loop bound of products')
+    arguments.add_argument('--repeat', type=int, default=3, help='runs per program, the best is reported')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    print(f"{'program':>16}{'':>7}{'quads':>7}{'result':>12}{'steps':>12}{'mul':>10}{'div':>10}{'seconds':>10}")
+    measure(parser, f'prime {args.number}', PRIME.format(number=args.number), args.repeat)
+    measure(parser, f'products {args.size}', PRODUCTS.format(size=args.size), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
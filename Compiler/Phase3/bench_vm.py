@@ -0,0 +1,94 @@
+"""
+Benchmark of the TAC virtual machine on the prime check of input.txt, and on
+the call-heavy recursive Fibonacci function of `FIBONACCI`.
+
+The literal assigned to `num` in input.txt is replaced by each given number,
+the program is compiled as `main.py` does without and with `-O`, and the
+virtual machine runs it. For a prime the loop runs num / 2 times, so large
+primes give long runs. fib(n) makes about 3.2 * 1.618^n calls.
+
+Usage:
+    python bench_vm.py [NUMBER ...] [--fibonacci N] [--repeat R]   (default: 10007, 100003 and 1000003; fib(20))
+"""
+import argparse
+import os
+import re
+import time
+
+from codeGenerator import TACGenerator
+from optimizer import Optimizer
+from parser import Parser
+from virtualMachine import VirtualMachine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, 'input.txt')
+
+FIBONACCI = """program fibonacci;
+integer n, result;
+function fib(integer k;) : integer
+begin
+    if k <= 1 then
+        return k;
+    return fib(k - 1) + fib(k - 2);
+end
+begin
+    n := {n};
+    result := fib(n);
+    return result;
+end
+"""
+
+
+def prime_program(number):
+    """Returns the source of input.txt checking `number` instead of its own literal."""
+    with open(SOURCE, 'r', encoding='utf-8') as file:
+        source = file.read()
+    return re.sub(r'num\s*:=\s*\d+\s*;', f'num:={number};', source, count=1)
+
+
+def compile_program(parser, source, optimize):
+    """Compiles a source text and returns its quadruples."""
+    ast = parser.parse(source)
+    optimizer = Optimizer(parser.symbol_table) if optimize else None
+    if optimizer:
+        optimizer.optimize_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not optimize)
+    tacgenerator.generate_program_quadruples(ast)
+    quadruples = tacgenerator.quadruples
+    if optimizer:
+        quadruples = optimizer.optimize_quadruples(quadruples)
+    return quadruples
+
+
+def benchmark(parser, name, source, repeat):
+    """Compiles a program without and with -O, runs each `repeat` times and prints the best run."""
+    for optimize in (False, True):
+        quadruples = compile_program(parser, source, optimize)
+        vm = VirtualMachine(parser.symbol_table).load(quadruples)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = vm.run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>14}{'-O' if optimize else '':>4}{len(quadruples):>7}{str(result):>8}{vm.steps:>12}"
+              f'{best:>10.3f}{vm.steps / best / 1e6:>10.2f}')
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('numbers', nargs='*', type=int, default=[10007, 100003, 1000003], metavar='NUMBER',
+                           help='numbers to check')
+    arguments.add_argument('--fibonacci', type=int, default=20, metavar='N', help='argument of fib (0 to skip)')
+    arguments.add_argument('--repeat', type=int, default=3, help='runs per program, the best is reported')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    print(f"{'program':>14}{'':>4}{'quads':>7}{'result':>8}{'steps':>12}{'seconds':>10}{'Msteps/s':>10}")
+    for number in args.numbers:
+        benchmark(parser, f'prime {number}', prime_program(number), args.repeat)
+    if args.fibonacci:
+        benchmark(parser, f'fib {args.fibonacci}', FIBONACCI.format(n=args.fibonacci), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
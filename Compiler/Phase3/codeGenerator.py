@@ -1,37 +1,207 @@
+from astNodes import Assign, IfThen, IfThenElse, While, For, Return, Block, BinaryOp, RelOp, Literal, Id, FunctionCall
+from constantFolder import contains_call
+from quadStore import (QuadStore, Opcode, OPERATORS, OPERATOR_SYMBOLS, BINARY_OPCODES, NONE, TEMP, LABEL, VAR, CONST,
+                       SPILL, FUNCTION, LOCAL, operand, operand_kind, operand_index)
+
+
+def format_copy(op, arg1, arg2, result):
+    return f"{result} = {arg1}\n"
+
+
+def format_operation(op, arg1, arg2, result):
+    return f"{result} = {arg1} {op} {arg2}\n"
+
+
+def format_ifgoto(op, arg1, arg2, result):
+    return f"if {arg1} goto {arg2}\n"
+
+
+def format_iffalse(op, arg1, arg2, result):
+    return f"ifFalse {arg1} goto {arg2}\n"
+
+
+def format_goto(op, arg1, arg2, result):
+    return f"goto {result}\n"
+
+
+def format_label(op, arg1, arg2, result):
+    return f"{result}:\n"
+
+
+def format_return(op, arg1, arg2, result):
+    return f"return {arg1}\n"
+
+
+def format_func(op, arg1, arg2, result):
+    return f"function {result}:\n"
+
+
+def format_formal(op, arg1, arg2, result):
+    return f"formal {result}\n"
+
+
+def format_param(op, arg1, arg2, result):
+    return f"param {arg1}\n"
+
+
+def format_call(op, arg1, arg2, result):
+    return f"{result} = call {arg1}, {arg2}\n"
+
+
+def format_endfunc(op, arg1, arg2, result):
+    return f"end {result}\n"
+
+
+# Formatter of every opcode, called with the text of the quadruple's operation and operands.
+TAC_FORMATTERS = [None] * len(Opcode)
+TAC_FORMATTERS[Opcode.COPY] = format_copy
+TAC_FORMATTERS[Opcode.IFGOTO] = format_ifgoto
+TAC_FORMATTERS[Opcode.IFFALSE] = format_iffalse
+TAC_FORMATTERS[Opcode.GOTO] = format_goto
+TAC_FORMATTERS[Opcode.LABEL] = format_label
+TAC_FORMATTERS[Opcode.RETURN] = format_return
+TAC_FORMATTERS[Opcode.FUNC] = format_func
+TAC_FORMATTERS[Opcode.FORMAL] = format_formal
+TAC_FORMATTERS[Opcode.PARAM] = format_param
+TAC_FORMATTERS[Opcode.CALL] = format_call
+TAC_FORMATTERS[Opcode.ENDFUNC] = format_endfunc
+for opcode in BINARY_OPCODES:
+    TAC_FORMATTERS[opcode] = format_operation   # Arithmetic, logical and relational operations.
+OPERATION_TEXT = [OPERATOR_SYMBOLS.get(opcode, opcode.name.lower()) for opcode in Opcode]
+
+
+class OperandNames(dict):
+    """
+    Cache of the text of operand handles ('_', 't3', 'L3', 's3', variable, function
+    and local names, and literal values), filled on first use.
+    """
+
+    def __init__(self, values):
+        super().__init__()
+        self.values = values    # SymbolTable values, for VAR, CONST, FUNCTION and LOCAL operands.
+        self[NONE] = '_'
+
+    def __missing__(self, handle):
+        kind, index = operand_kind(handle), operand_index(handle)
+        if kind == TEMP:
+            name = f"t{index}"
+        elif kind == LABEL:
+            name = f"L{index}"
+        elif kind == SPILL:
+            name = f"s{index}"
+        elif kind in (VAR, CONST, FUNCTION, LOCAL):
+            name = f"{self.values[index]}"
+        else:
+            raise ValueError(f"Unknown TAC operand: {handle}")
+        self[handle] = name
+        return name
+
+
+def format_quadruples(quadruples, names):
+    """
+    Formats quadruples as readable TAC instructions.
+
+    Args:
+        quadruples (QuadStore): Quadruples to format.
+        names (OperandNames): Text of the operand handles.
+
+    Returns:
+        list: One line of TAC per quadruple.
+
+    Raises:
+        ValueError: If a quadruple has an unknown opcode or operand.
+    """
+    formatters, operations = TAC_FORMATTERS, OPERATION_TEXT
+    try:
+        return [formatters[op](operations[op], names[arg1], names[arg2], names[result])
+                for op, arg1, arg2, result in quadruples]
+    except IndexError:
+        raise ValueError("Unknown TAC operation in quadruples") from None
+
+
 class TACGenerator:
     """
     Three-Address Code (TAC) Generator for grammar G.
     
     This class generates TAC quadruples from an Abstract Syntax Tree (AST) representation
     produced by the parser. It supports expressions, assignments, control flow structures,
-    and function returns.
+    function declarations, calls and returns.
+
+    Calling convention: the arguments of a call are evaluated first, then passed by
+    `param` quadruples in order, and `t = call f, n` runs f with the last n of them.
+    The body of a function follows the main program as `function f:`, one `formal x`
+    per parameter, its statements and `end f`; its parameters and local variables are
+    LOCAL operands, private to each activation of the function.
     """
-    def __init__(self):
+    def __init__(self, symbol_table, copy_literals=True):
         """
         Initializes the TAC generator.
-        - `quadruples`: Stores the list of generated TAC instructions.
+        - `symbols`: The parser's SymbolTable; AST identifiers and literals are its handles.
+        - `copy_literals`: Whether every literal is first copied into a temp (`t1 = 61`);
+          when False, literals are used directly as operands (`num = 61`).
+        - `quadruples`: QuadStore of the generated TAC instructions.
         - `temp_var_counter`: Counter for generating unique temporary variables.
         - `label_counter`: Counter for generating unique labels for control flow.
+        - `locals`: Declarations (handle -> type name) of the parameters and local
+          variables of the function being generated, empty in the main program.
         """
-        self.quadruples = []
+        self.symbols = symbol_table
+        self.copy_literals = copy_literals
+        self.quadruples = QuadStore()
         self.temp_var_counter = 0
         self.label_counter = 0
+        self.locals = {}
+
+        # Visitor dispatch tables: AST node class -> generator method.
+        self.stmt_generators = {
+            Assign: self.generate_assign_tac,
+            IfThen: self.generate_if_then_tac,
+            IfThenElse: self.generate_if_then_else_tac,
+            While: self.generate_while_tac,
+            For: self.generate_for_tac,
+            Return: self.generate_return_tac,
+            Block: self.generate_block_stmt_tac,
+        }
+        self.operation_nodes = (BinaryOp, RelOp)   # Combined in post-order by generate_expr_tac (with calls).
+        self.expr_generators = {
+            Literal: self.generate_literal_tac,
+            Id: self.generate_id_tac,
+        }
 
     def generate_temp_var(self):
         """Generates a new temporary variable for storing intermediate results."""
         self.temp_var_counter += 1
-        return f"t{self.temp_var_counter}"
+        return operand(TEMP, self.temp_var_counter)
 
     def generate_label(self):
         """Generates a new label for control flow (e.g. loops, conditionals)."""
         self.label_counter += 1
-        return f"L{self.label_counter}"
+        return operand(LABEL, self.label_counter)
+
+    def variable(self, handle):
+        """Returns the operand of a variable: a LOCAL in a function that declares it, else a VAR."""
+        return operand(LOCAL if handle in self.locals else VAR, handle)
 
     def reset_counters(self):
         """Resets counters for temporary variables and labels when generating a new program."""
         self.temp_var_counter = 0
         self.label_counter = 0
-        self.quadruples = []
+        self.locals = {}
+        self.quadruples = QuadStore()
+
+    def write_tac(self, output, batch_size=4096):
+        """
+        Streams the generated TAC instructions to a file object, formatting
+        `batch_size` quadruples per write instead of building the whole text.
+
+        Args:
+            output: Text file object to write to.
+            batch_size (int): Number of quadruples formatted per `write` call.
+        """
+        quadruples = self.quadruples
+        names = OperandNames(self.symbols.values)
+        for start in range(0, len(quadruples), batch_size):
+            output.write(''.join(format_quadruples(quadruples[start:start + batch_size], names)))
 
     def get_tac_code(self):
         """
@@ -40,165 +210,236 @@ class TACGenerator:
         Returns:
             str: Formatted TAC code as a string.
         """
-        tac_code = ""
-        for quad in self.quadruples:
-            op, arg1, arg2, result = quad
-            if op == ':=':
-                tac_code += f"{result} = {arg1}\n"
-            elif op in ['+', '-', '*', '/', 'and', 'or']:
-                tac_code += f"{result} = {arg1} {op} {arg2}\n"
-            elif op in ['<', '<=', '=', '<>', '>=', '>']:
-                tac_code += f"{result} = {arg1} {op} {arg2}\n"
-            elif op == 'ifgoto':
-                tac_code += f"if {arg1} goto {arg2}\n"
-            elif op == 'goto':
-                tac_code += f"goto {result}\n"
-            elif op == 'label':
-                tac_code += f"{result}:\n"
-            elif op == 'return':
-                tac_code += f"return {arg1}\n"
-            else:
-                raise ValueError(f"Unknown TAC operation: {op}")
-        return tac_code
+        return ''.join(format_quadruples(self.quadruples, OperandNames(self.symbols.values)))
 
     def generate_program_tac(self, program_node):
-        """Generates TAC for the entire program, including declarations and the main block."""
+        """Generates TAC for the entire program and returns it as a string."""
+        self.generate_program_quadruples(program_node)
+        return self.get_tac_code()
+
+    def generate_program_quadruples(self, program_node):
+        """
+        Generates the quadruples of the entire program, including declarations, the
+        main block and then the functions, without formatting them (see `write_tac`
+        and `get_tac_code`).
+        """
         self.reset_counters()
-        self.generate_decList_tac(program_node['decList'])
-        self.generate_block_tac(program_node['block'])
+        self.generate_decList_tac(program_node.decList)
+        self.generate_block_tac(program_node.block)
+        for funcDec in program_node.funcList:
+            self.generate_function_tac(funcDec)
 
-        return self.get_tac_code()
+    def generate_function_tac(self, funcDec):
+        """Function declaration: its entry, formal parameters, body and end."""
+        function = operand(FUNCTION, funcDec.id)
+        self.locals = funcDec.scope.declarations
+        self.quadruples.append(Opcode.FUNC, NONE, NONE, function)
+        for decs_node in funcDec.parameters:
+            for parameter in decs_node.varList:
+                self.quadruples.append(Opcode.FORMAL, NONE, NONE, operand(LOCAL, parameter))
+        self.generate_decList_tac(funcDec.decList)
+        self.generate_block_tac(funcDec.block)
+        self.quadruples.append(Opcode.ENDFUNC, NONE, NONE, function)
+        self.locals = {}
 
 
     def generate_decList_tac(self, decList_node):
         """Processes the list of declarations, if present."""
-        if not decList_node or decList_node['type'] == 'funcList' and decList_node.get('empty', False):
-            return
-        if decList_node['type'] == 'decList' and 'decs' in decList_node:
-            self.generate_decs_tac(decList_node['decs'])
-            self.generate_decList_tac(decList_node['decList'])
+        for decs_node in decList_node:
+            self.generate_decs_tac(decs_node)
 
 
     def generate_decs_tac(self, decs_node):
         """Processes individual variable declarations."""
-        if decs_node['type'] == 'decs' and decs_node.get('empty', False):
-            return
-        if decs_node['type'] == 'decs':
-            self.generate_varList_tac(decs_node['varList'])
+        self.generate_varList_tac(decs_node.varList)
 
 
     def generate_varList_tac(self, varList_node):
         """Processes a list of declared variables (no TAC needed for declarations)."""
-        if varList_node['type'] == 'varList':
-            if varList_node['varList']:
-                self.generate_varList_tac(varList_node['varList'])
-            pass # No TAC for declarations
+        pass # No TAC for declarations
 
 
     def generate_block_tac(self, block_node):
         """Processes a block of statements."""
-        if block_node['type'] == 'block':
-            self.generate_stmtList_tac(block_node['stmtList'])
+        self.generate_stmt_tac(block_node)
 
 
-    def generate_stmtList_tac(self, stmtList_node):
-        """Processes a list of statements recursively."""
-        if stmtList_node['type'] == 'stmtList':
-            if stmtList_node['stmtList']:
-                self.generate_stmtList_tac(stmtList_node['stmtList'])
-            self.generate_stmt_tac(stmtList_node['stmt'])
-
     def generate_stmt_tac(self, stmt_node):
-        """Processes an individual statement and generates the corresponding TAC instruction."""
-        if stmt_node['type'] == 'stmt':
-            stmt_type = stmt_node['stmtType']
-
-            # Assignment statement
-            if stmt_type == 'assign':
-                expr_result = self.generate_expr_tac(stmt_node['expr'])
-                var_name = stmt_node['id'][0]
-                self.quadruples.append((':=', expr_result, '_', var_name))
-
-            # If-then statement
-            elif stmt_type == 'if_then':
-                expr_result = self.generate_expr_tac(stmt_node['expr'])
-                label_true = self.generate_label()
-                label_end_if = self.generate_label()
-                self.quadruples.append(('ifgoto', expr_result, label_true, '_'))
-                self.quadruples.append(('goto', '_', '_', label_end_if))
-                self.quadruples.append(('label', '_', '_', label_true))
-                self.generate_stmt_tac(stmt_node['then_stmt'])
-                self.quadruples.append(('label', '_', '_', label_end_if))
-
-            # If-then-else statement
-            elif stmt_type == 'if_then_else':
-                expr_result = self.generate_expr_tac(stmt_node['expr'])
-                label_true = self.generate_label()
-                label_false = self.generate_label()
-                label_end_if = self.generate_label()
-                self.quadruples.append(('ifgoto', expr_result, label_true, '_'))
-                self.quadruples.append(('goto', '_', '_', label_false))
-                self.quadruples.append(('label', '_', '_', label_true))
-                self.generate_stmt_tac(stmt_node['then_stmt'])
-                self.quadruples.append(('goto', '_', '_', label_end_if))
-                self.quadruples.append(('label', '_', '_', label_false))
-                self.generate_stmt_tac(stmt_node['else_stmt'])
-                self.quadruples.append(('label', '_', '_', label_end_if))
-
-            # While loop
-            elif stmt_type == 'while':
-                label_start_while = self.generate_label()
-                label_loop_body = self.generate_label() 
-                label_end_while = self.generate_label()
-                self.quadruples.append(('label', '_', '_', label_start_while)) 
-                expr_result = self.generate_expr_tac(stmt_node['expr'])
-                self.quadruples.append(('ifgoto', expr_result, label_loop_body, '_'))
-                self.quadruples.append(('goto', '_', '_', label_end_while))
-                self.quadruples.append(('label', '_', '_', label_loop_body))
-                self.generate_stmt_tac(stmt_node['stmt'])
-                self.quadruples.append(('goto', '_', '_', label_start_while))
-                self.quadruples.append(('label', '_', '_', label_end_while))
-            
-            # Return statement
-            elif stmt_type == 'return':
-                expr_result = self.generate_expr_tac(stmt_node['expr'])
-                self.quadruples.append(('return', expr_result, '_', '_'))
-            
-            # Block statement (nested scope)
-            elif stmt_type == 'block':
-                self.generate_block_tac(stmt_node['block'])
+        """
+        Processes a statement and everything nested in it with an explicit work stack.
+
+        The stack holds statements still to be generated and quadruples to emit once
+        the statements pushed above them are done. Statement generators emit their
+        leading quadruples right away and push the rest, so the output (including
+        temp and label numbering) is the same as a recursive walk, but the depth of
+        Python calls no longer grows with the length of statement lists or nesting.
+        """
+        work = [stmt_node]  # Statements are pushed last-to-first so they pop in source order.
+        quadruples = self.quadruples
+        stmt_generators = self.stmt_generators
+        while work:
+            item = work.pop()
+            if type(item) is tuple:
+                quadruples.append(*item)
+                continue
+            generator = stmt_generators.get(type(item))
+            if generator:
+                generator(item, work)
+
+    def generate_block_stmt_tac(self, stmt_node, work):
+        """Block statement (nested scope)."""
+        work.extend(reversed(stmt_node.stmtList))
+
+    def generate_assign_tac(self, stmt_node, work):
+        """Assignment statement."""
+        expr_result = self.generate_expr_tac(stmt_node.expr)
+        var_name = self.variable(stmt_node.id)
+        self.quadruples.append(Opcode.COPY, expr_result, NONE, var_name)
+
+    def generate_if_then_tac(self, stmt_node, work):
+        """If-then statement."""
+        expr_result = self.generate_expr_tac(stmt_node.expr)
+        label_true = self.generate_label()
+        label_end_if = self.generate_label()
+        self.quadruples.append(Opcode.IFGOTO, expr_result, label_true)
+        self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end_if)
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_true)
+        work.append((Opcode.LABEL, NONE, NONE, label_end_if))
+        work.append(stmt_node.then_stmt)
+
+    def generate_if_then_else_tac(self, stmt_node, work):
+        """If-then-else statement."""
+        expr_result = self.generate_expr_tac(stmt_node.expr)
+        label_true = self.generate_label()
+        label_false = self.generate_label()
+        label_end_if = self.generate_label()
+        self.quadruples.append(Opcode.IFGOTO, expr_result, label_true)
+        self.quadruples.append(Opcode.GOTO, NONE, NONE, label_false)
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_true)
+        work.append((Opcode.LABEL, NONE, NONE, label_end_if))
+        work.append(stmt_node.else_stmt)
+        work.append((Opcode.LABEL, NONE, NONE, label_false))
+        work.append((Opcode.GOTO, NONE, NONE, label_end_if))
+        work.append(stmt_node.then_stmt)
+
+    def generate_while_tac(self, stmt_node, work):
+        """While loop."""
+        label_start_while = self.generate_label()
+        label_loop_body = self.generate_label()
+        label_end_while = self.generate_label()
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_start_while)
+        expr_result = self.generate_expr_tac(stmt_node.expr)
+        self.quadruples.append(Opcode.IFGOTO, expr_result, label_loop_body)
+        self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end_while)
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_loop_body)
+        work.append((Opcode.LABEL, NONE, NONE, label_end_while))
+        work.append((Opcode.GOTO, NONE, NONE, label_start_while))
+        work.append(stmt_node.stmt)
+
+    def generate_for_tac(self, stmt_node, work):
+        """
+        For loop. Both bounds are evaluated once, before the loop (a variable bound is
+        copied into a temp, so the body cannot change it), and the loop variable is
+        incremented by the statement `id := id + 1` after the body.
+        """
+        start_result = self.generate_expr_tac(stmt_node.start_expr)
+        if operand_kind(start_result) == VAR and contains_call(stmt_node.end_expr):
+            start = self.generate_temp_var()     # The call may assign the variable.
+            self.quadruples.append(Opcode.COPY, start_result, NONE, start)
+            start_result = start
+        end_result = self.generate_expr_tac(stmt_node.end_expr)
+        if operand_kind(end_result) in (VAR, LOCAL):
+            bound = self.generate_temp_var()
+            self.quadruples.append(Opcode.COPY, end_result, NONE, bound)
+            end_result = bound
+        var_name = self.variable(stmt_node.id)
+        self.quadruples.append(Opcode.COPY, start_result, NONE, var_name)
+
+        label_start_for = self.generate_label()
+        label_loop_body = self.generate_label()
+        label_end_for = self.generate_label()
+        condition = self.generate_temp_var()
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_start_for)
+        self.quadruples.append(Opcode.LE, var_name, end_result, condition)
+        self.quadruples.append(Opcode.IFGOTO, condition, label_loop_body)
+        self.quadruples.append(Opcode.GOTO, NONE, NONE, label_end_for)
+        self.quadruples.append(Opcode.LABEL, NONE, NONE, label_loop_body)
+        one = Literal('integer', self.symbols.integer(1))
+        work.append((Opcode.LABEL, NONE, NONE, label_end_for))
+        work.append((Opcode.GOTO, NONE, NONE, label_start_for))
+        work.append(Assign(stmt_node.id, BinaryOp('+', Id(stmt_node.id), one)))
+        work.append(stmt_node.stmt)
+
+    def generate_return_tac(self, stmt_node, work):
+        """Return statement."""
+        expr_result = self.generate_expr_tac(stmt_node.expr)
+        self.quadruples.append(Opcode.RETURN, expr_result)
 
 
     def generate_expr_tac(self, expr_node):
-        """Processes an expression and generates TAC for it."""
-        if expr_node['type'] == 'expr':
-            expr_type = expr_node['exprType']
-
-            # Binary operations
-            if expr_type == 'binary_op':
-                left_result = self.generate_expr_tac(expr_node['left'])
-                right_result = self.generate_expr_tac(expr_node['right'])
-                temp_var = self.generate_temp_var()
-                self.quadruples.append((expr_node['op'], left_result, right_result, temp_var))
-                return temp_var
-
-            # Relational operations
-            elif expr_type == 'rel_op':
-                left_result = self.generate_expr_tac(expr_node['left'])
-                right_result = self.generate_expr_tac(expr_node['right'])
-                temp_var = self.generate_temp_var()
-                self.quadruples.append((expr_node['op'], left_result, right_result, temp_var))
-                return temp_var
-
-            # Literals
-            elif expr_type == 'literal':
-                temp_var = self.generate_temp_var()
-                literal_value = expr_node['value'][0] if isinstance(expr_node['value'], tuple) else expr_node['value']
-                self.quadruples.append((':=', literal_value, '_', temp_var))
-                return temp_var
-
-            # Identifiers
-            elif expr_type == 'id':
-                return expr_node['id'][0]
-
-        return None
\ No newline at end of file
+        """
+        Processes an expression in post-order with an explicit stack and returns the
+        operand handle of its value (a temp or variable).
+
+        Operation nodes are visited twice: first to push their operands (right below
+        left, so the left operand is generated first), then, marked as expanded, to
+        combine the two operand holders into a new temp. Function calls are visited
+        the same way: their arguments first, then the `param` quadruples and the call.
+        Leaves are dispatched to the `expr_generators` table; unsupported expressions
+        yield the NONE operand.
+        """
+        quadruples = self.quadruples
+        expr_generators = self.expr_generators
+        values = []
+        stack = [(expr_node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if type(node) in self.operation_nodes:
+                if expanded:
+                    right_result = values.pop()
+                    left_result = values.pop()
+                    temp_var = self.generate_temp_var()
+                    quadruples.append(OPERATORS[node.op], left_result, right_result, temp_var)
+                    values.append(temp_var)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif type(node) is FunctionCall:
+                if expanded:
+                    count = len(node.actualParamList)
+                    arguments = values[len(values) - count:]
+                    del values[len(values) - count:]
+                    # The call may assign program variables, so the ones already read as
+                    # operands of the enclosing operations are copied before it.
+                    for position, value in enumerate(values):
+                        if operand_kind(value) == VAR:
+                            temp_var = self.generate_temp_var()
+                            quadruples.append(Opcode.COPY, value, NONE, temp_var)
+                            values[position] = temp_var
+                    for argument in arguments:
+                        quadruples.append(Opcode.PARAM, argument)
+                    temp_var = self.generate_temp_var()
+                    quadruples.append(Opcode.CALL, operand(FUNCTION, node.id),
+                                      operand(CONST, self.symbols.integer(count)), temp_var)
+                    values.append(temp_var)
+                else:
+                    stack.append((node, True))
+                    stack.extend((argument, False) for argument in reversed(node.actualParamList))
+            else:
+                generator = expr_generators.get(type(node))
+                values.append(generator(node) if generator else NONE)
+        return values.pop()
+
+    def generate_literal_tac(self, expr_node):
+        """Literals."""
+        literal = operand(CONST, expr_node.value)
+        if not self.copy_literals:
+            return literal
+        temp_var = self.generate_temp_var()
+        self.quadruples.append(Opcode.COPY, literal, NONE, temp_var)
+        return temp_var
+
+    def generate_id_tac(self, expr_node):
+        """Identifiers."""
+        return self.variable(expr_node.id)
@@ -0,0 +1,374 @@
+"""
+Incremental compilation: the TAC of the units of a program that did not change
+since an earlier compilation is read from an on-disk cache instead of being
+lexed, parsed and generated again.
+
+A program is cut into units at its `function`, `begin` and `end` keywords,
+found in the source text: the header (`program id ;` and the global
+declarations), every function declaration and the main block. Each function and
+the main block is keyed by a hash of its text together with the header, the
+grammar (see tableCache.py), the sources of the passes producing its TAC and
+the `-O` setting. The units missing from the cache are lexed where they stand
+(keeping their positions and line numbers in the file) and parsed at once, as a
+program made of the header, those functions and the main block (or an empty
+one); their TAC is generated unit by unit and saved. The header is lexed and
+parsed even when every unit is cached, to declare the globals.
+
+A cached unit holds its quadruples in a relocatable form: temps and labels are
+numbered from zero within the unit, and identifiers and literals are indexes
+into a table of their names and values, interned again into the symbol table
+of the compilation loading them. The TAC generator numbers temps and labels
+continuously through the main block and then the functions, so shifting each
+unit by the temps and labels of the units before it gives exactly the TAC of
+a full compilation.
+
+With `-O`, the units are constant folded (which never looks across units)
+before their TAC is generated; the TAC passes then run over the whole program.
+
+Usage:
+    python compileCache.py SOURCE [--cache DIR] [-O]   (compiles SOURCE to SOURCE.tac, reporting the units reused)
+"""
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+from array import array
+
+import ply.lex as lex
+
+import tableCache
+from codeGenerator import TACGenerator
+from lexer import Lexer
+from parser import Parser, TooManyErrors
+from quadStore import QuadStore, NONE, TEMP, LABEL, VAR, CONST, FUNCTION, LOCAL, KIND_MASK, operand
+from symbolTable import SymbolTable
+
+# Bump when the layout of a cached unit changes.
+CACHE_VERSION = 1
+
+# Modules whose code shapes the TAC of a unit.
+GENERATOR_SOURCES = ('astNodes.py', 'codeGenerator.py', 'constantFolder.py', 'lexer.py', 'parser.py', 'quadStore.py',
+                     'symbolTable.py')
+# Operand kinds stored as indexes into the name table of a unit.
+NAME_KINDS = (VAR, CONST, FUNCTION, LOCAL)
+# Keywords delimiting the units; the language has no comments or strings, so every match is a token.
+UNIT_KEYWORDS = re.compile(r'\b(?:function|begin|end)\b')
+# A keyword right after a number is a token of its own but no word boundary: such programs are not split.
+GLUED_KEYWORDS = re.compile(r'\d(?:function|begin|end)\b')
+
+
+def generator_hash():
+    """Returns a short digest of the sources in `GENERATOR_SOURCES`."""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in GENERATOR_SOURCES:
+        with open(os.path.join(here, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def split_units(source):
+    """
+    Cuts the source text of a program into its header, functions and main block.
+
+    Args:
+        source (str): Text of a whole program.
+
+    Returns:
+        tuple: (end of the header, list of (start, end) of every function, (start, end) of the main
+        block), or None when the text does not have that shape (the program is then compiled as a whole).
+    """
+    if GLUED_KEYWORDS.search(source):
+        return None
+    header, functions, start, depth = None, [], None, 0
+    for match in UNIT_KEYWORDS.finditer(source):
+        keyword = match.group()
+        if header is None:
+            header = match.start()
+        if start is None:
+            start = match.start()
+        if keyword == 'begin':
+            depth += 1
+        elif keyword == 'end':
+            depth -= 1
+            if depth < 0:
+                return None
+            if not depth:
+                if source.startswith('begin', start):
+                    return header, functions, (start, len(source))  # Text after the main block stays in it.
+                functions.append((start, match.end()))
+                start = None
+        elif depth:
+            return None     # A function declared inside a block.
+    return None
+
+
+class Unit:
+    """
+    TAC of one function or main block in relocatable form.
+
+    Attributes:
+        names (list): (symbol kind, key) of the identifiers and literals used by the quadruples.
+        quadruples (QuadStore): Quadruples whose temps and labels are numbered within the unit,
+            and whose other operands index `names`.
+        temps, labels (int): Temps and labels numbered by the unit.
+        function (str): Name of the function, None for the main block.
+        declarations (list): (name, type) of the parameters and locals of the function.
+    """
+    __slots__ = ('names', 'quadruples', 'temps', 'labels', 'function', 'declarations')
+
+    def __init__(self, names, quadruples, temps, labels, function=None, declarations=()):
+        self.names = names
+        self.quadruples = quadruples
+        self.temps = temps
+        self.labels = labels
+        self.function = function
+        self.declarations = declarations
+
+    @classmethod
+    def from_quadruples(cls, quadruples, symbols, temps, labels, function=None, declarations=()):
+        """Builds a unit from quadruples whose temps and labels start from zero."""
+        names, remap, reals = [], {}, None
+        for column in quadruples.columns()[1:]:
+            for handle in set(column):
+                kind = handle & KIND_MASK
+                if kind not in NAME_KINDS or handle in remap:
+                    continue
+                symbol = handle >> 3
+                symbol_kind, value = symbols.kinds[symbol], symbols.values[symbol]
+                if symbol_kind == SymbolTable.REAL:     # Keyed by its source text.
+                    if reals is None:
+                        reals = {real: text for text, real in symbols.pools[SymbolTable.REAL].items()}
+                    value = reals[symbol]
+                remap[handle] = operand(kind, len(names))
+                names.append((symbol_kind, value))
+        relocatable = quadruples[:]
+        for column in relocatable.columns()[1:]:
+            column[:] = array('i', (remap.get(handle, handle) for handle in column))
+        return cls(names, relocatable, temps, labels, function, declarations)
+
+    def relocate(self, symbols, temp_offset, label_offset, output):
+        """Appends the quadruples of the unit to `output`, shifted and interned into `symbols`."""
+        handles = [symbols.intern(kind, value, float(value) if kind == SymbolTable.REAL else value)
+                   for kind, value in self.names]
+        shifts = {NONE: 0, TEMP: temp_offset << 3, LABEL: label_offset << 3}
+        opcodes, *columns = self.quadruples.columns()
+        output.opcodes.extend(opcodes)
+        for column, target in zip(columns, output.columns()[1:]):
+            remap = {}
+            for handle in set(column):
+                kind = handle & KIND_MASK
+                remap[handle] = operand(kind, handles[handle >> 3]) if kind in NAME_KINDS else handle + shifts[kind]
+            target.extend(map(remap.__getitem__, column))
+
+    def to_tuple(self):
+        """Returns the fields of the unit as saved in the cache, the quadruples serialized."""
+        return (self.names, self.quadruples.to_bytes(), self.temps, self.labels, self.function, self.declarations)
+
+    @classmethod
+    def from_tuple(cls, fields):
+        """Builds a unit from the fields returned by `to_tuple`."""
+        names, data, temps, labels, function, declarations = fields
+        return cls(names, QuadStore.from_bytes(data), temps, labels, function, declarations)
+
+
+class IncrementalCompiler:
+    """
+    Compiles programs to TAC, reusing the units cached by earlier compilations.
+
+    Attributes:
+        parser (Parser): Parser (and lexer and symbol table) of the compilations.
+        optimizer (Optimizer): Folds the units when given (`-O`); its TAC passes are left to the caller.
+        directory (str): Cache directory of this grammar and generator.
+        local_types (dict): FUNCTION operand handle -> declarations of the function, for the last program.
+        stats (dict): Units of the last program: 'units', 'reused' and 'compiled'.
+    """
+
+    def __init__(self, parser, root, optimizer=None):
+        """
+        Args:
+            parser (Parser): Parser used for the programs.
+            root (str): Root directory of the cache (created when needed).
+            optimizer (Optimizer, optional): Optimizer folding the units (`-O`).
+        """
+        self.parser = parser
+        self.optimizer = optimizer
+        self.directory = os.path.join(root, f'v{CACHE_VERSION}-{tableCache.grammar_hash(Lexer, Parser)}'
+                                            f'-{generator_hash()}')
+        self.local_types = {}
+        self.stats = {}
+
+    def compile_file(self, path):
+        """
+        Compiles a source file.
+
+        Returns:
+            QuadStore: The TAC of the program, or None when it could not be parsed.
+        """
+        with open(path, 'r') as source:
+            return self.compile(source.read())
+
+    def compile(self, source):
+        """Compiles a source text (see `compile_file`)."""
+        symbols = self.parser.symbol_table
+        self.parser.reset()
+        self.local_types = {}
+        self.stats = {'units': 0, 'reused': 0, 'compiled': 0}
+        units = split_units(source)
+        if units is None:
+            return self.compile_whole(source)
+        header, functions, main = units
+        prefix = hashlib.sha256(f'{int(self.optimizer is not None)}\0{source[:header]}\1'.encode())
+
+        # The main block comes first, as in the TAC of the whole program.
+        spans = [main] + functions
+        keys, cached, missing = [], [], []
+        for start, end in spans:
+            digest = prefix.copy()
+            digest.update(source[start:end].encode())
+            key = digest.hexdigest()
+            unit = self.load(key)
+            keys.append(key)
+            cached.append(unit)
+            if unit is None:
+                missing.append(len(cached) - 1)
+        self.stats.update(units=len(spans), reused=len(spans) - len(missing), compiled=len(missing))
+
+        # The header is always parsed, declaring the global variables.
+        main_missing = bool(missing) and missing[0] == 0
+        program = self.parse_units(source, header, [spans[index] for index in missing[main_missing:]],
+                                   main if main_missing else None)
+        if program is None:
+            return None
+        generated = ([program.block] if main_missing else []) + program.funcList
+        for index, node in zip(missing, generated):
+            cached[index] = unit = self.generate_unit(node, index > 0)
+            self.save(keys[index], unit)
+
+        output, temps, labels = QuadStore(), 0, 0
+        for unit in cached:
+            unit.relocate(symbols, temps, labels, output)
+            temps += unit.temps
+            labels += unit.labels
+            if unit.function is not None:
+                self.local_types[operand(FUNCTION, symbols.identifier(unit.function))] = {
+                    symbols.identifier(name): type_name for name, type_name in unit.declarations}
+        if self.optimizer:
+            self.optimizer.loops.local_types = self.local_types
+        return output
+
+    def compile_whole(self, source):
+        """Parses and generates a program that cannot be cut into units, without the cache."""
+        program = self.parser.parse(source)
+        if program is None:
+            return None
+        if self.optimizer:
+            self.optimizer.optimize_program(program)
+            self.local_types = self.optimizer.loops.local_types
+        tacgenerator = TACGenerator(self.parser.symbol_table, copy_literals=self.optimizer is None)
+        tacgenerator.generate_program_quadruples(program)
+        return tacgenerator.quadruples
+
+    def parse_units(self, source, header, functions, main):
+        """
+        Lexes and parses units as one program: the header, the functions and the main block,
+        or an empty main block when it is not among them.
+
+        Args:
+            source (str): Text of the program.
+            header (int): End of the header.
+            functions (list): (start, end) of the functions to parse.
+            main (tuple): (start, end) of the main block, or None.
+
+        Returns:
+            Program: The AST (functions in the order of `functions`), or None on lexical or
+                syntax errors.
+        """
+        lexer = self.parser.lexer
+        try:
+            tokens = lexer.tokenize(source[:header])
+            line, position = 1, 0
+            for start, end in functions + ([main] if main else []):
+                # Line numbers and positions stay the ones of the whole file.
+                line += source.count('\n', position, start)
+                position = start
+                lexer.lexer.lineno = line
+                tokens.extend(lexer.iter_tokens(source[start:end], start))
+        except TooManyErrors:
+            return None
+        if not main:
+            tokens.extend(self.empty_block(len(source)))
+        program = self.parser.parse_tokens(tokens)
+        if program is not None and self.optimizer:
+            self.optimizer.folder.fold_program(program)
+        return program
+
+    def empty_block(self, position):
+        """Returns the tokens of `begin return 0; end`, placed at the end of the program."""
+        symbols, tokens = self.parser.symbol_table, []
+        for kind, value in (('BEGIN_KW', 'begin'), ('RETURN_KW', 'return'),
+                            ('INTEGER_NUMBER', symbols.integer(0)), ('SEMICOLON', ';'), ('END_KW', 'end')):
+            token = lex.LexToken()
+            token.type, token.value, token.lineno, token.lexpos = kind, value, self.parser.lexer.lexer.lineno, position
+            tokens.append(token)
+        return tokens
+
+    def generate_unit(self, node, function):
+        """Generates the TAC of a main block or function declaration, numbered from zero."""
+        symbols = self.parser.symbol_table
+        tacgenerator = TACGenerator(symbols, copy_literals=self.optimizer is None)
+        if function:
+            tacgenerator.generate_function_tac(node)
+            declarations = [(symbols.values[handle], type_name)
+                            for handle, type_name in node.scope.declarations.items()]
+            name = symbols.values[node.id]
+        else:
+            tacgenerator.generate_block_tac(node)
+            declarations, name = (), None
+        return Unit.from_quadruples(tacgenerator.quadruples, symbols, tacgenerator.temp_var_counter,
+                                    tacgenerator.label_counter, name, declarations)
+
+    def load(self, key):
+        """Returns the cached unit of a key, or None."""
+        try:
+            with open(os.path.join(self.directory, key + '.pickle'), 'rb') as file:
+                return Unit.from_tuple(pickle.load(file))
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return None
+
+    def save(self, key, unit):
+        """Writes a unit to the cache (atomically, so concurrent compilations never read half a file)."""
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as file:
+            pickle.dump(unit.to_tuple(), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, os.path.join(self.directory, key + '.pickle'))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from optimizer import Optimizer
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('source', help='source file')
+    arguments.add_argument('--cache', default='.tac-cache', metavar='DIR', help='cache directory (default: .tac-cache)')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='optimize the AST and the TAC')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    optimizer = Optimizer(parser.symbol_table) if args.optimize else None
+    compiler = IncrementalCompiler(parser, args.cache, optimizer)
+    quadruples = compiler.compile_file(args.source)
+    if quadruples is None:
+        for diagnostic in parser.diagnostics:
+            print(diagnostic)
+        print('Parsing failed, no TAC generated.')
+    else:
+        tacgenerator = TACGenerator(parser.symbol_table)
+        tacgenerator.quadruples = optimizer.optimize_quadruples(quadruples) if optimizer else quadruples
+        with open(args.source + '.tac', 'w') as output:
+            tacgenerator.write_tac(output)
+        print(f"{compiler.stats['units']} units, {compiler.stats['reused']} reused, "
+              f"{compiler.stats['compiled']} compiled")
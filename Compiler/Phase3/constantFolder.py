@@ -0,0 +1,340 @@
+"""
+Constant folding pass over the Phase 3 AST, run between the parser and the TAC generator.
+
+The pass
+    - folds operations whose operands are literals (`2 * 3` → `6`, `1 < 2` → `true`),
+    - propagates literal assignments (`num := 61; ... num / 2` → `61 / 2` → `30`),
+    - applies identities (`x * 1`, `x + 0`, `x - 0`, `x / 1`, `true and e`, `false or e`, ...),
+    - replaces `if` statements with a literal condition by the branch taken, and drops
+      `while false` loops.
+
+Folding follows the literal types the parser tags: integer operations stay
+integers (integer division truncates towards zero), any real operand makes the
+result real, and relational operations give booleans. Operations that would
+fail at run time (division by zero) and operands of mismatched types are left
+alone. Expressions that call a function are never propagated into, and since a
+function may assign any variable, all known values are forgotten after them.
+"""
+import math
+
+from astNodes import (Block, Assign, IfThen, IfThenElse, While, For, Return, BinaryOp, RelOp, Literal, Id,
+                      FunctionCall)
+
+NUMERIC = ('integer', 'real')
+
+
+class ConstantFolder:
+    """
+    Folds constants in an AST in place.
+
+    Attributes:
+        symbols (SymbolTable): The parser's SymbolTable; folded literals are interned in it.
+        folded (int): Number of operations replaced by their literal value.
+        propagated (int): Number of variable uses replaced by a known literal.
+        simplified (int): Number of operations removed by an identity.
+        pruned (int): Number of `if`/`while` statements resolved at compile time.
+    """
+
+    def __init__(self, symbol_table):
+        self.symbols = symbol_table
+        self.folded = self.propagated = self.simplified = self.pruned = 0
+
+        # Dispatch table: statement node class -> folding method.
+        self.stmt_folders = {
+            Assign: self.fold_assign,
+            IfThen: self.fold_if_then,
+            IfThenElse: self.fold_if_then_else,
+            While: self.fold_while,
+            For: self.fold_for,
+            Return: self.fold_return,
+            Block: self.fold_block,
+        }
+
+    def fold_program(self, program):
+        """
+        Folds the main block and every function body of a program.
+
+        Args:
+            program (Program): AST built by the parser; it is modified in place.
+
+        Returns:
+            Program: The same program.
+        """
+        for funcDec in program.funcList:
+            funcDec.block = self.fold_stmt(funcDec.block, {})
+        program.block = self.fold_stmt(program.block, {})
+        return program
+
+    def fold_stmt(self, stmt_node, known):
+        """
+        Folds a statement.
+
+        Args:
+            stmt_node (Node): The statement.
+            known (dict): Variable handle -> Literal known to be its value before the
+                statement; updated to the values known after it.
+
+        Returns:
+            Node: The folded statement (possibly a different node, or an empty Block).
+        """
+        folder = self.stmt_folders.get(type(stmt_node))
+        return folder(stmt_node, known) if folder else stmt_node
+
+    def fold_block(self, stmt_node, known):
+        """Folds the statements of a block, dropping the ones folded away."""
+        stmtList = []
+        for stmt in stmt_node.stmtList:
+            stmt = self.fold_stmt(stmt, known)
+            if type(stmt) is not Block or stmt.stmtList:
+                stmtList.append(stmt)
+        stmt_node.stmtList = stmtList
+        return stmt_node
+
+    def fold_assign(self, stmt_node, known):
+        stmt_node.expr = self.fold_stmt_expr(stmt_node.expr, known)
+        if type(stmt_node.expr) is Literal:
+            known[stmt_node.id] = stmt_node.expr
+        else:
+            known.pop(stmt_node.id, None)
+        return stmt_node
+
+    def fold_if_then(self, stmt_node, known):
+        stmt_node.expr = self.fold_stmt_expr(stmt_node.expr, known)
+        taken = self.literal_condition(stmt_node.expr)
+        if taken is not None:
+            self.pruned += 1
+            return self.fold_stmt(stmt_node.then_stmt, known) if taken else Block([])
+
+        then_known = dict(known)
+        stmt_node.then_stmt = self.fold_stmt(stmt_node.then_stmt, then_known)
+        self.join(known, then_known)
+        return stmt_node
+
+    def fold_if_then_else(self, stmt_node, known):
+        stmt_node.expr = self.fold_stmt_expr(stmt_node.expr, known)
+        taken = self.literal_condition(stmt_node.expr)
+        if taken is not None:
+            self.pruned += 1
+            return self.fold_stmt(stmt_node.then_stmt if taken else stmt_node.else_stmt, known)
+
+        then_known = dict(known)
+        stmt_node.then_stmt = self.fold_stmt(stmt_node.then_stmt, then_known)
+        stmt_node.else_stmt = self.fold_stmt(stmt_node.else_stmt, known)
+        self.join(known, then_known)
+        return stmt_node
+
+    def fold_while(self, stmt_node, known):
+        # The condition and body run again after the body, so nothing the body assigns is known.
+        self.forget_assigned(stmt_node, known)
+        stmt_node.expr = self.fold_stmt_expr(stmt_node.expr, known)
+        if self.literal_condition(stmt_node.expr) is False:
+            self.pruned += 1
+            return Block([])
+
+        stmt_node.stmt = self.fold_stmt(stmt_node.stmt, dict(known))
+        return stmt_node
+
+    def fold_for(self, stmt_node, known):
+        stmt_node.start_expr = self.fold_stmt_expr(stmt_node.start_expr, known)
+        stmt_node.end_expr = self.fold_stmt_expr(stmt_node.end_expr, known)
+        self.forget_assigned(stmt_node, known)
+        stmt_node.stmt = self.fold_stmt(stmt_node.stmt, dict(known))
+        return stmt_node
+
+    def fold_return(self, stmt_node, known):
+        stmt_node.expr = self.fold_stmt_expr(stmt_node.expr, known)
+        return stmt_node
+
+    def fold_stmt_expr(self, expr_node, known):
+        """
+        Folds an expression evaluated by a statement, propagating the known values
+        into it unless it calls a function (after which nothing is known any more).
+        """
+        if contains_call(expr_node):
+            expr_node = self.fold_expr(expr_node, {})
+            known.clear()
+            return expr_node
+        return self.fold_expr(expr_node, known)
+
+    @staticmethod
+    def join(known, other):
+        """Keeps in `known` only the values that `other` (the other branch) agrees on."""
+        for handle, literal in list(known.items()):
+            if other.get(handle) != literal:
+                del known[handle]
+
+    @staticmethod
+    def forget_assigned(stmt_node, known):
+        """Forgets the values of the variables a statement may assign."""
+        assigned, calls = assigned_variables(stmt_node)
+        if calls:
+            known.clear()
+        for handle in assigned:
+            known.pop(handle, None)
+
+    def literal_condition(self, expr_node):
+        """Returns the value of a boolean literal condition, or None if it is not one."""
+        if type(expr_node) is Literal and expr_node.literalType == 'boolean':
+            return self.symbols.values[expr_node.value]
+        return None
+
+    def fold_expr(self, expr_node, known):
+        """
+        Folds an expression in post-order with an explicit stack (like
+        `TACGenerator.generate_expr_tac`) and returns the folded expression.
+
+        Args:
+            expr_node (Node): The expression.
+            known (dict): Variable handle -> Literal of the values to propagate.
+        """
+        values = []     # (folded node, whether it is free of function calls)
+        stack = [(expr_node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            node_type = type(node)
+            if node_type is BinaryOp or node_type is RelOp:
+                if expanded:
+                    right, right_pure = values.pop()
+                    left, left_pure = values.pop()
+                    node.left, node.right = left, right
+                    values.append((self.fold_operation(node, left_pure, right_pure), left_pure and right_pure))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is Id:
+                literal = known.get(node.id)
+                if literal is not None:
+                    self.propagated += 1
+                    node = literal
+                values.append((node, True))
+            elif node_type is FunctionCall:
+                node.actualParamList = [self.fold_expr(argument, {}) for argument in node.actualParamList]
+                values.append((node, False))
+            else:
+                values.append((node, True))
+        return values.pop()[0]
+
+    def fold_operation(self, node, left_pure, right_pure):
+        """Returns the folded form of an operation whose operands are already folded."""
+        left, right = node.left, node.right
+        left_literal, right_literal = type(left) is Literal, type(right) is Literal
+        if left_literal and right_literal:
+            literal = self.evaluate(node.op, left, right)
+            if literal is not None:
+                self.folded += 1
+                return literal
+            return node
+
+        op = node.op
+        if right_literal:
+            value, literalType, other, other_pure = self.symbols.values[right.value], right.literalType, left, left_pure
+        elif left_literal:
+            value, literalType, other, other_pure = self.symbols.values[left.value], left.literalType, right, right_pure
+            if op == '-' or op == '/':
+                return node     # 0 - x and 1 / x are not identities.
+        else:
+            return node
+
+        if literalType == 'integer':
+            identity = (op == '+' or op == '-') and value == 0 or (op == '*' or op == '/') and value == 1
+            if identity:
+                self.simplified += 1
+                return other
+        elif literalType == 'boolean' and (op == 'and' or op == 'or'):
+            if (op == 'and') == value:      # true and e, false or e
+                self.simplified += 1
+                return other
+            if other_pure:                  # false and e, true or e
+                self.simplified += 1
+                return left if left_literal else right
+        return node
+
+    def evaluate(self, op, left, right):
+        """
+        Computes an operation on two literals.
+
+        Returns:
+            Literal: The result, or None if the operation cannot be folded.
+        """
+        symbols = self.symbols
+        a, b = symbols.values[left.value], symbols.values[right.value]
+        types = (left.literalType, right.literalType)
+
+        if op in ('and', 'or'):
+            if types != ('boolean', 'boolean'):
+                return None
+            return Literal('boolean', symbols.boolean(a and b if op == 'and' else a or b))
+
+        if op in ('=', '<>') and types == ('boolean', 'boolean'):
+            return Literal('boolean', symbols.boolean((a == b) == (op == '=')))
+        if types[0] not in NUMERIC or types[1] not in NUMERIC:
+            return None
+
+        if op in ('<', '<=', '=', '<>', '>=', '>'):
+            result = {'<': a < b, '<=': a <= b, '=': a == b, '<>': a != b, '>=': a >= b, '>': a > b}[op]
+            return Literal('boolean', symbols.boolean(result))
+
+        if op == '/' and b == 0:
+            return None
+        if types == ('integer', 'integer'):
+            if op == '/':
+                result = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)     # Truncates towards zero.
+            else:
+                result = a + b if op == '+' else a - b if op == '-' else a * b
+            return Literal('integer', symbols.integer(result))
+
+        result = a + b if op == '+' else a - b if op == '-' else a * b if op == '*' else a / b
+        if not math.isfinite(result):
+            return None
+        return Literal('real', symbols.real(repr(float(result))))
+
+
+def contains_call(expr_node):
+    """Returns whether an expression calls a function."""
+    stack = [expr_node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is FunctionCall:
+            return True
+        if node_type is BinaryOp or node_type is RelOp:
+            stack.append(node.left)
+            stack.append(node.right)
+    return False
+
+
+def assigned_variables(stmt_node):
+    """
+    Returns the variables a statement may assign, and whether it calls a function.
+
+    Returns:
+        tuple: (set of variable handles, bool).
+    """
+    assigned, calls = set(), False
+    stack = [stmt_node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is Assign:
+            assigned.add(node.id)
+            calls = calls or contains_call(node.expr)
+        elif node_type is For:
+            assigned.add(node.id)
+            calls = calls or contains_call(node.start_expr) or contains_call(node.end_expr)
+            stack.append(node.stmt)
+        elif node_type is IfThen:
+            calls = calls or contains_call(node.expr)
+            stack.append(node.then_stmt)
+        elif node_type is IfThenElse:
+            calls = calls or contains_call(node.expr)
+            stack.append(node.then_stmt)
+            stack.append(node.else_stmt)
+        elif node_type is While:
+            calls = calls or contains_call(node.expr)
+            stack.append(node.stmt)
+        elif node_type is Return:
+            calls = calls or contains_call(node.expr)
+        elif node_type is Block:
+            stack.extend(node.stmtList)
+    return assigned, calls
@@ -0,0 +1,388 @@
+"""
+Basic blocks, control flow graph, dominators and loops of TAC quadruples.
+
+A basic block starts at the first quadruple, at every label and function entry
+and after every jump, return or function end, and ends before the next such
+leader. The graph has an edge from a block to every block it can continue into:
+the target of its final `goto`, the target and the fall-through of a final
+`if`/`ifFalse ... goto`, and the next block when it does not end in a jump or
+return and is not the entry of a function. Calls do not end blocks: control
+comes back after them, so each function is a separate part of the graph with
+its own entry.
+
+Dominators are computed with the iterative algorithm of Cooper, Harvey and
+Kennedy ("A Simple, Fast Dominance Algorithm") over the reverse postorder, and
+loops are the natural loops of the back edges (edges into a dominator).
+
+Usage:
+    python controlFlowGraph.py [SOURCE] [-O]   (default: input.txt)
+"""
+from array import array
+from bisect import bisect_right
+
+from quadStore import Opcode, NONE
+
+# Opcodes after which control does not fall through to the next quadruple.
+UNCONDITIONAL = (Opcode.GOTO, Opcode.RETURN, Opcode.ENDFUNC)
+# Opcodes that end a basic block.
+TERMINATORS = (Opcode.GOTO, Opcode.IFGOTO, Opcode.IFFALSE, Opcode.RETURN, Opcode.ENDFUNC)
+
+
+class BasicBlock:
+    """
+    A maximal run of quadruples entered only at its first and left only after its last.
+
+    Attributes:
+        index (int): Position of the block in `ControlFlowGraph.blocks`.
+        start, end (int): The block holds quadruples[start:end].
+        label (int): Operand handle of the label the block starts with, or NONE.
+        preds, succs (list): Indexes of the predecessor and successor blocks.
+    """
+    __slots__ = ('index', 'start', 'end', 'label', 'preds', 'succs')
+
+    def __init__(self, index, start, end, label):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.label = label
+        self.preds = []
+        self.succs = []
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f'BasicBlock({self.index}, [{self.start}:{self.end}], preds={self.preds}, succs={self.succs})'
+
+
+class Loop:
+    """
+    A natural loop: a header block and the blocks that reach one of its back edges without passing the header.
+
+    Attributes:
+        header (int): Index of the header block (the single entry of the loop).
+        latches (list): Indexes of the blocks with a back edge to the header.
+        blocks (set): Indexes of all blocks of the loop, header included.
+        parent (Loop): The innermost enclosing loop, or None.
+        children (list): The loops directly nested in this one.
+        depth (int): Nesting depth (1 for an outermost loop).
+    """
+    __slots__ = ('header', 'latches', 'blocks', 'parent', 'children', 'depth')
+
+    def __init__(self, header):
+        self.header = header
+        self.latches = []
+        self.blocks = {header}
+        self.parent = None
+        self.children = []
+        self.depth = 1
+
+    def __repr__(self):
+        return f'Loop(header={self.header}, blocks={sorted(self.blocks)}, depth={self.depth})'
+
+
+class ControlFlowGraph:
+    """
+    Control flow graph of a QuadStore.
+
+    Attributes:
+        quadruples (QuadStore): The analyzed quadruples (not modified).
+        blocks (list): BasicBlocks in quadruple order.
+        entries (list): Indexes of the blocks control can start at (the main program and every function).
+        label_blocks (dict): Label operand handle -> index of the block it starts.
+    """
+
+    def __init__(self, quadruples):
+        """
+        Partitions the quadruples into basic blocks and links them.
+
+        Raises:
+            ValueError: If a jump targets a label that is not defined.
+        """
+        self.quadruples = quadruples
+        self.blocks = []
+        self.label_blocks = {}
+        self.entries = [0] if len(quadruples) else []
+        self._starts = array('l')
+        self._idom = None
+        self._order = None
+        self._loops = None
+        self._intervals = None
+        self.build_blocks()
+        self.link_blocks()
+
+    def build_blocks(self):
+        """Splits the quadruples at the leaders."""
+        opcodes, results = self.quadruples.opcodes, self.quadruples.result
+        blocks, label_blocks = self.blocks, self.label_blocks
+        start = 0
+        for index, opcode in enumerate(opcodes):
+            if (opcode == Opcode.LABEL or opcode == Opcode.FUNC) and index != start:
+                blocks.append(BasicBlock(len(blocks), start, index, NONE))
+                start = index
+            elif opcode in TERMINATORS:
+                blocks.append(BasicBlock(len(blocks), start, index + 1, NONE))
+                start = index + 1
+        if start < len(opcodes):
+            blocks.append(BasicBlock(len(blocks), start, len(opcodes), NONE))
+
+        for block in blocks:
+            if opcodes[block.start] == Opcode.LABEL:
+                block.label = results[block.start]
+                label_blocks[block.label] = block.index
+            elif opcodes[block.start] == Opcode.FUNC and block.index:
+                self.entries.append(block.index)
+            self._starts.append(block.start)
+
+    def link_blocks(self):
+        """Adds the edges of every block's last quadruple."""
+        quadruples, blocks = self.quadruples, self.blocks
+        for block in blocks:
+            opcode, arg1, arg2, result = quadruples[block.end - 1]
+            if opcode == Opcode.GOTO:
+                self.add_edge(block, self.target(result))
+            elif opcode == Opcode.IFGOTO or opcode == Opcode.IFFALSE:
+                self.add_edge(block, self.target(arg2))
+            following = block.index + 1
+            if (opcode not in UNCONDITIONAL and following < len(blocks)
+                    and quadruples.opcodes[blocks[following].start] != Opcode.FUNC):
+                self.add_edge(block, blocks[following])
+
+    def target(self, label):
+        """Returns the block a jump to `label` continues into."""
+        try:
+            return self.blocks[self.label_blocks[label]]
+        except KeyError:
+            raise ValueError(f'Jump to undefined label {label}') from None
+
+    @staticmethod
+    def add_edge(source, target):
+        if target.index not in source.succs:
+            source.succs.append(target.index)
+            target.preds.append(source.index)
+
+    def block_of(self, index):
+        """Returns the index of the block holding quadruple `index`."""
+        return bisect_right(self._starts, index) - 1
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def reverse_postorder(self):
+        """
+        Returns the indexes of the blocks reachable from the entries in reverse
+        postorder (every block before its successors, except along back edges).
+        """
+        if self._order is None:
+            blocks = self.blocks
+            visited = bytearray(len(blocks))
+            postorder = []
+            for entry in self.entries:
+                if visited[entry]:
+                    continue
+                visited[entry] = 1
+                stack = [(entry, 0)]    # (block, next successor to visit)
+                while stack:
+                    index, position = stack[-1]
+                    succs = blocks[index].succs
+                    if position < len(succs):
+                        stack[-1] = (index, position + 1)
+                        successor = succs[position]
+                        if not visited[successor]:
+                            visited[successor] = 1
+                            stack.append((successor, 0))
+                    else:
+                        stack.pop()
+                        postorder.append(index)
+            self._order = postorder[::-1]
+        return self._order
+
+    def reachable(self):
+        """Returns the set of indexes of the blocks reachable from the entries."""
+        return set(self.reverse_postorder())
+
+    @property
+    def idom(self):
+        """
+        Immediate dominator of every block: a list with the index of the immediate
+        dominator, the block itself for entries, and -1 for unreachable blocks.
+        """
+        if self._idom is None:
+            self._idom = self.compute_dominators()
+        return self._idom
+
+    def compute_dominators(self):
+        """
+        Computes the immediate dominators (Cooper, Harvey and Kennedy). The entries
+        hang below a virtual root, so a block reached from two entries is only
+        dominated by that root and gets -1.
+        """
+        blocks, order = self.blocks, self.reverse_postorder()
+        root = len(blocks)
+        number = [-1] * (root + 1)      # Reverse postorder number of each reachable block.
+        for position, index in enumerate(order):
+            number[index] = position + 1
+        number[root] = 0
+
+        idom = [-1] * (root + 1)
+        idom[root] = root
+        for entry in self.entries:
+            idom[entry] = root
+
+        entries = set(self.entries)
+        changed = True
+        while changed:
+            changed = False
+            for index in order:
+                if index in entries:
+                    continue
+                new_idom = -1
+                for pred in blocks[index].preds:
+                    if idom[pred] == -1:
+                        continue    # Not processed yet (or unreachable).
+                    if new_idom == -1:
+                        new_idom = pred
+                        continue
+                    a, b = pred, new_idom   # Walk both up to their common dominator.
+                    while a != b:
+                        while number[a] > number[b]:
+                            a = idom[a]
+                        while number[b] > number[a]:
+                            b = idom[b]
+                    new_idom = a
+                if idom[index] != new_idom:
+                    idom[index] = new_idom
+                    changed = True
+
+        for entry in self.entries:
+            idom[entry] = entry
+        return [-1 if parent == root else parent for parent in idom[:root]]
+
+    def dominates(self, a, b):
+        """Returns whether block `a` dominates block `b` (every block dominates itself)."""
+        if self._intervals is None:
+            self._intervals = self.dominator_intervals()
+        enter, leave = self._intervals
+        return enter[a] != -1 and enter[a] <= enter[b] and leave[b] <= leave[a]
+
+    def dominator_tree(self):
+        """Returns the children of every block in the dominator tree, as a list of lists."""
+        children = [[] for _ in self.blocks]
+        for index, parent in enumerate(self.idom):
+            if parent != -1 and parent != index:
+                children[parent].append(index)
+        return children
+
+    def dominator_intervals(self):
+        """
+        Numbers the dominator tree in depth-first order, so that `a` dominates `b`
+        exactly when the (enter, leave) interval of `a` contains the one of `b`.
+        """
+        children = self.dominator_tree()
+        enter, leave = [-1] * len(self.blocks), [-1] * len(self.blocks)
+        clock = 0
+        for root, parent in enumerate(self.idom):
+            if parent != root:
+                continue
+            stack = [(root, False)]
+            while stack:
+                index, done = stack.pop()
+                clock += 1
+                if done:
+                    leave[index] = clock
+                    continue
+                enter[index] = clock
+                stack.append((index, True))
+                stack.extend((child, False) for child in children[index])
+        return enter, leave
+
+    @property
+    def loops(self):
+        """The natural loops of the graph, outermost first (see `find_loops`)."""
+        if self._loops is None:
+            self._loops = self.find_loops()
+        return self._loops
+
+    def find_loops(self):
+        """
+        Finds the natural loops (merging the back edges into one header) and nests them.
+
+        Returns:
+            list: Loops ordered so that every loop follows the loops containing it.
+        """
+        blocks, order = self.blocks, self.reverse_postorder()
+        number = {index: position for position, index in enumerate(order)}
+        headers = {}
+        for index in order:
+            for successor in blocks[index].succs:
+                # A back edge goes against the reverse postorder, into a dominator.
+                if number[successor] <= number[index] and self.dominates(successor, index):
+                    loop = headers.get(successor)
+                    if loop is None:
+                        loop = headers[successor] = Loop(successor)
+                    loop.latches.append(index)
+
+        for loop in headers.values():
+            stack = [latch for latch in loop.latches if latch != loop.header]
+            loop.blocks.update(stack)
+            while stack:
+                for pred in blocks[stack.pop()].preds:
+                    if pred not in loop.blocks and pred in number:
+                        loop.blocks.add(pred)
+                        stack.append(pred)
+
+        # Visiting outer loops first, the parent of a loop is the innermost loop seen so far holding its header.
+        loops = sorted(headers.values(), key=lambda loop: len(loop.blocks), reverse=True)
+        innermost = {}
+        for loop in loops:
+            loop.parent = innermost.get(loop.header)
+            if loop.parent:
+                loop.parent.children.append(loop)
+                loop.depth = loop.parent.depth + 1
+            for index in loop.blocks:
+                innermost[index] = loop
+        return sorted(loops, key=lambda loop: loop.depth)
+
+    def loop_depths(self):
+        """Returns the loop nesting depth of every block (0 outside loops)."""
+        depths = [0] * len(self.blocks)
+        for loop in self.loops:
+            for index in loop.blocks:
+                depths[index] = max(depths[index], loop.depth)
+        return depths
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from codeGenerator import TACGenerator, OperandNames, format_quadruples
+    from constantFolder import ConstantFolder
+    from parser import Parser
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('source', nargs='?', default='input.txt', help='source file (default: input.txt)')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='fold constants first')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    ast = parser.parse_file(args.source)
+    if ast is None:
+        for diagnostic in parser.diagnostics:
+            print(diagnostic)
+        sys.exit('Parsing failed, no TAC generated.')
+    if args.optimize:
+        ConstantFolder(parser.symbol_table).fold_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not args.optimize)
+    tacgenerator.generate_program_quadruples(ast)
+
+    cfg = ControlFlowGraph(tacgenerator.quadruples)
+    names = OperandNames(parser.symbol_table.values)
+    depths = cfg.loop_depths()
+    for block in cfg.blocks:
+        print(f'B{block.index}  preds={block.preds} succs={block.succs} idom={cfg.idom[block.index]} '
+              f'loop depth={depths[block.index]}')
+        for line in format_quadruples(cfg.quadruples[block.start:block.end], names):
+            print('    ' + line, end='')
+    for loop in cfg.loops:
+        print(f'loop B{loop.header}: blocks={sorted(loop.blocks)} latches={loop.latches} depth={loop.depth}')
@@ -0,0 +1,9 @@
+"""
+Default sources of the optimization reports and benchmarks: input.txt and the
+Phase 2 examples.
+"""
+import glob
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCES = [os.path.join(HERE, 'input.txt')] + sorted(glob.glob(os.path.join(HERE, '..', 'Phase2', 'examples', 'input*.txt')))
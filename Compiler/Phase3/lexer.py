@@ -1,4 +1,21 @@
+import mmap
+import os
+import re
 import ply.lex as lex
+from symbolTable import SymbolTable
+
+
+class Token:
+    """
+    A token produced by the regex engine, with the attributes of a PLY `LexToken`
+    (`lexer` is only set by the PLY parser on a token with a syntax error).
+    Like `LexToken` it has no constructor: the attributes are assigned directly.
+    """
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __repr__(self):
+        return f'LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})'
+
 
 class Lexer:
     # Mapping of reserved words to their token names.
@@ -69,28 +86,93 @@ class Lexer:
     t_RIGHT_PA   = r'\)'
     t_ignore     = ' \t'    # Ignore spaces and tabs.
 
+    # Number of characters read from a file per chunk in `tokenize_file`.
+    CHUNK_SIZE = 1 << 16
+
+    # Scanner engines: the PLY lexer, one combined regular expression matched over the input,
+    # or the same expression matched over the bytes of a memory-mapped file in `tokenize_file`.
+    ENGINES = ('ply', 'regex', 'mmap')
 
-    def __init__(self):
+    # Operator tokens of the regex engine. `t_LT_OP` is `=`, which PLY matches as `t_EQ_OP`,
+    # so `<` alone is an illegal character for both engines.
+    OPERATORS = {
+        ':=': 'ASSIGN_OP', '<=': 'LE_OP', '<>': 'NE_OP', '>=': 'GE_OP',
+        '*': 'MUL_OP', '/': 'DIV_OP', '+': 'ADD_OP', '-': 'SUB_OP', '=': 'EQ_OP', '>': 'GT_OP',
+        ':': 'COLON', ';': 'SEMICOLON', ',': 'COMMA', '(': 'LEFT_PA', ')': 'RIGHT_PA',
+    }
+
+    # Value of the keyword and operator tokens (their text), by token type.
+    CONSTANT_VALUES = {name: text for text, name in list(reserved.items()) + list(OPERATORS.items())}
+    # Type and value of the keyword and operator tokens, by their text, and by their bytes for the mmap engine.
+    FIXED_TOKENS = {text: (name, text) for text, name in list(reserved.items()) + list(OPERATORS.items())}
+    FIXED_BYTES = {text.encode(): token for text, token in FIXED_TOKENS.items()}
+    # Types whose token value is a symbol table handle.
+    SYMBOL_TYPES = ('IDENTIFIER', 'INTEGER_NUMBER', 'REAL_NUMBER')
+
+    # Combined pattern of the regex engine: ignored characters, then one of the rules in
+    # PLY's order, the operators (longest first) or an illegal character.
+    SCANNER = re.compile(r'[ \t]*(?:' + '|'.join((
+        r'(?P<IDENTIFIER>[a-zA-Z]\w*)',
+        r'(?P<REAL_NUMBER>\d+\.\d+(?:[eE][+-]?\d+)?|\d+(?:[eE][+-]?\d+))',
+        r'(?P<INTEGER_NUMBER>\d+)',
+        r'(?P<NEWLINE>\n+)',
+        '(?P<OPERATOR>' + '|'.join(map(re.escape, sorted(OPERATORS, key=len, reverse=True))) + ')',
+        r'(?P<ERROR>[^ \t])',
+    )) + ')')
+    # `SCANNER` over bytes, where `\w` and `\d` only match ASCII: used for ASCII files only.
+    BYTES_SCANNER = re.compile(SCANNER.pattern.encode())
+    # Bytes that make the mmap engine fall back to reading text: non-ASCII ones, and `\r`
+    # (translated to `\n` when the file is read as text).
+    TEXT_ONLY_BYTES = re.compile(rb'[^\x00-\x0c\x0e-\x7f]')
+
+
+    def __init__(self, lextab=None, engine='ply'):
         """
         Initializes the Lexer object.
-        - Compiles the lexer using the PLY `lex` module.
-        - Initializes the symbol table as an empty dictionary.
+        - Compiles the lexer using the PLY `lex` module, or loads it from
+          precompiled tables when a `lextab` module is given.
+        - Initializes an empty symbol table.
+        Args:
+            lextab (module, optional): Lexer tables previously written by PLY.
+            engine (str, optional): 'ply' (default) scans with the PLY lexer; 'regex' scans
+                with `SCANNER`, giving the same tokens without a Python call per rule;
+                'mmap' is 'regex' whose `tokenize_file` scans the memory-mapped bytes of
+                the file. The PLY lexer still keeps `lineno` for all of them.
+        Raises:
+            ValueError: If the engine is not one of `ENGINES`.
         """
-        self.lexer = lex.lex(module=self)
-        self.symbol_table = {}
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown scanner engine '{engine}', expected one of {', '.join(self.ENGINES)}")
+        self.engine = engine
+        if lextab is None:
+            self.lexer = lex.lex(module=self)
+        else:
+            self.lexer = lex.lex(module=self, optimize=1, lextab=lextab)
+        self.symbol_table = SymbolTable()
+        self.offset = 0     # Characters consumed before the current lexer input.
+
+
+    def reset(self):
+        """
+        Resets the per-input state so the same Lexer can scan another program.
+        - Clears the symbol table and restarts line numbering and positions.
+        """
+        self.symbol_table.clear()
+        self.lexer.lineno = 1
+        self.offset = 0
 
 
-    def get_stno(self, id):
+    def lexeme(self, token):
         """
-        Get or assign a unique symbol table number for the given identifier.
+        Returns the source text of a token.
         Args:
-            id (str): Identifier or constant.
+            token (LexToken): A token produced by this lexer.
         Returns:
-            int: Unique index for the identifier in the symbol table.
+            str: The identifier name or literal text for symbol tokens, the matched text otherwise.
         """
-        if id not in self.symbol_table:
-            self.symbol_table[id] = len(self.symbol_table)
-        return self.symbol_table[id]
+        if token.type in ('IDENTIFIER', 'INTEGER_NUMBER', 'REAL_NUMBER'):
+            return self.symbol_table.lexeme(token.value)
+        return token.value
 
 
     def t_IDENTIFIER(self, t):
@@ -99,11 +181,11 @@ class Lexer:
         """
         Matches identifiers and reserved keywords.
         - If it's a reserved word, assigns the corresponding token type.
-        - Otherwise, adds it to the symbol table and returns as an identifier.
+        - Otherwise, interns it in the symbol table; the token value is its handle.
         """
         t.type = self.reserved.get(t.value, 'IDENTIFIER')
         if t.type == 'IDENTIFIER':
-            t.value = (t.value, self.get_stno(t.value))
+            t.value = self.symbol_table.identifier(t.value)
         return t
 
     def t_REAL_NUMBER(self, t):
@@ -111,8 +193,9 @@ class Lexer:
 
         """
         Matches real (floating-point) numbers, with optional scientific notation.
+        - The token value is the handle of the literal in the symbol table.
         """
-        t.value = (float(t.value), self.get_stno(t.value))
+        t.value = self.symbol_table.real(t.value)
         return t
 
     def t_INTEGER_NUMBER(self, t):
@@ -121,21 +204,29 @@ class Lexer:
         """
         Matches integer numbers.
         - Identifies illegal lexemes (e.g., leading zeroes in multi-digit numbers).
+        - The token value is the handle of the literal in the symbol table.
         """
         if t.value[0] == '0' and len(t.value) != 1:
             t.type = 'Illegal_Lexeme'
         else:
-            t.value = (int(t.value), self.get_stno(int(t.value)))
+            t.value = self.symbol_table.integer(int(t.value))
         return t
 
     def t_error(self, t):
         """
         Handles illegal characters.
-        - Prints an error message and skips the invalid character.
+        - Hands the invalid character and its position to `illegal_character`, then skips it.
         """
-        print(f"Illegal character '{t.value[0]}' at position {t.lexpos}")
+        self.illegal_character(t.value[0], self.offset + t.lexpos)
         self.lexer.skip(1)
 
+    def illegal_character(self, character, position):
+        """
+        Reports an illegal character found at a position of the source by printing it.
+        Replaced on the instance by its users: the Phase 3 parser turns it into a `Diagnostic`.
+        """
+        print(f"Illegal character '{character}' at position {position}")
+
     def t_newline(self, t):
         r'\n+'
 
@@ -152,11 +243,146 @@ class Lexer:
         Returns:
             list: List of token objects.
         """
+        return list(self.iter_tokens(data))
+
+    def iter_tokens(self, data, offset=0):
+        """
+        Lazily yields the tokens of the input data.
+        Args:
+            data (str): Source code to tokenize.
+            offset (int): Position of `data` in the whole source, added to `lexpos`
+                (line numbers continue from the lexer's current `lineno`).
+        Yields:
+            LexToken: The next token of the input.
+        """
+        self.offset = offset
+        yield from self._lex_piece(data)
+
+    def tokenize_file(self, path, chunk_size=CHUNK_SIZE):
+        """
+        Reads a source file in chunks and lazily yields its tokens.
+        - Every token class is line-local, so each chunk is cut after its last
+          newline and the unfinished line is carried over to the next chunk.
+        - `lexpos` is shifted by the characters already consumed, and `lineno` is
+          kept by the underlying lexer, so both stay correct across chunks.
+        Args:
+            path (str): Path of the source file.
+            chunk_size (int): Number of characters read per chunk.
+        Yields:
+            LexToken: The next token of the file.
+        """
+        self.offset = 0
+        if self.engine == 'mmap':
+            mapped = yield from self._scan_mapped(path)
+            if mapped:
+                return
+        with open(path, 'r') as source:
+            pending = []    # Pieces of the current unfinished line.
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                cut = chunk.rfind('\n') + 1
+                if not cut:
+                    pending.append(chunk)
+                    continue
+                pending.append(chunk[:cut])
+                yield from self._lex_piece(''.join(pending))
+                pending = [chunk[cut:]]
+            if pending:
+                yield from self._lex_piece(''.join(pending))
+
+    def _lex_piece(self, data):
+        """
+        Feeds one piece of the source to the lexer and yields its tokens with
+        absolute positions.
+        Args:
+            data (str): A piece of source code that ends at a line boundary.
+        Yields:
+            LexToken: The next token of the piece.
+        """
+        if self.engine != 'ply':
+            yield from self._scan_piece(data)
+            return
+        offset = self.offset
         self.lexer.input(data)
-        tokens = []
-        while True:
+        token = self.lexer.token()
+        while token:
+            token.lexpos += offset
+            yield token
             token = self.lexer.token()
-            if not token:
-                break
-            tokens.append(token)
-        return tokens
\ No newline at end of file
+        self.offset = offset + len(data)
+
+    def _scan_mapped(self, path):
+        """
+        Scans a file through a read-only memory map, with `BYTES_SCANNER`: the file is
+        never copied, and only identifier, number and illegal lexemes are decoded.
+        Args:
+            path (str): Path of the source file.
+        Yields:
+            Token: The next token of the file.
+        Returns:
+            bool: False, without yielding, when the file has bytes that need decoding as
+                text (see `TEXT_ONLY_BYTES`); True otherwise.
+        """
+        with open(path, 'rb') as source:
+            if not os.fstat(source.fileno()).st_size:
+                return True     # Empty files cannot be mapped.
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if self.TEXT_ONLY_BYTES.search(data):
+                    return False
+                yield from self._scan_piece(data, self.BYTES_SCANNER, self.FIXED_BYTES, bytes.decode)
+        return True
+
+    def _scan_piece(self, data, scanner=SCANNER, fixed_tokens=FIXED_TOKENS, decode=str):
+        """
+        Regex engine of `_lex_piece`: one pass of `SCANNER` over the piece, with
+        keywords and operators looked up in a dict.
+        Args:
+            data (str): A piece of source code that ends at a line boundary (or the
+                ASCII bytes of a whole file, with the following arguments for bytes).
+            scanner (Pattern): `SCANNER`, or `BYTES_SCANNER` for bytes.
+            fixed_tokens (dict): `FIXED_TOKENS`, or `FIXED_BYTES` for bytes.
+            decode (callable): Turns a lexeme into the str interned in the symbol table.
+        Yields:
+            Token: The next token of the piece.
+        """
+        offset = self.offset
+        lexer = self.lexer
+        lineno = lexer.lineno
+        symbol_table = self.symbol_table
+        identifiers = {}    # Handles of the identifiers of the piece, by lexeme.
+        for match in scanner.finditer(data):
+            kind = match.lastgroup
+            text = match[kind]
+            if kind == 'IDENTIFIER':
+                fixed = fixed_tokens.get(text)
+                if fixed is None:
+                    value = identifiers.get(text)
+                    if value is None:
+                        value = identifiers[text] = symbol_table.identifier(decode(text))
+                else:
+                    kind, value = fixed
+            elif kind == 'OPERATOR':
+                kind, value = fixed_tokens[text]
+            elif kind == 'NEWLINE':
+                lineno += len(text)
+                lexer.lineno = lineno
+                continue
+            elif kind == 'INTEGER_NUMBER':
+                if text[0] in ('0', 48) and len(text) != 1:    # First character of a str, or byte of bytes.
+                    kind, value = 'Illegal_Lexeme', decode(text)
+                else:
+                    value = symbol_table.integer(int(text))
+            elif kind == 'REAL_NUMBER':
+                value = symbol_table.real(decode(text))
+            else:
+                self.illegal_character(decode(text), offset + match.end() - 1)
+                continue
+            token = Token()
+            token.type = kind
+            token.value = value
+            token.lineno = lineno
+            token.lexpos = offset + match.end() - len(text)
+            yield token
+        self.offset = offset + len(data)
@@ -0,0 +1,196 @@
+"""
+Liveness analysis and dead code elimination over the control flow graph of TAC.
+
+Live variables are computed backwards over the basic blocks with bitsets (Python
+ints). Only the names that are live across blocks get a bit: temps used only
+in the block that defines them (almost all of them) are tracked by the scan of
+that block, so the sets stay small even for very large programs.
+
+Program variables are live when the program or a function ends or returns,
+and at every call (the called function may read them), so dead code elimination
+only removes assignments to them that are overwritten before being read, while
+assignments to temps and to the locals of a function are removed whenever their
+value is not used. Calls themselves are never removed.
+"""
+from controlFlowGraph import ControlFlowGraph
+from quadStore import QuadStore, Opcode, BINARY_OPCODES, TEMP, VAR, SPILL, LOCAL, KIND_MASK
+
+# Opcodes that assign their result operand (and have no other effect).
+VALUE_OPCODES = frozenset(BINARY_OPCODES | {Opcode.COPY})
+# Opcodes that assign their result operand.
+DEFINING_OPCODES = VALUE_OPCODES | {Opcode.CALL, Opcode.FORMAL}
+# Kinds of operands that hold values.
+NAME_KINDS = (TEMP, VAR, SPILL, LOCAL)
+
+
+def uses_and_def(quad):
+    """
+    Returns the names (temp, variable, local and spill slot operands) a quadruple reads, and the one it assigns.
+    The program variables a call may read are not included.
+
+    Returns:
+        tuple: (tuple of read operand handles, assigned operand handle or None).
+    """
+    opcode, arg1, arg2, result = quad
+    uses = tuple(argument for argument in (arg1, arg2) if argument & KIND_MASK in NAME_KINDS)
+    return uses, result if opcode in DEFINING_OPCODES else None
+
+
+class Liveness:
+    """
+    Live-in and live-out sets of the blocks of a control flow graph.
+
+    Attributes:
+        cfg (ControlFlowGraph): The analyzed graph.
+        bits (dict): Operand handle -> bit index, for the names live across blocks.
+        live_in, live_out (list): Bitset of the names live at the start/end of each block.
+        exit_live (int): Bitset of the names live when the program ends, and at calls (its variables).
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.bits = {}
+        self.find_global_names()
+        self.exit_live = 0
+        for handle, bit in self.bits.items():
+            if handle & KIND_MASK == VAR:
+                self.exit_live |= 1 << bit
+        self.uses, self.defs = self.block_summaries()
+        self.live_in, self.live_out = self.solve()
+
+    def find_global_names(self):
+        """Gives a bit to every variable, and to every temp read in a block that does not define it first."""
+        quadruples, bits = self.cfg.quadruples, self.bits
+        for block in self.cfg.blocks:
+            defined = set()
+            for index in range(block.start, block.end):
+                uses, definition = uses_and_def(quadruples[index])
+                for name in uses:
+                    if name not in bits and (name & KIND_MASK == VAR or name not in defined):
+                        bits[name] = len(bits)
+                if definition is not None:
+                    defined.add(definition)
+                    if definition & KIND_MASK == VAR and definition not in bits:
+                        bits[definition] = len(bits)
+
+    def block_summaries(self):
+        """Returns the bitsets of the global names each block reads before assigning, and assigns."""
+        quadruples, bits = self.cfg.quadruples, self.bits
+        block_uses, block_defs = [], []
+        for block in self.cfg.blocks:
+            uses = defs = 0
+            for index in range(block.end - 1, block.start - 1, -1):
+                quad = quadruples[index]
+                quad_uses, definition = uses_and_def(quad)
+                if definition in bits:
+                    bit = 1 << bits[definition]
+                    defs |= bit
+                    uses &= ~bit
+                if quad[0] == Opcode.CALL:
+                    uses |= self.exit_live
+                for name in quad_uses:
+                    if name in bits:
+                        uses |= 1 << bits[name]
+            block_uses.append(uses)
+            block_defs.append(defs)
+        return block_uses, block_defs
+
+    def solve(self):
+        """Iterates live_in = uses | (live_out & ~defs) to a fixed point, in postorder."""
+        blocks, uses, defs = self.cfg.blocks, self.uses, self.defs
+        live_in, live_out = [0] * len(blocks), [0] * len(blocks)
+        order = self.cfg.reverse_postorder()[::-1]
+        changed = True
+        while changed:
+            changed = False
+            for index in order:
+                block = blocks[index]
+                out = 0 if block.succs else self.exit_live
+                for successor in block.succs:
+                    out |= live_in[successor]
+                if self.cfg.quadruples.opcodes[block.end - 1] == Opcode.RETURN:
+                    out |= self.exit_live
+                live_out[index] = out
+                new_in = uses[index] | (out & ~defs[index])
+                if new_in != live_in[index]:
+                    live_in[index] = new_in
+                    changed = True
+        return live_in, live_out
+
+
+class DeadCodeEliminator:
+    """
+    Removes unreachable blocks and assignments whose value is never read.
+
+    Attributes:
+        stats (dict): Quadruples removed by the last `optimize`: 'unreachable' and 'dead'.
+    """
+
+    def __init__(self, max_rounds=8):
+        self.max_rounds = max_rounds
+        self.stats = {}
+
+    def optimize(self, quadruples):
+        """
+        Repeats the elimination until nothing more is removed (removing a read can make
+        another assignment dead).
+
+        Args:
+            quadruples (QuadStore): Quadruples to optimize (not modified).
+
+        Returns:
+            QuadStore: The optimized quadruples.
+        """
+        self.stats = {'unreachable': 0, 'dead': 0}
+        for _ in range(self.max_rounds):
+            size = len(quadruples)
+            quadruples = self.eliminate(quadruples)
+            if len(quadruples) == size:
+                break
+        return quadruples
+
+    def eliminate(self, quadruples):
+        """Runs one round of unreachable block and dead assignment removal."""
+        if not len(quadruples):
+            return quadruples
+        cfg = ControlFlowGraph(quadruples)
+        liveness = Liveness(cfg)
+        bits = liveness.bits
+        reachable = cfg.reachable()
+        output = QuadStore()
+        for block in cfg.blocks:
+            if block.index not in reachable:
+                self.stats['unreachable'] += len(block)
+                if quadruples.opcodes[block.end - 1] == Opcode.ENDFUNC:
+                    output.append(*quadruples[block.end - 1])    # Kept to mark the end of the function.
+                    self.stats['unreachable'] -= 1
+                continue
+
+            # Scan the block backwards, keeping the quadruples whose result is read later.
+            live, live_local = liveness.live_out[block.index], set()
+            kept = []
+            for index in range(block.end - 1, block.start - 1, -1):
+                quad = quadruples[index]
+                uses, definition = uses_and_def(quad)
+                if definition is not None:
+                    if definition in bits:
+                        bit = 1 << bits[definition]
+                        needed = live & bit
+                        live &= ~bit
+                    else:
+                        needed = definition in live_local
+                        live_local.discard(definition)
+                    if not needed and quad[0] in VALUE_OPCODES:
+                        self.stats['dead'] += 1
+                        continue
+                if quad[0] == Opcode.CALL:
+                    live |= liveness.exit_live
+                for name in uses:
+                    if name in bits:
+                        live |= 1 << bits[name]
+                    else:
+                        live_local.add(name)
+                kept.append(quad)
+            for quad in reversed(kept):
+                output.append(*quad)
+        return output
@@ -0,0 +1,324 @@
+"""
+Loop optimizations over the control flow graph of TAC: loop-invariant code
+motion and strength reduction of induction variable multiplications.
+
+Every natural loop (controlFlowGraph.py) that gets code moved out of it gets a
+preheader: the moved quadruples are placed right before the label of the loop
+header, behind a new label that the jumps entering the loop from outside are
+redirected to (the jumps of the back edges keep going to the header).
+
+Loop-invariant code motion moves `x = a op b` and `x = a` into the preheader when
+    - a and b are literals, names assigned nowhere in the loop (no program
+      variable is, in a loop that calls a function), or results of quadruples
+      already moved;
+    - it is the only assignment of x in the loop, and x is not live at the start
+      of the header (no use in the loop sees a value from before the loop);
+    - x is not live after an exit of the loop, unless the block of the quadruple
+      dominates that exit (it would have run before leaving the loop anyway);
+    - it is not a division that may fail, unless its block dominates every exit
+      (a division by a nonzero literal can always move).
+
+Strength reduction rewrites `t = i * k`, for an integer literal k and a basic
+induction variable i of the loop (an integer variable whose only assignment in
+the loop is `i = i + c` or `i = i - c`, c an integer literal): a new temp s is
+set to `i * k` in the preheader and increased by c * k right after i is, and
+the uses of t read s instead (or t becomes a copy of s).
+
+Loops are visited innermost first and the whole pass is repeated, so code moved
+to the preheader of an inner loop can leave the outer loop in the next round.
+
+Usage:
+    python loopOptimizer.py [SOURCE ...]   (reports quadruples moved and multiplications reduced)
+"""
+from bisect import bisect_right
+
+from controlFlowGraph import ControlFlowGraph, UNCONDITIONAL
+from liveness import Liveness, uses_and_def, VALUE_OPCODES
+from peephole import jump_target, retarget
+from quadStore import QuadStore, Opcode, NONE, TEMP, LABEL, VAR, CONST, LOCAL, KIND_MASK, operand, operand_index
+from symbolTable import SymbolTable
+
+
+class LoopOptimizer:
+    """
+    Moves loop-invariant quadruples out of loops and strength-reduces induction variable multiplications.
+
+    Attributes:
+        symbols (SymbolTable): Table of the variables and literals of the quadruples.
+        max_rounds (int): Upper bound on the repetitions of the pass.
+        local_types (dict): FUNCTION operand handle -> declarations (handle -> type name) of the
+            parameters and locals of that function, used to find integer induction variables.
+        stats (dict): Result of the last `optimize`: 'hoisted' quadruples and 'reduced' multiplications.
+    """
+
+    def __init__(self, symbol_table, max_rounds=4):
+        self.symbols = symbol_table
+        self.max_rounds = max_rounds
+        self.local_types = {}
+        self.stats = {}
+
+    def optimize(self, quadruples):
+        """
+        Runs the pass until a round changes nothing.
+
+        Args:
+            quadruples (QuadStore): Quadruples to optimize (not modified).
+
+        Returns:
+            QuadStore: The optimized quadruples.
+        """
+        self.stats = {'hoisted': 0, 'reduced': 0}
+        for _ in range(self.max_rounds):
+            quadruples, changed = self.optimize_loops(quadruples)
+            if not changed:
+                break
+        return quadruples
+
+    def optimize_loops(self, quadruples):
+        """Runs one round over every loop; returns the new quadruples and the number of changes."""
+        if not len(quadruples):
+            return quadruples, 0
+        cfg = ControlFlowGraph(quadruples)
+        if not cfg.loops:
+            return quadruples, 0
+        self.cfg, self.liveness, self.code = cfg, Liveness(cfg), list(quadruples)
+        self.removed, self.before, self.after = set(), {}, {}
+        self.fresh = set()      # Temps added in this round, assigned where the analysis does not see them.
+        self.jumps = {}
+        for index, quad in enumerate(self.code):
+            label = jump_target(quad)
+            if label != NONE:
+                self.jumps.setdefault(label, []).append(index)
+        self.next_temp = max((handle >> 3 for handle in quadruples.result if handle & KIND_MASK == TEMP), default=0)
+        self.next_label = max((handle >> 3 for handle in quadruples.result if handle & KIND_MASK == LABEL), default=0)
+        self.functions = [(index, quadruples.result[index]) for index, opcode in enumerate(quadruples.opcodes)
+                          if opcode == Opcode.FUNC]
+        self.innermost = {}     # Block index -> innermost loop holding it.
+        for loop in cfg.loops:
+            for index in loop.blocks:
+                self.innermost[index] = loop
+
+        changed = 0
+        for loop in reversed(cfg.loops):
+            if self.can_hoist_into(loop):
+                changed += self.optimize_loop(loop)
+        if not changed:
+            return quadruples, 0
+
+        output = QuadStore()
+        before, after, removed = self.before, self.after, self.removed
+        for index, quad in enumerate(self.code):
+            for moved in before.get(index, ()):
+                output.append(*moved)
+            if index not in removed:
+                output.append(*quad)
+            for added in after.get(index, ()):
+                output.append(*added)
+        return output, changed
+
+    def can_hoist_into(self, loop):
+        """
+        Returns whether code placed right before the loop header runs only on the way
+        into the loop, i.e. the block before the header does not fall through into it
+        from inside the loop.
+        """
+        header = self.cfg.blocks[loop.header]
+        if header.label == NONE:
+            return False
+        previous = loop.header - 1
+        if previous in loop.blocks:
+            return self.code[self.cfg.blocks[previous].end - 1][0] in UNCONDITIONAL
+        return True
+
+    def optimize_loop(self, loop):
+        """Moves the invariant quadruples of one loop and reduces its multiplications; returns the changes."""
+        cfg, code = self.cfg, self.code
+        indexes = [index for block in sorted(loop.blocks)
+                   for index in range(cfg.blocks[block].start, cfg.blocks[block].end)]
+        definitions, calls = {}, False   # Name -> indexes of the quadruples assigning it in the loop.
+        for index in indexes:
+            _, definition = uses_and_def(code[index])
+            if definition is not None:
+                definitions.setdefault(definition, []).append(index)
+            calls = calls or code[index][0] == Opcode.CALL
+        exits = [block for block in loop.blocks
+                 for successor in cfg.blocks[block].succs if successor not in loop.blocks]
+
+        preheader = self.hoist(loop, indexes, definitions, calls, exits)
+        preheader += self.reduce(loop, indexes, definitions, calls)
+        if not preheader:
+            return 0
+
+        # Jumps entering the loop from outside go to a new label before the preheader code.
+        header = cfg.blocks[loop.header]
+        outside = [index for index in self.jumps.get(header.label, ()) if cfg.block_of(index) not in loop.blocks]
+        if outside:
+            self.next_label += 1
+            label = operand(LABEL, self.next_label)
+            for index in outside:
+                code[index] = retarget(code[index], label)
+            preheader.insert(0, (Opcode.LABEL, NONE, NONE, label))
+        self.before.setdefault(header.start, []).extend(preheader)
+        return len(preheader) - bool(outside)
+
+    def hoist(self, loop, indexes, definitions, calls, exits):
+        """Removes the invariant quadruples of the loop and returns them in an order that respects their uses."""
+        cfg, code, liveness = self.cfg, self.code, self.liveness
+        header = loop.header
+        moved, moved_names = [], set()
+
+        def invariant(name):
+            kind = name & KIND_MASK
+            if kind == NONE or kind == CONST or name in moved_names:
+                return True
+            if name in self.fresh:
+                return False
+            return name not in definitions and not (kind == VAR and calls)
+
+        def live_in(name, block):
+            bit = liveness.bits.get(name)
+            return bit is not None and liveness.live_in[block] >> bit & 1
+
+        candidates = [index for index in indexes if code[index][0] in VALUE_OPCODES
+                      and self.innermost[cfg.block_of(index)] is loop and index not in self.removed]
+        changed = True
+        while changed:
+            changed = False
+            for index in candidates:
+                if index in self.removed:
+                    continue
+                opcode, arg1, arg2, result = code[index]
+                if not (invariant(arg1) and invariant(arg2)) or len(definitions[result]) != 1:
+                    continue
+                if result & KIND_MASK == VAR and calls or live_in(result, header):
+                    continue
+                block = cfg.block_of(index)
+                if any(live_in(result, successor) and not cfg.dominates(block, exit)
+                       for exit in exits for successor in cfg.blocks[exit].succs if successor not in loop.blocks):
+                    continue
+                if opcode == Opcode.DIV and not self.nonzero_literal(arg2):
+                    if not exits or not all(cfg.dominates(block, exit) for exit in exits):
+                        continue
+                self.removed.add(index)
+                moved.append(code[index])
+                moved_names.add(result)
+                changed = True
+        self.stats['hoisted'] += len(moved)
+        return moved
+
+    def reduce(self, loop, indexes, definitions, calls):
+        """Strength-reduces the multiplications of basic induction variables; returns the preheader quadruples."""
+        code, symbols = self.code, self.symbols
+        function = self.function_at(self.cfg.blocks[loop.header].start)
+        steps = {}      # Basic induction variable -> (index of its assignment, step).
+        for name, assigned in definitions.items():
+            if len(assigned) != 1 or not self.is_integer(name, function) or name & KIND_MASK == VAR and calls:
+                continue
+            opcode, arg1, arg2, result = code[assigned[0]]
+            if opcode == Opcode.ADD and arg2 == name:
+                arg1, arg2 = arg2, arg1
+            if (opcode == Opcode.ADD or opcode == Opcode.SUB) and arg1 == name and self.integer_literal(arg2):
+                step = symbols.values[operand_index(arg2)]
+                steps[name] = (assigned[0], step if opcode == Opcode.ADD else -step)
+
+        preheader, reduced = [], {}     # (variable, factor) -> temp holding variable * factor.
+        for index in indexes:
+            opcode, arg1, arg2, result = code[index]
+            if opcode != Opcode.MUL or index in self.removed or result & KIND_MASK != TEMP:
+                continue
+            if arg2 in steps:
+                arg1, arg2 = arg2, arg1
+            if arg1 not in steps or not self.integer_literal(arg2) or len(definitions.get(result, ())) != 1:
+                continue
+            key = (arg1, arg2)
+            temp = reduced.get(key)
+            if temp is None:
+                self.next_temp += 1
+                temp = reduced[key] = operand(TEMP, self.next_temp)
+                self.fresh.add(temp)
+                assignment, step = steps[arg1]
+                increment = operand(CONST, symbols.integer(step * symbols.values[operand_index(arg2)]))
+                preheader.append((Opcode.MUL, arg1, arg2, temp))
+                self.after.setdefault(assignment, []).append((Opcode.ADD, temp, increment, temp))
+            self.replace_product(index, arg1, temp)
+        self.stats['reduced'] += len(reduced)
+        return preheader
+
+    def replace_product(self, index, variable, temp):
+        """
+        Makes the uses of the result of the multiplication at `index` read `temp`, when they
+        all follow it in its block with no assignment of `variable` between; otherwise the
+        multiplication becomes a copy of `temp`.
+        """
+        code, cfg, liveness = self.code, self.cfg, self.liveness
+        result = code[index][3]
+        block = cfg.blocks[cfg.block_of(index)]
+        bit = liveness.bits.get(result)
+        uses, assigned = [], False
+        if bit is None or not liveness.live_out[block.index] >> bit & 1:
+            for following in range(index + 1, block.end):
+                quad_uses, definition = uses_and_def(code[following])
+                if result in quad_uses:
+                    if assigned:
+                        break
+                    uses.append(following)
+                assigned = assigned or definition == variable
+            else:
+                for following in uses:
+                    opcode, arg1, arg2, quad_result = code[following]
+                    code[following] = (opcode, temp if arg1 == result else arg1, temp if arg2 == result else arg2,
+                                       quad_result)
+                self.removed.add(index)
+                return
+        code[index] = (Opcode.COPY, temp, NONE, result)
+
+    def function_at(self, index):
+        """Returns the FUNCTION operand of the function holding quadruple `index`, or None in the main program."""
+        position = bisect_right(self.functions, (index, float('inf'))) - 1
+        return self.functions[position][1] if position >= 0 else None
+
+    def is_integer(self, name, function):
+        """Returns whether a variable or local is declared integer."""
+        kind, handle = name & KIND_MASK, operand_index(name)
+        if kind == VAR:
+            return self.symbols.lookup(handle) == 'integer'
+        if kind == LOCAL:
+            return self.local_types.get(function, {}).get(handle) == 'integer'
+        return False
+
+    def integer_literal(self, name):
+        return name & KIND_MASK == CONST and self.symbols.kinds[operand_index(name)] == SymbolTable.INTEGER
+
+    def nonzero_literal(self, name):
+        return name & KIND_MASK == CONST and self.symbols.values[operand_index(name)] != 0
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from codeGenerator import TACGenerator
+    from exampleSources import DEFAULT_SOURCES, HERE
+    from optimizer import Optimizer
+    from parser import Parser
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, metavar='SOURCE', help='source files')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    print(f"{'program':<32}{'loops':>8}{'hoisted':>10}{'reduced':>10}")
+    for path in args.sources:
+        ast = parser.parse_file(path)
+        if ast is None:
+            for diagnostic in parser.diagnostics:
+                print(f'{os.path.relpath(path, HERE)}: {diagnostic}')
+            continue
+        optimizer = Optimizer(parser.symbol_table)
+        optimizer.optimize_program(ast)
+        tacgenerator = TACGenerator(parser.symbol_table, copy_literals=False)
+        tacgenerator.generate_program_quadruples(ast)
+        quadruples = optimizer.optimize_quadruples(tacgenerator.quadruples)
+        loops = len(ControlFlowGraph(quadruples).loops)
+        stats = optimizer.loops.stats
+        print(f"{os.path.relpath(path, HERE):<32}{loops:>8}{stats['hoisted']:>10}{stats['reduced']:>10}")
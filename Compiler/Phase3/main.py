@@ -1,24 +1,59 @@
+import argparse
+from lexer import Lexer # Import the Lexer class for the names of its scanner engines.
 from parser import Parser # Import the Parser class to parse the tokenized input and build Abstract Syntax Tree.
 from codeGenerator import TACGenerator # Import the TACGenerator to generate TAC codes from AST.
+from optimizer import Optimizer # Import the Optimizer to optimize the AST and the TAC.
+from registerAllocator import LinearScanAllocator # Import the LinearScanAllocator to reuse temps.
+from compileCache import IncrementalCompiler # Import the IncrementalCompiler to reuse the TAC of unchanged units.
 
 if __name__ == '__main__':
+    # Optional command line arguments.
+    arguments = argparse.ArgumentParser(description='Generate TAC for input.txt and write it to output.txt.')
+    arguments.add_argument('--table-cache', metavar='DIR',
+                           help='load precompiled lexer and parser tables from DIR (built on first use)')
+    arguments.add_argument('-O', '--optimize', action='store_true',
+                           help='fold constants, use literals directly as TAC operands and optimize the TAC')
+    arguments.add_argument('--registers', type=int, metavar='K',
+                           help='rename the temps onto K registers (t1..tK) and spill slots (s1, s2, ...)')
+    arguments.add_argument('--scanner', choices=Lexer.ENGINES, default='ply',
+                           help='scanner engine of the lexer (default: ply)')
+    arguments.add_argument('--cache', metavar='DIR',
+                           help='reuse the TAC of the functions and main block unchanged since an earlier run, cached in DIR')
+    arguments.add_argument('--tokens', metavar='FILE',
+                           help='parse the token file FILE saved by phase 1 (main.py --tokens) instead of lexing input.txt')
+    args = arguments.parse_args()
+    if args.cache and args.tokens:
+        arguments.error('--cache compiles the text of input.txt and cannot be used with --tokens')
+
     # Create an object of the Parser class to process the input program.
-    parser = Parser()
+    parser = Parser(table_cache=args.table_cache, engine=args.scanner)
 
     # Create an object of the TACGenerator class to process the input program.
-    tacgenerator = TACGenerator()
-
-    # Open the input file and read its content.
-    with open('input.txt', 'r') as input:
-        program = ''.join(input.readlines())  # Read all lines and combine them into a single string.
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not args.optimize)
+    optimizer = Optimizer(parser.symbol_table) if args.optimize else None
 
-    
-    # Build an AST from input
-    ast = parser.parse(program)
-    if ast:
-       
+    if args.cache:
+        # Parse and generate only the functions and main block changed since the last run (folded with -O).
+        parsed = IncrementalCompiler(parser, args.cache, optimizer).compile_file('input.txt')
+        if parsed is not None:
+            tacgenerator.quadruples = parsed
+    else:
+        # Build an AST from input, streaming tokens from the input file (or from a saved token file).
+        parsed = parser.parse_token_file(args.tokens) if args.tokens else parser.parse_file('input.txt')
+        if parsed is not None:
+            if optimizer:
+                # Fold constant expressions before generating TAC.
+                optimizer.optimize_program(parsed)
 
-        tac_code = tacgenerator.generate_program_tac(ast)
+            # Generate the TAC quadruples; they are formatted while being written.
+            tacgenerator.generate_program_quadruples(parsed)
+    if parsed is not None:
+        if optimizer:
+            # Simplify jumps, labels and temp copies and remove dead code of the generated TAC.
+            tacgenerator.quadruples = optimizer.optimize_quadruples(tacgenerator.quadruples)
+        if args.registers:
+            # Reuse temps whose live intervals do not overlap.
+            tacgenerator.quadruples = LinearScanAllocator(args.registers).allocate(tacgenerator.quadruples)
 
     # Open the output file for writing.
         with open('output.txt', 'w') as output:
@@ -27,10 +62,13 @@ if __name__ == '__main__':
                 'Mohammad Taha Karbalaee Esmaeili - 40121803' + ' ' * 10 + 'محمد طاها کربلای اسمعیلی - ۴۰۱۲۱۸۰۳\n'
                 )
 
-            # Wrtie TAC genereated code in the output file
-            output.write(tac_code)
+            # Stream the generated TAC code to the output file.
+            tacgenerator.write_tac(output)
 
         # Close the output file.
         output.close()
     else:
+        # Report the syntax errors collected by the parser.
+        for diagnostic in parser.diagnostics:
+            print(diagnostic)
         print("Parsing failed, no TAC generated.")
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+The optimization pipeline run by `main.py -O` and `batch.py -O`.
+
+    AST:  constant folding (constantFolder.py)
+    TAC:  peephole (peephole.py) → value numbering (valueNumbering.py) → dead code elimination (liveness.py)
+          → loop-invariant code motion and strength reduction (loopOptimizer.py) → peephole
+
+Usage:
+    python optimizer.py [SOURCE ...]   (reports the quadruples left after each stage, default: the examples)
+"""
+from constantFolder import ConstantFolder
+from liveness import DeadCodeEliminator
+from loopOptimizer import LoopOptimizer
+from peephole import PeepholeOptimizer
+from quadStore import FUNCTION, operand
+from valueNumbering import ValueNumbering
+
+
+class Optimizer:
+    """
+    Runs the optimization passes of `-O`.
+
+    Attributes:
+        folder (ConstantFolder): AST pass.
+        peephole (PeepholeOptimizer): TAC pass run first and last.
+        values (ValueNumbering): TAC pass (global value numbering).
+        dead_code (DeadCodeEliminator): TAC pass.
+        loops (LoopOptimizer): TAC pass.
+    """
+
+    def __init__(self, symbol_table):
+        """
+        Args:
+            symbol_table (SymbolTable): The parser's SymbolTable (folded literals are interned in it).
+        """
+        self.folder = ConstantFolder(symbol_table)
+        self.peephole = PeepholeOptimizer()
+        self.values = ValueNumbering(global_numbering=True)
+        self.dead_code = DeadCodeEliminator()
+        self.loops = LoopOptimizer(symbol_table)
+
+    def optimize_program(self, program):
+        """Optimizes the AST of a program in place and returns it."""
+        self.loops.local_types = {operand(FUNCTION, funcDec.id): funcDec.scope.declarations
+                                  for funcDec in program.funcList}
+        return self.folder.fold_program(program)
+
+    def optimize_quadruples(self, quadruples):
+        """Returns the optimized form of the quadruples generated for a program."""
+        quadruples = self.peephole.optimize(quadruples)
+        quadruples = self.values.optimize(quadruples)
+        quadruples = self.dead_code.optimize(quadruples)
+        quadruples = self.loops.optimize(quadruples)
+        return self.peephole.optimize(quadruples)
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from codeGenerator import TACGenerator
+    from exampleSources import DEFAULT_SOURCES, HERE
+    from parser import Parser
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, metavar='SOURCE', help='source files')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    stages = ('TAC', 'folded', 'peephole', 'values', 'dead code', 'loops', 'peephole')
+    print(f"{'program':<32}" + ''.join(f'{stage:>11}' for stage in stages))
+    totals = [0] * len(stages)
+    for path in args.sources:
+        ast = parser.parse_file(path)
+        if ast is None:
+            for diagnostic in parser.diagnostics:
+                print(f'{os.path.relpath(path, HERE)}: {diagnostic}')
+            continue
+        counts = []
+        tacgenerator = TACGenerator(parser.symbol_table)
+        tacgenerator.generate_program_quadruples(ast)
+        counts.append(len(tacgenerator.quadruples))
+
+        optimizer = Optimizer(parser.symbol_table)
+        ast = optimizer.optimize_program(ast)   # Folds the AST in place, once its TAC is counted.
+        tacgenerator = TACGenerator(parser.symbol_table, copy_literals=False)
+        tacgenerator.generate_program_quadruples(ast)
+        quadruples = tacgenerator.quadruples
+        counts.append(len(quadruples))
+        for stage in (optimizer.peephole, optimizer.values, optimizer.dead_code, optimizer.loops, optimizer.peephole):
+            quadruples = stage.optimize(quadruples)
+            counts.append(len(quadruples))
+        totals = [total + count for total, count in zip(totals, counts)]
+        print(f'{os.path.relpath(path, HERE):<32}' + ''.join(f'{count:>11}' for count in counts))
+    print(f"{'total':<32}" + ''.join(f'{total:>11}' for total in totals))
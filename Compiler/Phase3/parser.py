@@ -1,5 +1,53 @@
+import os
 import ply.yacc as yacc
+import tableCache
 from lexer import Lexer
+from tokenFile import read_token_file
+from astNodes import (Program, Decs, FuncDec, Block, Assign, IfThen, IfThenElse, While, For, Return, BinaryOp,
+                      RelOp, Literal, Id, FunctionCall)
+
+# Syntax errors reported per parse before it is abandoned.
+MAX_ERRORS = 100
+# Tokens on which panic-mode recovery resumes parsing.
+SYNC_TOKENS = ('SEMICOLON', 'END_KW')
+
+
+class Diagnostic:
+    """
+    A lexical or syntax error found while parsing.
+
+    Attributes:
+        line (int): Line of the offending token or character, or of the end of the input.
+        position (int): Position of the offending token or character in the source (None at
+            the end of the input).
+        token (str): Type of the offending token ('$end' at the end of the input, None for
+            an illegal character).
+        lexeme (str): Text of the offending token or character ('' at the end of the input).
+        message (str): Description of the error.
+    """
+    __slots__ = ('line', 'position', 'token', 'lexeme', 'message')
+
+    def __init__(self, line, position, token, lexeme, message):
+        self.line = line
+        self.position = position
+        self.token = token
+        self.lexeme = lexeme
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f'Diagnostic(line={self.line}, token={self.token!r}, message={self.message!r})'
+
+    def to_dict(self):
+        """Returns the fields of the diagnostic as a dict (for JSON reports)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TooManyErrors(Exception):
+    """Raised to abandon a parse once `max_errors` lexical and syntax errors were reported."""
+
 
 class Parser:
     """
@@ -7,6 +55,13 @@ class Parser:
     This parser processes tokens generated by the Lexer class, verifies the 
     input program against the grammar rules, and constructs an abstract syntax 
     tree (AST) representation for further processing (e.g., TAC generation).
+
+    Syntax errors, and the illegal characters met by the lexer, are collected into
+    `diagnostics` instead of being printed. The
+    parser recovers in panic mode: a statement (or the rest of a block, or a
+    declaration) containing an error is skipped up to the next `;` or `end` outside
+    the nested blocks it contains, and parsing goes on, so one pass reports every
+    error of a file. A parse with errors returns None.
     """
 
     tokens = Lexer.tokens
@@ -19,152 +74,282 @@ class Parser:
         ('left', 'MUL_OP', 'DIV_OP'),
     )
 
-    def __init__(self):
+    def __init__(self, table_cache=None, max_errors=MAX_ERRORS, engine='ply'):
         """
         Initializes the parser.
         - Creates an instance of the Lexer for tokenizing input.
         - Builds the parser using PLY.
+
+        Args:
+            table_cache (str, optional): Root directory of a table cache. When given,
+                the lexer and LALR tables are loaded from a directory keyed by the
+                grammar hash (built on first use) and no debug files are written.
+                Raises `tableCache.StaleTableError` when the cached tables are stale.
+            max_errors (int, optional): Lexical and syntax errors reported before a parse is abandoned.
+            engine (str, optional): Scanner engine of the lexer ('ply', 'regex' or 'mmap', see `Lexer`).
+        """
+
+        self.max_errors = max_errors
+        self.diagnostics = []   # Lexical and syntax errors of the last parse.
+        if table_cache is None:
+            self.lexer = Lexer(engine=engine)
+            self.parser = yacc.yacc(module=self)
+        else:
+            directory = tableCache.cache_dir(table_cache, Lexer, self)
+            if os.path.isdir(directory):
+                self.lexer = Lexer(lextab=tableCache.load_lextab(directory, Lexer.tokens), engine=engine)
+            else:
+                # The lexer compiled from its rules is kept once its tables are written.
+                self.lexer = Lexer(engine=engine)
+                tableCache.build(self.lexer, self, directory)
+            self.parser = tableCache.load_parser(self, directory)
+        # Illegal characters become diagnostics instead of being printed by the lexer.
+        self.lexer.illegal_character = self.illegal_character
+
+    @property
+    def symbol_table(self):
         """
+        The SymbolTable filled while parsing; AST identifiers and literals are its handles.
+        None before the lexer is created (PLY reads every attribute of the parser).
+        """
+        lexer = getattr(self, 'lexer', None)
+        return lexer.symbol_table if lexer is not None else None
 
-        self.lexer = Lexer()
-        self.parser = yacc.yacc(module=self)
+    def reset(self):
+        """Resets the lexer (see `Lexer.reset`) and clears the diagnostics, before a new program."""
+        self.lexer.reset()
+        self.diagnostics = []
 
     def parse(self, data):
         """
         Parses the given input data (source code) and returns its AST representation.
+        The lexer state is reset first, so one Parser can be reused for many programs.
 
         Args:
             data (str): The source code to parse.
 
         Returns:
-            dict: An abstract syntax tree (AST) representation of the program.
+            Program: An abstract syntax tree (AST) representation of the program,
+                or None when it has lexical or syntax errors (see `diagnostics`).
+        """
+
+        self.reset()
+        return self.parse_tokens(self.lexer.iter_tokens(data))
+
+    def parse_file(self, path):
+        """
+        Parses a source file while it is being read, consuming its tokens lazily.
+
+        Args:
+            path (str): Path of the source file to parse.
+
+        Returns:
+            Program: An abstract syntax tree (AST) representation of the program,
+                or None when it has lexical or syntax errors (see `diagnostics`).
+        """
+
+        self.reset()
+        return self.parse_tokens(self.lexer.tokenize_file(path))
+
+    def parse_token_file(self, path):
+        """
+        Parses the tokens saved in a token file (see `tokenFile`) instead of lexing
+        the source again; the symbol table is rebuilt from the file.
+
+        Args:
+            path (str): Path of the token file to parse.
+
+        Returns:
+            Program: An abstract syntax tree (AST) representation of the program,
+                or None when it has lexical or syntax errors (see `diagnostics`).
+
+        Raises:
+            ValueError: If the file is not a token file of this version.
+        """
+
+        self.reset()
+        return self.parse_tokens(read_token_file(path, self.lexer))
+
+    def parse_tokens(self, tokens):
+        """
+        Parses tokens produced by this parser's lexer. Neither the lexer nor the
+        diagnostics are reset, so errors found while lexing the tokens beforehand count.
+
+        Args:
+            tokens (iterable): Tokens of the program.
+
+        Returns:
+            Program: An abstract syntax tree (AST) representation of the program,
+                or None when it has lexical or syntax errors (see `diagnostics`).
         """
 
-        return self.parser.parse(data, lexer=self.lexer.lexer)
+        tokens = iter(tokens)
+        pending = []    # Token pushed back by the recovery.
+        self._next_token = lambda: pending.pop() if pending else next(tokens, None)
+        self._push_token = pending.append
+        try:
+            program = self.parser.parse(lexer=self.lexer.lexer, tokenfunc=self._next_token)
+        except TooManyErrors:
+            return None
+        return None if self.diagnostics else program
 
     def p_start(self, p):
         '''start : PROGRAM_KW IDENTIFIER SEMICOLON decList funcList block'''
-        p[0] = {'type': 'program', 'id': p[2], 'decList': p[4], 'funcList': p[5], 'block': p[6]}
+        p[4].reverse()  # decList is right-recursive, so its list is built back to front.
+        p[0] = Program(p[2], p[4], p[5], p[6])
     
     def p_decList_1(self, p):
         '''decList : decs'''
-        p[0] = {'type': 'decList', 'decs': p[1], 'decList': None}
+        p[0] = [p[1]] if p[1] else []
 
     def p_decList_2(self, p):
         '''decList : decs decList'''
-        p[0] = {'type': 'decList', 'decs': p[1], 'decList': p[2]}
+        if p[1]:
+            p[2].append(p[1])
+        p[0] = p[2]
 
     def p_decs_1(self, p):
         '''decs : type varList SEMICOLON'''
-        p[0] = {'type': 'decs', 'type_node': p[1], 'varList': p[2]}
+        p[0] = Decs(p[1], p[2])
+
+        # Declare every variable of the list in the current scope.
+        for identifier in p[2]:
+            self.symbol_table.declare(identifier, p[1])
 
     def p_decs_2(self, p):
         '''decs : empty'''
-        p[0] = {'type': 'decs', 'empty': True}
+        p[0] = None
+
+    def p_decs_3(self, p):
+        '''decs : type error SEMICOLON'''
+        p[0] = None
 
     def p_type_1(self, p):
         '''type : INTEGER_KW'''
-        p[0] = {'type': 'type', 'typeName': 'integer'}
+        p[0] = 'integer'
 
     def p_type_2(self, p):
         '''type : REAL_KW'''
-        p[0] = {'type': 'type', 'typeName': 'real'}
+        p[0] = 'real'
 
     def p_type_3(self, p):
         '''type : BOOLEAN_KW'''
-        p[0] = {'type': 'type', 'typeName': 'boolean'}
+        p[0] = 'boolean'
 
     def p_varList_1(self, p):
         '''varList : IDENTIFIER'''
-        p[0] = {'type': 'varList', 'varList': None, 'identifier': p[1]}
+        p[0] = [p[1]]
     
     def p_varList_2(self, p):
         '''varList : varList COMMA IDENTIFIER'''
-        p[0] = {'type': 'varList', 'varList': p[1], 'identifier': p[3]}
+        p[1].append(p[3])
+        p[0] = p[1]
 
     def p_funcList_1(self, p):
         '''funcList : funcList funcDec'''
-        p[0] = {'type': 'funcList', 'funcList': p[1], 'funcDec': p[2]}
+        p[1].append(p[2])
+        p[0] = p[1]
 
     def p_funcList_2(self, p):
         '''funcList : empty'''
-        p[0] = {'type': 'funcList', 'empty': True}
+        p[0] = []
 
     def p_funcDec(self, p):
-        '''funcDec : FUNCTION_KW IDENTIFIER parameters COLON type decList block'''
-        p[0] = {'type': 'funcDec', 'id': p[2], 'parameters': p[3], 'returnType': p[5], 'decList': p[6], 'block': p[7]}
+        '''funcDec : FUNCTION_KW IDENTIFIER funcScope parameters COLON type decList block'''
+        self.symbol_table.exit_scope()
+        self.symbol_table.declare(p[2], p[6])
+        p[7].reverse()  # decList is right-recursive, so its list is built back to front.
+        p[0] = FuncDec(p[2], p[3], p[4], p[6], p[7], p[8])
+
+    def p_funcScope(self, p):
+        '''funcScope : '''
+        # Parameters and local declarations of a function live in their own scope.
+        p[0] = self.symbol_table.enter_scope()
 
     def p_parameters(self, p):
         '''parameters : LEFT_PA decList RIGHT_PA'''
-        p[0] = {'type': 'parameters', 'decList': p[2]}
+        p[2].reverse()
+        p[0] = p[2]
 
     def p_block(self, p):
         '''block : BEGIN_KW stmtList END_KW'''
-        p[0] = {'type': 'block', 'stmtList': p[2]}
+        p[0] = Block(p[2])
+
+    def p_block_error(self, p):
+        '''block : BEGIN_KW error END_KW
+                 | BEGIN_KW stmtList error END_KW'''
+        # Panic mode: the rest of the block is skipped up to its `end`.
+        p[0] = Block(p[2] if len(p) == 5 else [])
 
     def p_stmtList_1(self, p):
         '''stmtList : stmt'''
-        p[0] = {'type': 'stmtList', 'stmtList': None, 'stmt': p[1]}
+        p[0] = [p[1]]
 
     def p_stmtList_2(self, p):
         '''stmtList : stmtList stmt'''
-        p[0] = {'type': 'stmtList', 'stmtList': p[1], 'stmt': p[2]}
+        p[1].append(p[2])
+        p[0] = p[1]
 
     def p_stmt_1(self, p):
         '''stmt : IDENTIFIER ASSIGN_OP expr SEMICOLON'''
-        p[0] = {'type': 'stmt', 'stmtType': 'assign', 'id': p[1], 'expr': p[3]}
+        p[0] = Assign(p[1], p[3])
 
     def p_stmt_2(self, p):
         '''stmt : IF_KW expr THEN_KW stmt'''
-        p[0] = {'type': 'stmt', 'stmtType': 'if_then', 'expr': p[2], 'then_stmt': p[4]}
+        p[0] = IfThen(p[2], p[4])
 
     def p_stmt_3(self, p):
         '''stmt : IF_KW expr THEN_KW stmt ELSE_KW stmt'''
-        p[0] = {'type': 'stmt', 'stmtType': 'if_then_else', 'expr': p[2], 'then_stmt': p[4], 'else_stmt': p[6]}
+        p[0] = IfThenElse(p[2], p[4], p[6])
 
     def p_stmt_4(self, p):
         '''stmt : WHILE_KW expr DO_KW stmt'''
-        p[0] = {'type': 'stmt', 'stmtType': 'while', 'expr': p[2], 'stmt': p[4]}
+        p[0] = While(p[2], p[4])
 
     def p_stmt_5(self, p):
         '''stmt : FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmt'''
-        p[0] = {'type': 'stmt', 'stmtType': 'for', 'id': p[2], 'start_expr': p[4], 'end_expr': p[6], 'stmt': p[8]}
+        p[0] = For(p[2], p[4], p[6], p[8])
 
     def p_stmt_6(self, p):
         '''stmt : RETURN_KW expr SEMICOLON'''
-        p[0] = {'type': 'stmt', 'stmtType': 'return', 'expr': p[2]}
+        p[0] = Return(p[2])
 
     def p_stmt_7(self, p):
         '''stmt : block'''
-        p[0] = {'type': 'stmt', 'stmtType': 'block', 'block': p[1]}
+        p[0] = p[1]
+
+    def p_stmt_8(self, p):
+        '''stmt : error SEMICOLON'''
+        # Panic mode: the statement is skipped up to its `;`.
+        p[0] = None
 
     def p_expr_1(self, p):
         '''expr : expr AND_KW expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': 'and', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('and', p[1], p[3])
 
     def p_expr_2(self, p):
         '''expr : expr OR_KW expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': 'or', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('or', p[1], p[3])
 
     def p_expr_3(self, p):
         '''expr : expr MUL_OP expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': '*', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('*', p[1], p[3])
 
     def p_expr_4(self, p):
         '''expr : expr DIV_OP expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': '/', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('/', p[1], p[3])
 
     def p_expr_5(self, p):
         '''expr : expr ADD_OP expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': '+', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('+', p[1], p[3])
 
     def p_expr_6(self, p):
         '''expr : expr SUB_OP expr'''
-        p[0] = {'type': 'expr', 'exprType': 'binary_op', 'op': '-', 'left': p[1], 'right': p[3]}
+        p[0] = BinaryOp('-', p[1], p[3])
 
     def p_expr_7(self, p):
         '''expr : expr relop expr'''
-        p[0] = {'type': 'expr', 'exprType': 'rel_op', 'op': p[2], 'left': p[1], 'right': p[3]}
+        p[0] = RelOp(p[2], p[1], p[3])
 
     def p_expr_8(self, p):
         '''expr : LEFT_PA expr RIGHT_PA'''
@@ -172,43 +357,44 @@ class Parser:
 
     def p_expr_9(self, p):
         '''expr : INTEGER_NUMBER'''
-        p[0] = {'type': 'expr', 'exprType': 'literal', 'literalType': 'integer', 'value': p[1]}
+        p[0] = Literal('integer', p[1])
 
     def p_expr_10(self, p):
         '''expr : REAL_NUMBER'''
-        p[0] = {'type': 'expr', 'exprType': 'literal', 'literalType': 'real', 'value': p[1]}
+        p[0] = Literal('real', p[1])
 
     def p_expr_11(self, p):
         '''expr : TRUE_KW'''
-        p[0] = {'type': 'expr', 'exprType': 'literal', 'literalType': 'boolean', 'value': True}
+        p[0] = Literal('boolean', self.symbol_table.boolean(True))
 
     def p_expr_12(self, p):
         '''expr : FALSE_KW'''
-        p[0] = {'type': 'expr', 'exprType': 'literal', 'literalType': 'boolean', 'value': False}
+        p[0] = Literal('boolean', self.symbol_table.boolean(False))
 
     def p_expr_13(self, p):
         '''expr : IDENTIFIER LEFT_PA actualparamlist RIGHT_PA'''
-        p[0] = {'type': 'expr', 'exprType': 'function_call', 'id': p[1], 'actualParamList': p[3]}
+        p[0] = FunctionCall(p[1], p[3])
 
     def p_expr_14(self, p):
         '''expr : IDENTIFIER'''
-        p[0] = {'type': 'expr', 'exprType': 'id', 'id': p[1]}
+        p[0] = Id(p[1])
 
     def p_actualparamlist_1(self, p):
         '''actualparamlist : expr'''
-        p[0] = {'type': 'actualparamlist', 'actualParamList': [p[1]]}
+        p[0] = [p[1]]
 
     def p_actualparamlist_2(self, p):
         '''actualparamlist : actualparamlist COMMA expr'''
-        p[0] = {'type': 'actualparamlist', 'actualParamList': p[1]['actualParamList'] + [p[3]]}
+        p[1].append(p[3])
+        p[0] = p[1]
 
     def p_actualparamlist_3(self, p):
         '''actualparamlist : IDENTIFIER'''
-        p[0] = {'type': 'actualparamlist', 'actualParamList': [ {'type': 'expr', 'exprType': 'id', 'id': p[1]} ] }
+        p[0] = [Id(p[1])]
 
     def p_actualparamlist_4(self, p):
         '''actualparamlist : empty'''
-        p[0] = {'type': 'actualparamlist', 'actualParamList': []}
+        p[0] = []
 
     def p_relop_1(self, p):
         '''relop : LT_OP'''
@@ -238,9 +424,55 @@ class Parser:
         '''empty : '''
         p[0] = None
 
+    def illegal_character(self, character, position):
+        """
+        Records an illegal character skipped by the lexer (replaces `Lexer.illegal_character`).
+
+        Raises:
+            TooManyErrors: When `max_errors` errors were reported.
+        """
+        line = self.lexer.lexer.lineno
+        self.diagnostics.append(Diagnostic(
+            line, position, None, character, f"Illegal character '{character}' at position {position} on line {line}"))
+        if len(self.diagnostics) >= self.max_errors:
+            raise TooManyErrors()
+
     def p_error(self, p):
+        """
+        Records a syntax error and skips the tokens up to the next `;` or `end` outside
+        nested blocks. PLY then recovers through the `error` rules, resuming at that token,
+        and reports no new error until three tokens were shifted, so a single mistake
+        does not cascade.
+
+        Raises:
+            TooManyErrors: When `max_errors` errors were reported.
+        """
         if p:
-            print(f"Syntax error at token '{p.type}' (value '{p.value}') on line {p.lineno}")
-            self.parser.errok() 
+            lexeme = self.lexer.lexeme(p)
+            self.diagnostics.append(Diagnostic(
+                p.lineno, p.lexpos, p.type, lexeme,
+                f"Syntax error at token '{p.type}' (value '{lexeme}') on line {p.lineno}"))
+            if p.type not in SYNC_TOKENS:
+                self._skip_to_sync()
         else:
-            print("Syntax error at EOF")
\ No newline at end of file
+            self.diagnostics.append(Diagnostic(self.lexer.lexer.lineno, None, '$end', '', "Syntax error at EOF"))
+        if len(self.diagnostics) >= self.max_errors:
+            raise TooManyErrors()
+
+    def _skip_to_sync(self):
+        """
+        Discards tokens up to the next `;` or `end` outside nested `begin`...`end` blocks,
+        which is pushed back as the next token (a skipped block would otherwise end the
+        enclosing one). Each token is read once, so recovery stays linear in the input.
+        """
+        depth = 0
+        token = self._next_token()
+        while token:
+            if token.type == 'BEGIN_KW':
+                depth += 1
+            elif token.type == 'END_KW' and depth:
+                depth -= 1
+            elif token.type in SYNC_TOKENS and not depth:
+                self._push_token(token)
+                return
+            token = self._next_token()
\ No newline at end of file
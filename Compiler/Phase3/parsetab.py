@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'leftOR_KWleftAND_KWleftEQ_OPNE_OPLT_OPLE_OPGT_OPGE_OPleftADD_OPSUB_OPleftMUL_OPDIV_OPADD_OP AND_KW ASSIGN_OP BEGIN_KW BOOLEAN_KW COLON COMMA DIV_OP DO_KW ELSE_KW END_KW EQ_OP FALSE_KW FOR_KW FUNCTION_KW GE_OP GT_OP IDENTIFIER IF_KW INTEGER_KW INTEGER_NUMBER Illegal_Lexeme LEFT_PA LE_OP LT_OP MUL_OP NE_OP OR_KW PROGRAM_KW REAL_KW REAL_NUMBER RETURN_KW RIGHT_PA SEMICOLON SUB_OP THEN_KW TO_KW TRUE_KW WHILE_KWstart : PROGRAM_KW IDENTIFIER SEMICOLON decList funcList blockdecList : decsdecList : decs decListdecs : type varList SEMICOLONdecs : emptytype : INTEGER_KWtype : REAL_KWtype : BOOLEAN_KWvarList : IDENTIFIERvarList : varList COMMA IDENTIFIERfuncList : funcList funcDecfuncList : emptyfuncDec : FUNCTION_KW IDENTIFIER parameters COLON type decList blockparameters : LEFT_PA decList RIGHT_PAblock : BEGIN_KW stmtList END_KWstmtList : stmtstmtList : stmtList stmtstmt : IDENTIFIER ASSIGN_OP expr SEMICOLONstmt : IF_KW expr THEN_KW stmtstmt : IF_KW expr THEN_KW stmt ELSE_KW stmtstmt : WHILE_KW expr DO_KW stmtstmt : FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmtstmt : RETURN_KW expr SEMICOLONstmt : blockexpr : expr AND_KW exprexpr : expr OR_KW exprexpr : expr MUL_OP exprexpr : expr DIV_OP exprexpr : expr ADD_OP exprexpr : expr SUB_OP exprexpr : expr relop exprexpr : LEFT_PA expr RIGHT_PAexpr : INTEGER_NUMBERexpr : REAL_NUMBERexpr : TRUE_KWexpr : FALSE_KWexpr : IDENTIFIER LEFT_PA actualparamlist RIGHT_PAexpr : IDENTIFIERactualparamlist : expractualparamlist : actualparamlist COMMA expractualparamlist : IDENTIFIERactualparamlist : emptyrelop : LT_OPrelop : LE_OPrelop : EQ_OPrelop : NE_OPrelop : GE_OPrelop : GT_OPempty : '
+_lr_signature = 'leftOR_KWleftAND_KWleftEQ_OPNE_OPLT_OPLE_OPGT_OPGE_OPleftADD_OPSUB_OPleftMUL_OPDIV_OPADD_OP AND_KW ASSIGN_OP BEGIN_KW BOOLEAN_KW COLON COMMA DIV_OP DO_KW ELSE_KW END_KW EQ_OP FALSE_KW FOR_KW FUNCTION_KW GE_OP GT_OP IDENTIFIER IF_KW INTEGER_KW INTEGER_NUMBER Illegal_Lexeme LEFT_PA LE_OP LT_OP MUL_OP NE_OP OR_KW PROGRAM_KW REAL_KW REAL_NUMBER RETURN_KW RIGHT_PA SEMICOLON SUB_OP THEN_KW TO_KW TRUE_KW WHILE_KWstart : PROGRAM_KW IDENTIFIER SEMICOLON decList funcList blockdecList : decsdecList : decs decListdecs : type varList SEMICOLONdecs : emptydecs : type error SEMICOLONtype : INTEGER_KWtype : REAL_KWtype : BOOLEAN_KWvarList : IDENTIFIERvarList : varList COMMA IDENTIFIERfuncList : funcList funcDecfuncList : emptyfuncDec : FUNCTION_KW IDENTIFIER funcScope parameters COLON type decList blockfuncScope : parameters : LEFT_PA decList RIGHT_PAblock : BEGIN_KW stmtList END_KWblock : BEGIN_KW error END_KW\n                 | BEGIN_KW stmtList error END_KWstmtList : stmtstmtList : stmtList stmtstmt : IDENTIFIER ASSIGN_OP expr SEMICOLONstmt : IF_KW expr THEN_KW stmtstmt : IF_KW expr THEN_KW stmt ELSE_KW stmtstmt : WHILE_KW expr DO_KW stmtstmt : FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmtstmt : RETURN_KW expr SEMICOLONstmt : blockstmt : error SEMICOLONexpr : expr AND_KW exprexpr : expr OR_KW exprexpr : expr MUL_OP exprexpr : expr DIV_OP exprexpr : expr ADD_OP exprexpr : expr SUB_OP exprexpr : expr relop exprexpr : LEFT_PA expr RIGHT_PAexpr : INTEGER_NUMBERexpr : REAL_NUMBERexpr : TRUE_KWexpr : FALSE_KWexpr : IDENTIFIER LEFT_PA actualparamlist RIGHT_PAexpr : IDENTIFIERactualparamlist : expractualparamlist : actualparamlist COMMA expractualparamlist : IDENTIFIERactualparamlist : emptyrelop : LT_OPrelop : LE_OPrelop : EQ_OPrelop : NE_OPrelop : GE_OPrelop : GT_OPempty : '
     
-_lr_action_items = {'PROGRAM_KW':([0,],[2,]),'$end':([1,17,33,],[0,-1,-15,]),'IDENTIFIER':([2,7,9,10,11,19,20,22,23,24,26,27,28,29,30,33,34,35,37,49,50,51,52,53,54,55,56,57,58,59,60,61,62,64,65,66,67,70,71,84,88,90,91,93,97,98,],[3,16,-6,-7,-8,25,31,32,25,-16,42,42,44,42,-24,-15,-17,42,42,25,42,42,42,42,42,42,42,-43,-44,-45,-46,-47,-48,80,25,42,-23,-18,-19,-21,25,42,42,-20,25,-22,]),'SEMICOLON':([3,15,16,32,38,39,40,41,42,45,48,72,73,74,75,76,77,78,79,89,],[4,21,-9,-10,-33,-34,-35,-36,-38,67,70,-25,-26,-27,-28,-29,-30,-31,-32,-37,]),'INTEGER_KW':([4,6,8,9,10,11,21,47,68,86,],[9,9,-5,-6,-7,-8,-4,9,9,9,]),'REAL_KW':([4,6,8,9,10,11,21,47,68,86,],[10,10,-5,-6,-7,-8,-4,10,10,10,]),'BOOLEAN_KW':([4,6,8,9,10,11,21,47,68,86,],[11,11,-5,-6,-7,-8,-4,11,11,11,]),'BEGIN_KW':([4,5,6,8,9,10,11,12,13,14,18,19,21,23,24,30,33,34,49,65,67,70,71,84,86,88,92,93,96,97,98,],[-49,-49,-2,-5,-6,-7,-8,19,-12,-3,-11,19,-4,19,-16,-24,-15,-17,19,19,-23,-18,-19,-21,-49,19,19,-20,-13,19,-22,]),'FUNCTION_KW':([4,5,6,8,12,13,14,18,21,33,96,],[-49,-49,-2,-5,20,-12,-3,-11,-4,-15,-13,]),'RIGHT_PA':([6,8,14,21,38,39,40,41,42,47,63,64,69,72,73,74,75,76,77,78,79,80,81,82,83,89,94,],[-2,-5,-3,-4,-33,-34,-35,-36,-38,-49,79,-49,87,-25,-26,-27,-28,-29,-30,-31,-32,-38,89,-39,-42,-37,-40,]),'COMMA':([15,16,32,38,39,40,41,42,64,72,73,74,75,76,77,78,79,80,81,82,83,89,94,],[22,-9,-10,-33,-34,-35,-36,-38,-49,-25,-26,-27,-28,-29,-30,-31,-32,-38,90,-39,-42,-37,-40,]),'IF_KW':([19,23,24,30,33,34,49,65,67,70,71,84,88,93,97,98,],[26,26,-16,-24,-15,-17,26,26,-23,-18,-19,-21,26,-20,26,-22,]),'WHILE_KW':([19,23,24,30,33,34,49,65,67,70,71,84,88,93,97,98,],[27,27,-16,-24,-15,-17,27,27,-23,-18,-19,-21,27,-20,27,-22,]),'FOR_KW':([19,23,24,30,33,34,49,65,67,70,71,84,88,93,97,98,],[28,28,-16,-24,-15,-17,28,28,-23,-18,-19,-21,28,-20,28,-22,]),'RETURN_KW':([19,23,24,30,33,34,49,65,67,70,71,84,88,93,97,98,],[29,29,-16,-24,-15,-17,29,29,-23,-18,-19,-21,29,-20,29,-22,]),'END_KW':([23,24,30,33,34,67,70,71,84,93,98,],[33,-16,-24,-15,-17,-23,-18,-19,-21,-20,-22,]),'ASSIGN_OP':([25,44,],[35,66,]),'LEFT_PA':([26,27,29,31,35,37,42,50,51,52,53,54,55,56,57,58,59,60,61,62,64,66,80,90,91,],[37,37,37,47,37,37,64,37,37,37,37,37,37,37,-43,-44,-45,-46,-47,-48,37,37,64,37,37,]),'INTEGER_NUMBER':([26,27,29,35,37,50,51,52,53,54,55,56,57,58,59,60,61,62,64,66,90,91,],[38,38,38,38,38,38,38,38,38,38,38,38,-43,-44,-45,-46,-47,-48,38,38,38,38,]),'REAL_NUMBER':([26,27,29,35,37,50,51,52,53,54,55,56,57,58,59,60,61,62,64,66,90,91,],[39,39,39,39,39,39,39,39,39,39,39,39,-43,-44,-45,-46,-47,-48,39,39,39,39,]),'TRUE_KW':([26,27,29,35,37,50,51,52,53,54,55,56,57,58,59,60,61,62,64,66,90,91,],[40,40,40,40,40,40,40,40,40,40,40,40,-43,-44,-45,-46,-47,-48,40,40,40,40,]),'FALSE_KW':([26,27,29,35,37,50,51,52,53,54,55,56,57,58,59,60,61,62,64,66,90,91,],[41,41,41,41,41,41,41,41,41,41,41,41,-43,-44,-45,-46,-47,-48,41,41,41,41,]),'ELSE_KW':([30,33,67,70,71,84,93,98,],[-24,-15,-23,-18,88,-21,-20,-22,]),'THEN_KW':([36,38,39,40,41,42,72,73,74,75,76,77,78,79,89,],[49,-33,-34,-35,-36,-38,-25,-26,-27,-28,-29,-30,-31,-32,-37,]),'AND_KW':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[50,-33,-34,-35,-36,-38,50,50,50,50,-25,50,-27,-28,-29,-30,50,-32,-38,50,50,-37,50,50,]),'OR_KW':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[51,-33,-34,-35,-36,-38,51,51,51,51,-25,-26,-27,-28,-29,-30,51,-32,-38,51,51,-37,51,51,]),'MUL_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[52,-33,-34,-35,-36,-38,52,52,52,52,52,52,-27,-28,52,52,52,-32,-38,52,52,-37,52,52,]),'DIV_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[53,-33,-34,-35,-36,-38,53,53,53,53,53,53,-27,-28,53,53,53,-32,-38,53,53,-37,53,53,]),'ADD_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[54,-33,-34,-35,-36,-38,54,54,54,54,54,54,-27,-28,-29,-30,54,-32,-38,54,54,-37,54,54,]),'SUB_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[55,-33,-34,-35,-36,-38,55,55,55,55,55,55,-27,-28,-29,-30,55,-32,-38,55,55,-37,55,55,]),'LT_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[57,-33,-34,-35,-36,-38,57,57,57,57,57,57,-27,-28,-29,-30,57,-32,-38,57,57,-37,57,57,]),'LE_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[58,-33,-34,-35,-36,-38,58,58,58,58,58,58,-27,-28,-29,-30,58,-32,-38,58,58,-37,58,58,]),'EQ_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[59,-33,-34,-35,-36,-38,59,59,59,59,59,59,-27,-28,-29,-30,59,-32,-38,59,59,-37,59,59,]),'NE_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[60,-33,-34,-35,-36,-38,60,60,60,60,60,60,-27,-28,-29,-30,60,-32,-38,60,60,-37,60,60,]),'GE_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[61,-33,-34,-35,-36,-38,61,61,61,61,61,61,-27,-28,-29,-30,61,-32,-38,61,61,-37,61,61,]),'GT_OP':([36,38,39,40,41,42,43,45,48,63,72,73,74,75,76,77,78,79,80,82,85,89,94,95,],[62,-33,-34,-35,-36,-38,62,62,62,62,62,62,-27,-28,-29,-30,62,-32,-38,62,62,-37,62,62,]),'DO_KW':([38,39,40,41,42,43,72,73,74,75,76,77,78,79,89,95,],[-33,-34,-35,-36,-38,65,-25,-26,-27,-28,-29,-30,-31,-32,-37,97,]),'TO_KW':([38,39,40,41,42,72,73,74,75,76,77,78,79,85,89,],[-33,-34,-35,-36,-38,-25,-26,-27,-28,-29,-30,-31,-32,91,-37,]),'COLON':([46,87,],[68,-14,]),}
+_lr_action_items = {'PROGRAM_KW':([0,],[2,]),'$end':([1,18,36,39,53,],[0,-1,-17,-18,-19,]),'IDENTIFIER':([2,7,9,10,11,20,21,23,25,27,29,30,31,32,33,36,38,39,40,41,43,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,70,71,72,73,76,77,91,95,97,98,101,105,107,],[3,17,-7,-8,-9,28,34,35,28,-20,48,48,50,48,-28,-17,-21,-18,-29,48,48,-19,28,48,48,48,48,48,48,48,-48,-49,-50,-51,-52,-53,87,28,48,-27,-22,-23,-25,28,48,48,-24,28,-26,]),'SEMICOLON':([3,15,16,17,26,35,37,44,45,46,47,48,51,54,78,79,80,81,82,83,84,85,86,96,],[4,22,24,-10,40,-11,40,-38,-39,-40,-41,-43,73,76,40,-30,-31,-32,-33,-34,-35,-36,-37,-42,]),'INTEGER_KW':([4,6,8,9,10,11,22,24,75,93,99,],[9,9,-5,-7,-8,-9,-4,-6,9,9,9,]),'REAL_KW':([4,6,8,9,10,11,22,24,75,93,99,],[10,10,-5,-7,-8,-9,-4,-6,10,10,10,]),'BOOLEAN_KW':([4,6,8,9,10,11,22,24,75,93,99,],[11,11,-5,-7,-8,-9,-4,-6,11,11,11,]),'BEGIN_KW':([4,5,6,8,9,10,11,12,13,14,19,20,22,24,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,99,101,104,105,106,107,],[-54,-54,-2,-5,-7,-8,-9,20,-13,-3,-12,20,-4,-6,20,-20,-28,-17,-21,-18,-29,-19,20,20,-27,-22,-23,-25,20,-54,-24,20,20,-14,-26,]),'FUNCTION_KW':([4,5,6,8,12,13,14,19,22,24,36,39,53,106,],[-54,-54,-2,-5,21,-13,-3,-12,-4,-6,-17,-18,-19,-14,]),'RIGHT_PA':([6,8,14,22,24,44,45,46,47,48,69,70,75,79,80,81,82,83,84,85,86,87,88,89,90,94,96,102,],[-2,-5,-3,-4,-6,-38,-39,-40,-41,-43,86,-54,-54,-30,-31,-32,-33,-34,-35,-36,-37,-43,96,-44,-47,100,-42,-45,]),'error':([7,9,10,11,20,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,101,105,107,],[16,-7,-8,-9,26,37,-20,-28,-17,-21,-18,-29,-19,78,78,-27,-22,-23,-25,78,-24,78,-26,]),'COMMA':([15,17,35,44,45,46,47,48,70,79,80,81,82,83,84,85,86,87,88,89,90,96,102,],[23,-10,-11,-38,-39,-40,-41,-43,-54,-30,-31,-32,-33,-34,-35,-36,-37,-43,97,-44,-47,-42,-45,]),'IF_KW':([20,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,101,105,107,],[29,29,-20,-28,-17,-21,-18,-29,-19,29,29,-27,-22,-23,-25,29,-24,29,-26,]),'WHILE_KW':([20,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,101,105,107,],[30,30,-20,-28,-17,-21,-18,-29,-19,30,30,-27,-22,-23,-25,30,-24,30,-26,]),'FOR_KW':([20,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,101,105,107,],[31,31,-20,-28,-17,-21,-18,-29,-19,31,31,-27,-22,-23,-25,31,-24,31,-26,]),'RETURN_KW':([20,25,27,33,36,38,39,40,53,55,71,73,76,77,91,95,101,105,107,],[32,32,-20,-28,-17,-21,-18,-29,-19,32,32,-27,-22,-23,-25,32,-24,32,-26,]),'END_KW':([25,26,27,33,36,37,38,39,40,53,73,76,77,91,101,107,],[36,39,-20,-28,-17,53,-21,-18,-29,-19,-27,-22,-23,-25,-24,-26,]),'ASSIGN_OP':([28,50,],[41,72,]),'LEFT_PA':([29,30,32,34,41,43,48,52,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,87,97,98,],[43,43,43,-15,43,43,70,75,43,43,43,43,43,43,43,-48,-49,-50,-51,-52,-53,43,43,70,43,43,]),'INTEGER_NUMBER':([29,30,32,41,43,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,97,98,],[44,44,44,44,44,44,44,44,44,44,44,44,-48,-49,-50,-51,-52,-53,44,44,44,44,]),'REAL_NUMBER':([29,30,32,41,43,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,97,98,],[45,45,45,45,45,45,45,45,45,45,45,45,-48,-49,-50,-51,-52,-53,45,45,45,45,]),'TRUE_KW':([29,30,32,41,43,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,97,98,],[46,46,46,46,46,46,46,46,46,46,46,46,-48,-49,-50,-51,-52,-53,46,46,46,46,]),'FALSE_KW':([29,30,32,41,43,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,97,98,],[47,47,47,47,47,47,47,47,47,47,47,47,-48,-49,-50,-51,-52,-53,47,47,47,47,]),'ELSE_KW':([33,36,39,40,53,73,76,77,91,101,107,],[-28,-17,-18,-29,-19,-27,-22,95,-25,-24,-26,]),'THEN_KW':([42,44,45,46,47,48,79,80,81,82,83,84,85,86,96,],[55,-38,-39,-40,-41,-43,-30,-31,-32,-33,-34,-35,-36,-37,-42,]),'AND_KW':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[56,-38,-39,-40,-41,-43,56,56,56,56,-30,56,-32,-33,-34,-35,56,-37,-43,56,56,-42,56,56,]),'OR_KW':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[57,-38,-39,-40,-41,-43,57,57,57,57,-30,-31,-32,-33,-34,-35,57,-37,-43,57,57,-42,57,57,]),'MUL_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[58,-38,-39,-40,-41,-43,58,58,58,58,58,58,-32,-33,58,58,58,-37,-43,58,58,-42,58,58,]),'DIV_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[59,-38,-39,-40,-41,-43,59,59,59,59,59,59,-32,-33,59,59,59,-37,-43,59,59,-42,59,59,]),'ADD_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[60,-38,-39,-40,-41,-43,60,60,60,60,60,60,-32,-33,-34,-35,60,-37,-43,60,60,-42,60,60,]),'SUB_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[61,-38,-39,-40,-41,-43,61,61,61,61,61,61,-32,-33,-34,-35,61,-37,-43,61,61,-42,61,61,]),'LT_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[63,-38,-39,-40,-41,-43,63,63,63,63,63,63,-32,-33,-34,-35,63,-37,-43,63,63,-42,63,63,]),'LE_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[64,-38,-39,-40,-41,-43,64,64,64,64,64,64,-32,-33,-34,-35,64,-37,-43,64,64,-42,64,64,]),'EQ_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[65,-38,-39,-40,-41,-43,65,65,65,65,65,65,-32,-33,-34,-35,65,-37,-43,65,65,-42,65,65,]),'NE_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[66,-38,-39,-40,-41,-43,66,66,66,66,66,66,-32,-33,-34,-35,66,-37,-43,66,66,-42,66,66,]),'GE_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[67,-38,-39,-40,-41,-43,67,67,67,67,67,67,-32,-33,-34,-35,67,-37,-43,67,67,-42,67,67,]),'GT_OP':([42,44,45,46,47,48,49,51,54,69,79,80,81,82,83,84,85,86,87,89,92,96,102,103,],[68,-38,-39,-40,-41,-43,68,68,68,68,68,68,-32,-33,-34,-35,68,-37,-43,68,68,-42,68,68,]),'DO_KW':([44,45,46,47,48,49,79,80,81,82,83,84,85,86,96,103,],[-38,-39,-40,-41,-43,71,-30,-31,-32,-33,-34,-35,-36,-37,-42,105,]),'TO_KW':([44,45,46,47,48,79,80,81,82,83,84,85,86,92,96,],[-38,-39,-40,-41,-43,-30,-31,-32,-33,-34,-35,-36,-37,98,-42,]),'COLON':([74,100,],[93,-16,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'start':([0,],[1,]),'decList':([4,6,47,86,],[5,14,69,92,]),'decs':([4,6,47,86,],[6,6,6,6,]),'type':([4,6,47,68,86,],[7,7,7,86,7,]),'empty':([4,5,6,47,64,86,],[8,13,8,8,83,8,]),'funcList':([5,],[12,]),'varList':([7,],[15,]),'block':([12,19,23,49,65,88,92,97,],[17,30,30,30,30,30,96,30,]),'funcDec':([12,],[18,]),'stmtList':([19,],[23,]),'stmt':([19,23,49,65,88,97,],[24,34,71,84,93,98,]),'expr':([26,27,29,35,37,50,51,52,53,54,55,56,64,66,90,91,],[36,43,45,48,63,72,73,74,75,76,77,78,82,85,94,95,]),'parameters':([31,],[46,]),'relop':([36,43,45,48,63,72,73,74,75,76,77,78,82,85,94,95,],[56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,]),'actualparamlist':([64,],[81,]),}
+_lr_goto_items = {'start':([0,],[1,]),'decList':([4,6,75,99,],[5,14,94,104,]),'decs':([4,6,75,99,],[6,6,6,6,]),'type':([4,6,75,93,99,],[7,7,7,99,7,]),'empty':([4,5,6,70,75,99,],[8,13,8,90,8,8,]),'funcList':([5,],[12,]),'varList':([7,],[15,]),'block':([12,20,25,55,71,95,104,105,],[18,33,33,33,33,33,106,33,]),'funcDec':([12,],[19,]),'stmtList':([20,],[25,]),'stmt':([20,25,55,71,95,105,],[27,38,77,91,101,107,]),'expr':([29,30,32,41,43,56,57,58,59,60,61,62,70,72,97,98,],[42,49,51,54,69,79,80,81,82,83,84,85,89,92,102,103,]),'funcScope':([34,],[52,]),'relop':([42,49,51,54,69,79,80,81,82,83,84,85,89,92,102,103,],[62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,]),'parameters':([52,],[74,]),'actualparamlist':([70,],[88,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,53 +27,58 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> start","S'",1,None,None,None),
-  ('start -> PROGRAM_KW IDENTIFIER SEMICOLON decList funcList block','start',6,'p_start','parsertest1.py',24),
-  ('decList -> decs','decList',1,'p_decList_1','parsertest1.py',28),
-  ('decList -> decs decList','decList',2,'p_decList_2','parsertest1.py',32),
-  ('decs -> type varList SEMICOLON','decs',3,'p_decs_1','parsertest1.py',36),
-  ('decs -> empty','decs',1,'p_decs_2','parsertest1.py',40),
-  ('type -> INTEGER_KW','type',1,'p_type_1','parsertest1.py',44),
-  ('type -> REAL_KW','type',1,'p_type_2','parsertest1.py',48),
-  ('type -> BOOLEAN_KW','type',1,'p_type_3','parsertest1.py',52),
-  ('varList -> IDENTIFIER','varList',1,'p_varList_1','parsertest1.py',56),
-  ('varList -> varList COMMA IDENTIFIER','varList',3,'p_varList_2','parsertest1.py',60),
-  ('funcList -> funcList funcDec','funcList',2,'p_funcList_1','parsertest1.py',64),
-  ('funcList -> empty','funcList',1,'p_funcList_2','parsertest1.py',68),
-  ('funcDec -> FUNCTION_KW IDENTIFIER parameters COLON type decList block','funcDec',7,'p_funcDec','parsertest1.py',72),
-  ('parameters -> LEFT_PA decList RIGHT_PA','parameters',3,'p_parameters','parsertest1.py',76),
-  ('block -> BEGIN_KW stmtList END_KW','block',3,'p_block','parsertest1.py',80),
-  ('stmtList -> stmt','stmtList',1,'p_stmtList_1','parsertest1.py',84),
-  ('stmtList -> stmtList stmt','stmtList',2,'p_stmtList_2','parsertest1.py',88),
-  ('stmt -> IDENTIFIER ASSIGN_OP expr SEMICOLON','stmt',4,'p_stmt_1','parsertest1.py',92),
-  ('stmt -> IF_KW expr THEN_KW stmt','stmt',4,'p_stmt_2','parsertest1.py',96),
-  ('stmt -> IF_KW expr THEN_KW stmt ELSE_KW stmt','stmt',6,'p_stmt_3','parsertest1.py',100),
-  ('stmt -> WHILE_KW expr DO_KW stmt','stmt',4,'p_stmt_4','parsertest1.py',104),
-  ('stmt -> FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmt','stmt',8,'p_stmt_5','parsertest1.py',108),
-  ('stmt -> RETURN_KW expr SEMICOLON','stmt',3,'p_stmt_6','parsertest1.py',112),
-  ('stmt -> block','stmt',1,'p_stmt_7','parsertest1.py',116),
-  ('expr -> expr AND_KW expr','expr',3,'p_expr_1','parsertest1.py',121),
-  ('expr -> expr OR_KW expr','expr',3,'p_expr_2','parsertest1.py',125),
-  ('expr -> expr MUL_OP expr','expr',3,'p_expr_3','parsertest1.py',129),
-  ('expr -> expr DIV_OP expr','expr',3,'p_expr_4','parsertest1.py',133),
-  ('expr -> expr ADD_OP expr','expr',3,'p_expr_5','parsertest1.py',137),
-  ('expr -> expr SUB_OP expr','expr',3,'p_expr_6','parsertest1.py',141),
-  ('expr -> expr relop expr','expr',3,'p_expr_7','parsertest1.py',145),
-  ('expr -> LEFT_PA expr RIGHT_PA','expr',3,'p_expr_8','parsertest1.py',149),
-  ('expr -> INTEGER_NUMBER','expr',1,'p_expr_9','parsertest1.py',153),
-  ('expr -> REAL_NUMBER','expr',1,'p_expr_10','parsertest1.py',157),
-  ('expr -> TRUE_KW','expr',1,'p_expr_11','parsertest1.py',161),
-  ('expr -> FALSE_KW','expr',1,'p_expr_12','parsertest1.py',165),
-  ('expr -> IDENTIFIER LEFT_PA actualparamlist RIGHT_PA','expr',4,'p_expr_13','parsertest1.py',169),
-  ('expr -> IDENTIFIER','expr',1,'p_expr_14','parsertest1.py',173),
-  ('actualparamlist -> expr','actualparamlist',1,'p_actualparamlist_1','parsertest1.py',177),
-  ('actualparamlist -> actualparamlist COMMA expr','actualparamlist',3,'p_actualparamlist_2','parsertest1.py',181),
-  ('actualparamlist -> IDENTIFIER','actualparamlist',1,'p_actualparamlist_3','parsertest1.py',185),
-  ('actualparamlist -> empty','actualparamlist',1,'p_actualparamlist_4','parsertest1.py',189),
-  ('relop -> LT_OP','relop',1,'p_relop_1','parsertest1.py',193),
-  ('relop -> LE_OP','relop',1,'p_relop_2','parsertest1.py',197),
-  ('relop -> EQ_OP','relop',1,'p_relop_3','parsertest1.py',201),
-  ('relop -> NE_OP','relop',1,'p_relop_4','parsertest1.py',205),
-  ('relop -> GE_OP','relop',1,'p_relop_5','parsertest1.py',209),
-  ('relop -> GT_OP','relop',1,'p_relop_6','parsertest1.py',213),
-  ('empty -> <empty>','empty',0,'p_empty','parsertest1.py',217),
+  ('start -> PROGRAM_KW IDENTIFIER SEMICOLON decList funcList block','start',6,'p_start','parser.py',160),
+  ('decList -> decs','decList',1,'p_decList_1','parser.py',165),
+  ('decList -> decs decList','decList',2,'p_decList_2','parser.py',169),
+  ('decs -> type varList SEMICOLON','decs',3,'p_decs_1','parser.py',175),
+  ('decs -> empty','decs',1,'p_decs_2','parser.py',183),
+  ('decs -> type error SEMICOLON','decs',3,'p_decs_3','parser.py',187),
+  ('type -> INTEGER_KW','type',1,'p_type_1','parser.py',191),
+  ('type -> REAL_KW','type',1,'p_type_2','parser.py',195),
+  ('type -> BOOLEAN_KW','type',1,'p_type_3','parser.py',199),
+  ('varList -> IDENTIFIER','varList',1,'p_varList_1','parser.py',203),
+  ('varList -> varList COMMA IDENTIFIER','varList',3,'p_varList_2','parser.py',207),
+  ('funcList -> funcList funcDec','funcList',2,'p_funcList_1','parser.py',212),
+  ('funcList -> empty','funcList',1,'p_funcList_2','parser.py',217),
+  ('funcDec -> FUNCTION_KW IDENTIFIER funcScope parameters COLON type decList block','funcDec',8,'p_funcDec','parser.py',221),
+  ('funcScope -> <empty>','funcScope',0,'p_funcScope','parser.py',228),
+  ('parameters -> LEFT_PA decList RIGHT_PA','parameters',3,'p_parameters','parser.py',233),
+  ('block -> BEGIN_KW stmtList END_KW','block',3,'p_block','parser.py',238),
+  ('block -> BEGIN_KW error END_KW','block',3,'p_block_error','parser.py',242),
+  ('block -> BEGIN_KW stmtList error END_KW','block',4,'p_block_error','parser.py',243),
+  ('stmtList -> stmt','stmtList',1,'p_stmtList_1','parser.py',248),
+  ('stmtList -> stmtList stmt','stmtList',2,'p_stmtList_2','parser.py',252),
+  ('stmt -> IDENTIFIER ASSIGN_OP expr SEMICOLON','stmt',4,'p_stmt_1','parser.py',257),
+  ('stmt -> IF_KW expr THEN_KW stmt','stmt',4,'p_stmt_2','parser.py',261),
+  ('stmt -> IF_KW expr THEN_KW stmt ELSE_KW stmt','stmt',6,'p_stmt_3','parser.py',265),
+  ('stmt -> WHILE_KW expr DO_KW stmt','stmt',4,'p_stmt_4','parser.py',269),
+  ('stmt -> FOR_KW IDENTIFIER ASSIGN_OP expr TO_KW expr DO_KW stmt','stmt',8,'p_stmt_5','parser.py',273),
+  ('stmt -> RETURN_KW expr SEMICOLON','stmt',3,'p_stmt_6','parser.py',277),
+  ('stmt -> block','stmt',1,'p_stmt_7','parser.py',281),
+  ('stmt -> error SEMICOLON','stmt',2,'p_stmt_8','parser.py',285),
+  ('expr -> expr AND_KW expr','expr',3,'p_expr_1','parser.py',290),
+  ('expr -> expr OR_KW expr','expr',3,'p_expr_2','parser.py',294),
+  ('expr -> expr MUL_OP expr','expr',3,'p_expr_3','parser.py',298),
+  ('expr -> expr DIV_OP expr','expr',3,'p_expr_4','parser.py',302),
+  ('expr -> expr ADD_OP expr','expr',3,'p_expr_5','parser.py',306),
+  ('expr -> expr SUB_OP expr','expr',3,'p_expr_6','parser.py',310),
+  ('expr -> expr relop expr','expr',3,'p_expr_7','parser.py',314),
+  ('expr -> LEFT_PA expr RIGHT_PA','expr',3,'p_expr_8','parser.py',318),
+  ('expr -> INTEGER_NUMBER','expr',1,'p_expr_9','parser.py',322),
+  ('expr -> REAL_NUMBER','expr',1,'p_expr_10','parser.py',326),
+  ('expr -> TRUE_KW','expr',1,'p_expr_11','parser.py',330),
+  ('expr -> FALSE_KW','expr',1,'p_expr_12','parser.py',334),
+  ('expr -> IDENTIFIER LEFT_PA actualparamlist RIGHT_PA','expr',4,'p_expr_13','parser.py',338),
+  ('expr -> IDENTIFIER','expr',1,'p_expr_14','parser.py',342),
+  ('actualparamlist -> expr','actualparamlist',1,'p_actualparamlist_1','parser.py',346),
+  ('actualparamlist -> actualparamlist COMMA expr','actualparamlist',3,'p_actualparamlist_2','parser.py',350),
+  ('actualparamlist -> IDENTIFIER','actualparamlist',1,'p_actualparamlist_3','parser.py',355),
+  ('actualparamlist -> empty','actualparamlist',1,'p_actualparamlist_4','parser.py',359),
+  ('relop -> LT_OP','relop',1,'p_relop_1','parser.py',363),
+  ('relop -> LE_OP','relop',1,'p_relop_2','parser.py',367),
+  ('relop -> EQ_OP','relop',1,'p_relop_3','parser.py',371),
+  ('relop -> NE_OP','relop',1,'p_relop_4','parser.py',375),
+  ('relop -> GE_OP','relop',1,'p_relop_5','parser.py',379),
+  ('relop -> GT_OP','relop',1,'p_relop_6','parser.py',383),
+  ('empty -> <empty>','empty',0,'p_empty','parser.py',387),
 ]
@@ -0,0 +1,257 @@
+"""
+Peephole optimizer for TAC quadruples.
+
+Every pass rewrites a QuadStore into a new one in a single linear scan, and the
+optimizer repeats its passes until none of them changes anything:
+
+    forward_temps          t5 = a + b; x = t5  →  x = a + b
+                           t4 = 1; t5 = num = t4  →  t5 = num = 1
+    invert_conditions      if t goto L1; goto L2; L1:  →  ifFalse t goto L2; L1:
+    thread_jumps           goto L1 ... L1: goto L2  →  goto L2 ... (also for ifs)
+    remove_jumps_to_next   goto L1; L1:  →  L1:
+    remove_unused_labels   labels no jump refers to are dropped
+
+Temps are assigned exactly once by the generator, so a temp with a single use
+can be replaced by its definition; the passes check this instead of assuming it.
+
+Usage:
+    python peephole.py [SOURCE ...]   (reports quadruple counts, default: the examples)
+"""
+from quadStore import QuadStore, Opcode, BINARY_OPCODES, NONE, TEMP, CONST, operand_kind
+
+JUMPS = (Opcode.GOTO, Opcode.IFGOTO, Opcode.IFFALSE)
+# Opcodes whose result operand is assigned.
+VALUE_OPCODES = frozenset(BINARY_OPCODES | {Opcode.COPY})
+INVERTED = {Opcode.IFGOTO: Opcode.IFFALSE, Opcode.IFFALSE: Opcode.IFGOTO}
+
+
+def jump_target(quad):
+    """Returns the label a jump quadruple goes to, or NONE if it is not a jump."""
+    opcode, arg1, arg2, result = quad
+    if opcode == Opcode.GOTO:
+        return result
+    if opcode == Opcode.IFGOTO or opcode == Opcode.IFFALSE:
+        return arg2
+    return NONE
+
+
+def retarget(quad, label):
+    """Returns a jump quadruple going to `label` instead."""
+    opcode, arg1, arg2, result = quad
+    if opcode == Opcode.GOTO:
+        return opcode, arg1, arg2, label
+    return opcode, arg1, label, result
+
+
+class PeepholeOptimizer:
+    """
+    Configurable peephole optimizer.
+
+    Attributes:
+        passes (tuple): Names of the passes to run, in order (see `PASSES`).
+        max_rounds (int): Upper bound on the repetitions of all passes.
+        stats (dict): Pass name -> number of rewrites made by the last `optimize`.
+    """
+
+    PASSES = ('forward_temps', 'invert_conditions', 'thread_jumps', 'remove_jumps_to_next', 'remove_unused_labels')
+
+    def __init__(self, passes=PASSES, max_rounds=8):
+        """
+        Args:
+            passes (iterable): Names of the passes to run.
+            max_rounds (int): Upper bound on the repetitions of all passes.
+
+        Raises:
+            ValueError: If a pass name is unknown.
+        """
+        unknown = set(passes) - set(self.PASSES)
+        if unknown:
+            raise ValueError(f'Unknown peephole passes: {", ".join(sorted(unknown))}')
+        self.passes = tuple(passes)
+        self.max_rounds = max_rounds
+        self.stats = {}
+
+    def optimize(self, quadruples):
+        """
+        Runs the passes until a round changes nothing.
+
+        Args:
+            quadruples (QuadStore): Quadruples to optimize (not modified).
+
+        Returns:
+            QuadStore: The optimized quadruples.
+        """
+        self.stats = dict.fromkeys(self.passes, 0)
+        for _ in range(self.max_rounds):
+            changed = 0
+            for name in self.passes:
+                quadruples, count = getattr(self, name)(quadruples)
+                self.stats[name] += count
+                changed += count
+            if not changed:
+                break
+        return quadruples
+
+    @staticmethod
+    def forward_temps(quadruples):
+        """Replaces temps used once by their definition (see the module docstring)."""
+        defs, uses = {}, {}
+        for index, (opcode, arg1, arg2, result) in enumerate(quadruples):
+            for argument in (arg1, arg2):
+                if operand_kind(argument) == TEMP:
+                    uses[argument] = uses.get(argument, 0) + 1
+            if opcode in VALUE_OPCODES and operand_kind(result) == TEMP:
+                defs[result] = -1 if result in defs else index
+
+        def single(temp):
+            return uses.get(temp) == 1 and defs.get(temp, -1) != -1
+
+        forwarded = {}  # Temp -> operand to use instead (the source of a removed copy).
+        output = QuadStore()
+        count = 0
+        quads = iter(quadruples)
+        pending = None  # A quadruple whose temp result may be coalesced into the next copy.
+        for quad in quads:
+            opcode, arg1, arg2, result = quad
+            arg1, arg2 = forwarded.pop(arg1, arg1), forwarded.pop(arg2, arg2)
+            quad = (opcode, arg1, arg2, result)
+
+            if pending is not None:
+                if opcode == Opcode.COPY and arg1 == pending[3] and single(arg1):
+                    output.append(pending[0], pending[1], pending[2], result)   # x = a + b
+                    pending = None
+                    count += 1
+                    continue
+                output.append(*pending)
+                pending = None
+
+            if opcode in VALUE_OPCODES and operand_kind(result) == TEMP and single(result):
+                if opcode == Opcode.COPY and operand_kind(arg1) == CONST:
+                    forwarded[result] = arg1    # Literals never change: substitute at the use.
+                    count += 1
+                    continue
+                pending = quad
+                continue
+            output.append(*quad)
+        if pending is not None:
+            output.append(*pending)
+        return output, count
+
+    @staticmethod
+    def invert_conditions(quadruples):
+        """Rewrites `if t goto L1; goto L2; L1:` as `ifFalse t goto L2; L1:` (and the other way round)."""
+        opcodes, arg2s, results = quadruples.opcodes, quadruples.arg2, quadruples.result
+        output = QuadStore()
+        count = 0
+        index, size = 0, len(quadruples)
+        while index < size:
+            opcode, arg1, arg2, result = quadruples[index]
+            if (opcode in INVERTED and index + 2 < size and opcodes[index + 1] == Opcode.GOTO
+                    and opcodes[index + 2] == Opcode.LABEL and results[index + 2] == arg2):
+                output.append(INVERTED[opcode], arg1, results[index + 1])
+                count += 1
+                index += 2      # The label stays.
+                continue
+            output.append(opcode, arg1, arg2, result)
+            index += 1
+        return output, count
+
+    @staticmethod
+    def thread_jumps(quadruples):
+        """Retargets jumps to labels that only lead to a `goto` (through other labels) to its target."""
+        opcodes, results = quadruples.opcodes, quadruples.result
+        size = len(quadruples)
+        forward = {}    # Label -> label of the goto it leads to.
+        for index, opcode in enumerate(opcodes):
+            if opcode == Opcode.LABEL:
+                following = index + 1
+                while following < size and opcodes[following] == Opcode.LABEL:
+                    following += 1
+                if following < size and opcodes[following] == Opcode.GOTO:
+                    forward[results[index]] = results[following]
+
+        def final(label):
+            seen = {label}
+            while label in forward and forward[label] not in seen:     # A loop of gotos stays.
+                label = forward[label]
+                seen.add(label)
+            return label
+
+        output = QuadStore()
+        count = 0
+        for quad in quadruples:
+            target = jump_target(quad)
+            if target in forward:
+                label = final(target)
+                if label != target:
+                    quad = retarget(quad, label)
+                    count += 1
+            output.append(*quad)
+        return output, count
+
+    @staticmethod
+    def remove_jumps_to_next(quadruples):
+        """Removes jumps to one of the labels right after them."""
+        opcodes, results = quadruples.opcodes, quadruples.result
+        output = QuadStore()
+        count = 0
+        size = len(quadruples)
+        for index, quad in enumerate(quadruples):
+            target = jump_target(quad)
+            if target != NONE:
+                following = index + 1
+                while following < size and opcodes[following] == Opcode.LABEL and results[following] != target:
+                    following += 1
+                if following < size and opcodes[following] == Opcode.LABEL:
+                    count += 1
+                    continue
+            output.append(*quad)
+        return output, count
+
+    @staticmethod
+    def remove_unused_labels(quadruples):
+        """Removes the labels no jump refers to."""
+        used = {jump_target(quad) for quad in quadruples}
+        output = QuadStore()
+        count = 0
+        for quad in quadruples:
+            if quad[0] == Opcode.LABEL and quad[3] not in used:
+                count += 1
+                continue
+            output.append(*quad)
+        return output, count
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from codeGenerator import TACGenerator
+    from constantFolder import ConstantFolder
+    from exampleSources import DEFAULT_SOURCES, HERE
+    from parser import Parser
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, metavar='SOURCE', help='source files')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    optimizer = PeepholeOptimizer()
+    print(f"{'program':<32}{'TAC':>8}{'peephole':>10}{'-O':>8}{'-O+peephole':>13}")
+    totals = [0] * 4
+    for path in args.sources:
+        ast = parser.parse_file(path)
+        if ast is None:
+            for diagnostic in parser.diagnostics:
+                print(f'{os.path.relpath(path, HERE)}: {diagnostic}')
+            continue
+        counts = []
+        for fold in (False, True):
+            if fold:    # In place, once the TAC of the AST as parsed is counted.
+                ConstantFolder(parser.symbol_table).fold_program(ast)
+            tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not fold)
+            tacgenerator.generate_program_quadruples(ast)
+            counts += [len(tacgenerator.quadruples), len(optimizer.optimize(tacgenerator.quadruples))]
+        totals = [total + count for total, count in zip(totals, counts)]
+        print(f'{os.path.relpath(path, HERE):<32}{counts[0]:>8}{counts[1]:>10}{counts[2]:>8}{counts[3]:>13}')
+    print(f"{'total':<32}{totals[0]:>8}{totals[1]:>10}{totals[2]:>8}{totals[3]:>13}")
@@ -0,0 +1,201 @@
+"""
+Columnar storage of TAC quadruples.
+
+A quadruple (op, arg1, arg2, result) is kept as one opcode byte and three
+integer operand handles in four parallel arrays, instead of a tuple of strings.
+An operand handle packs the kind of the operand into its low bits and an index
+into the rest:
+
+    handle = index << KIND_BITS | kind
+
+Temps, labels and spill slots are indexed by their number (t3 → TEMP 3,
+L3 → LABEL 3, s3 → SPILL 3), variables, constants, functions and the locals
+of functions by their SymbolTable handle, and a missing operand (the '_' of the
+text form) is the handle NONE == 0.
+"""
+import struct
+import sys
+from array import array
+from enum import IntEnum
+
+
+class Opcode(IntEnum):
+    """Operations of the three-address code."""
+    COPY = 0        # result = arg1
+    ADD = 1         # result = arg1 + arg2
+    SUB = 2
+    MUL = 3
+    DIV = 4
+    AND = 5
+    OR = 6
+    LT = 7          # result = arg1 < arg2
+    LE = 8
+    EQ = 9
+    NE = 10
+    GE = 11
+    GT = 12
+    IFGOTO = 13     # if arg1 goto arg2
+    GOTO = 14       # goto result
+    LABEL = 15      # result:
+    RETURN = 16     # return arg1
+    IFFALSE = 17    # ifFalse arg1 goto arg2
+    FUNC = 18       # function result:      (start of the body of function `result`)
+    FORMAL = 19     # formal result         (next parameter of the function, in order)
+    PARAM = 20      # param arg1            (next argument of the following call)
+    CALL = 21       # result = call arg1, arg2   (arg2: number of arguments, a constant)
+    ENDFUNC = 22    # end result            (end of the body of function `result`)
+
+
+# Opcode of every source operator, and the operator written for each binary opcode.
+OPERATORS = {
+    '+': Opcode.ADD, '-': Opcode.SUB, '*': Opcode.MUL, '/': Opcode.DIV, 'and': Opcode.AND, 'or': Opcode.OR,
+    '<': Opcode.LT, '<=': Opcode.LE, '=': Opcode.EQ, '<>': Opcode.NE, '>=': Opcode.GE, '>': Opcode.GT,
+}
+OPERATOR_SYMBOLS = {opcode: symbol for symbol, opcode in OPERATORS.items()}
+BINARY_OPCODES = frozenset(OPERATORS.values())
+
+# Kinds of operands, stored in the low KIND_BITS bits of an operand handle.
+KIND_BITS = 3
+KIND_MASK = (1 << KIND_BITS) - 1
+NONE = 0        # No operand.
+TEMP = 1        # Temporary variable, by number.
+LABEL = 2       # Label, by number.
+VAR = 3         # Program variable, by SymbolTable handle.
+CONST = 4       # Literal, by SymbolTable handle.
+SPILL = 5       # Spill slot of a temp that got no register, by number.
+FUNCTION = 6    # Function name, by SymbolTable handle.
+LOCAL = 7       # Parameter or local variable of a function, by SymbolTable handle.
+
+
+def operand(kind, index):
+    """Returns the handle of the operand of the given kind and index."""
+    return index << KIND_BITS | kind
+
+
+def operand_kind(handle):
+    """Returns the kind of an operand handle."""
+    return handle & KIND_MASK
+
+
+def operand_index(handle):
+    """Returns the index (number or SymbolTable handle) of an operand handle."""
+    return handle >> KIND_BITS
+
+
+class QuadStore:
+    """
+    Growable, columnar buffer of quadruples.
+
+    Indexing returns a quadruple as an (opcode, arg1, arg2, result) tuple of
+    ints, slicing returns a new QuadStore, and `to_bytes`/`from_bytes` give a
+    compact binary serialization.
+
+    Attributes:
+        opcodes (array): Opcode of each quadruple (one byte).
+        arg1, arg2, result (array): Operand handles of each quadruple (signed 32-bit).
+    """
+    __slots__ = ('opcodes', 'arg1', 'arg2', 'result')
+
+    MAGIC = b'TACQ'
+    VERSION = 1
+    HEADER = struct.Struct('<4sBI')     # Magic, version, number of quadruples.
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Removes every quadruple."""
+        self.opcodes = array('B')
+        self.arg1 = array('i')
+        self.arg2 = array('i')
+        self.result = array('i')
+
+    def append(self, opcode, arg1=NONE, arg2=NONE, result=NONE):
+        """Appends one quadruple."""
+        self.opcodes.append(opcode)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+
+    def extend(self, quadruples):
+        """Appends the quadruples of another QuadStore (or any iterable of quadruple tuples)."""
+        if isinstance(quadruples, QuadStore):
+            self.opcodes.extend(quadruples.opcodes)
+            self.arg1.extend(quadruples.arg1)
+            self.arg2.extend(quadruples.arg2)
+            self.result.extend(quadruples.result)
+        else:
+            for quad in quadruples:
+                self.append(*quad)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __iter__(self):
+        return zip(self.opcodes, self.arg1, self.arg2, self.result)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            quadruples = QuadStore.__new__(QuadStore)
+            quadruples.opcodes = self.opcodes[index]
+            quadruples.arg1 = self.arg1[index]
+            quadruples.arg2 = self.arg2[index]
+            quadruples.result = self.result[index]
+            return quadruples
+        return self.opcodes[index], self.arg1[index], self.arg2[index], self.result[index]
+
+    def __setitem__(self, index, quad):
+        self.opcodes[index], self.arg1[index], self.arg2[index], self.result[index] = quad
+
+    def __eq__(self, other):
+        return isinstance(other, QuadStore) and all(
+            getattr(self, column) == getattr(other, column) for column in self.__slots__)
+
+    def __repr__(self):
+        return f'QuadStore({len(self)} quadruples)'
+
+    @property
+    def nbytes(self):
+        """Bytes used by the four columns."""
+        return sum(len(column) * column.itemsize for column in self.columns())
+
+    def columns(self):
+        """Returns the four column arrays."""
+        return self.opcodes, self.arg1, self.arg2, self.result
+
+    def to_bytes(self):
+        """
+        Serializes the quadruples: a header followed by the four columns in
+        little-endian byte order.
+        """
+        parts = [self.HEADER.pack(self.MAGIC, self.VERSION, len(self))]
+        for column in self.columns():
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Deserializes quadruples written by `to_bytes`.
+
+        Raises:
+            ValueError: If the data is not a serialized QuadStore of this version.
+        """
+        data = memoryview(data)
+        magic, version, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError('Not a serialized QuadStore of version %d' % cls.VERSION)
+        quadruples = cls()
+        offset = cls.HEADER.size
+        for column in quadruples.columns():
+            end = offset + count * column.itemsize
+            if end > len(data):
+                raise ValueError('Truncated QuadStore data')
+            column.frombytes(data[offset:end])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            offset = end
+        return quadruples
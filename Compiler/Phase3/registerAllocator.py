@@ -0,0 +1,197 @@
+"""
+Linear-scan allocation of TAC temps onto a bounded pool of registers.
+
+The generator numbers temps t1, t2, ... without ever reusing one. This pass
+computes the live interval of every temp (the first to last quadruple it is
+live at, stretched over the blocks where liveness analysis finds it live
+across block boundaries, e.g. around loops) and renames the temps with the
+linear-scan algorithm of Poletto and Sarkar:
+
+    intervals are visited by start; intervals ending before the current one
+    starts free their register; when no register is free, the interval ending
+    last (the current one or an active one) is spilled.
+
+Registers are written as temps again (t1 ... tK), spilled temps get spill
+slots (s1, s2, ...) that are reused the same way, without bound.
+
+Usage:
+    python registerAllocator.py [SOURCE] [-k REGISTERS] [-O]   (reports temps, registers and spill slots)
+"""
+import heapq
+
+from controlFlowGraph import ControlFlowGraph
+from liveness import Liveness
+from quadStore import QuadStore, TEMP, SPILL, KIND_MASK, operand
+
+
+class LinearScanAllocator:
+    """
+    Renames the temps of TAC quadruples onto `registers` registers plus spill slots.
+
+    Attributes:
+        registers (int): Size of the register pool.
+        stats (dict): Result of the last `allocate`: 'temps', 'registers' (used),
+            'spilled' (temps) and 'slots' (spill slots used).
+    """
+
+    def __init__(self, registers=16):
+        """
+        Raises:
+            ValueError: If `registers` is smaller than 1.
+        """
+        if registers < 1:
+            raise ValueError('At least one register is needed')
+        self.registers = registers
+        self.stats = {}
+
+    def live_intervals(self, quadruples):
+        """
+        Returns the live interval of every temp.
+
+        Returns:
+            dict: Temp operand handle -> [first position, last position] (quadruple indexes).
+        """
+        intervals = {}
+        for index, quad in enumerate(quadruples):
+            for name in quad[1:]:
+                if name & KIND_MASK == TEMP:
+                    interval = intervals.get(name)
+                    if interval is None:
+                        intervals[name] = [index, index]
+                    else:
+                        interval[1] = index
+
+        # Temps live across block boundaries also cover the blocks they are live in or out of.
+        cfg = ControlFlowGraph(quadruples)
+        liveness = Liveness(cfg)
+        names = {bit: name for name, bit in liveness.bits.items() if name & KIND_MASK == TEMP}
+        temps = sum(1 << bit for bit in names)
+        for block in cfg.blocks:
+            for live, position in ((liveness.live_in[block.index] & temps, block.start),
+                                   (liveness.live_out[block.index] & temps, block.end - 1)):
+                while live:
+                    low = live & -live
+                    live ^= low
+                    interval = intervals[names[low.bit_length() - 1]]
+                    interval[0] = min(interval[0], position)
+                    interval[1] = max(interval[1], position)
+        return intervals
+
+    @staticmethod
+    def scan(intervals, pool):
+        """
+        Linear scan over intervals sorted by start.
+
+        Args:
+            intervals (list): (start, end, temp) tuples sorted by start.
+            pool (int): Number of locations, or None for as many as needed.
+
+        Returns:
+            tuple: (dict of temp -> location number starting at 1, list of the spilled intervals).
+        """
+        locations, spilled = {}, []
+        free = list(range(1, (pool or 0) + 1))  # Heap of free location numbers (lowest reused first).
+        active = []                             # Heap of (end, start, temp) of the intervals holding a location.
+        used = 0
+        for start, end, name in intervals:
+            while active and active[0][0] <= start:     # Operands are read before the result is written.
+                heapq.heappush(free, locations[heapq.heappop(active)[2]])
+            if free:
+                locations[name] = heapq.heappop(free)
+            elif pool is None:
+                used += 1
+                locations[name] = used
+            else:
+                # Spill the interval ending last: the current one, or an active one ending after it.
+                last = max(active)
+                if last[0] <= end:
+                    spilled.append((start, end, name))
+                    continue
+                active.remove(last)
+                heapq.heapify(active)
+                last_end, last_start, last_name = last
+                locations[name] = locations.pop(last_name)
+                spilled.append((last_start, last_end, last_name))
+            heapq.heappush(active, (end, start, name))
+        return locations, spilled
+
+    def assign(self, intervals):
+        """
+        Assigns a register or spill slot to every temp.
+
+        Returns:
+            dict: Temp operand handle -> new operand handle (a register temp or a spill slot).
+        """
+        ordered = sorted((start, end, name) for name, (start, end) in intervals.items())
+        registers, spilled = self.scan(ordered, self.registers)
+        slots, _ = self.scan(sorted(spilled), None)
+        mapping = {name: operand(TEMP, register) for name, register in registers.items()}
+        mapping.update((name, operand(SPILL, slot)) for name, slot in slots.items())
+        return mapping
+
+    def allocate(self, quadruples):
+        """
+        Renames the temps of the quadruples.
+
+        Args:
+            quadruples (QuadStore): Quadruples to rename (not modified).
+
+        Returns:
+            QuadStore: The renamed quadruples.
+        """
+        if not len(quadruples):
+            return quadruples
+        intervals = self.live_intervals(quadruples)
+        mapping = self.assign(intervals)
+        output = QuadStore()
+        get = mapping.get
+        for opcode, arg1, arg2, result in quadruples:
+            output.append(opcode, get(arg1, arg1), get(arg2, arg2), get(result, result))
+
+        locations = set(mapping.values())
+        self.stats = {
+            'temps': len(intervals),
+            'registers': sum(1 for handle in locations if handle & KIND_MASK == TEMP),
+            'spilled': sum(1 for handle in mapping.values() if handle & KIND_MASK == SPILL),
+            'slots': sum(1 for handle in locations if handle & KIND_MASK == SPILL),
+        }
+        return output
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from codeGenerator import TACGenerator
+    from optimizer import Optimizer
+    from parser import Parser
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('source', nargs='?', default='input.txt', help='source file (default: input.txt)')
+    arguments.add_argument('-k', '--registers', type=int, action='append',
+                           help='register pool size, may be repeated (default: 4, 8 and 16)')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='optimize before allocating')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    ast = parser.parse_file(args.source)
+    if ast is None:
+        for diagnostic in parser.diagnostics:
+            print(diagnostic)
+        sys.exit('Parsing failed, no TAC generated.')
+    optimizer = Optimizer(parser.symbol_table) if args.optimize else None
+    if optimizer:
+        optimizer.optimize_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not args.optimize)
+    tacgenerator.generate_program_quadruples(ast)
+    quadruples = tacgenerator.quadruples
+    if optimizer:
+        quadruples = optimizer.optimize_quadruples(quadruples)
+
+    print(f"{'registers':>10}{'temps':>10}{'used':>10}{'spilled':>10}{'slots':>10}")
+    for registers in args.registers or (4, 8, 16):
+        allocator = LinearScanAllocator(registers)
+        allocator.allocate(quadruples)
+        stats = allocator.stats
+        print(f"{registers:>10}{stats['temps']:>10}{stats['registers']:>10}{stats['spilled']:>10}{stats['slots']:>10}")
+
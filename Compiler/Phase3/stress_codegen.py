@@ -0,0 +1,66 @@
+"""
+Stress test of the TAC generator on very long and very deep programs.
+
+A program with two blocks of 100k statements and a 100k-operand `a + a + ... + a`
+chain (`synthetic.generate_stress_program`) is parsed and compiled to TAC, which
+must equal the TAC expected for it. The statement lists and the left-deep
+expression are far past the Python recursion limit, so this fails (with a
+RecursionError) if any stage of the generator walks them recursively.
+
+Usage:
+    python stress_codegen.py [--statements N] [--operands M]   (default: 100000 each)
+"""
+import argparse
+import io
+import sys
+import time
+
+from codeGenerator import TACGenerator
+from parser import Parser
+from synthetic import generate_stress_program
+
+
+def expected_tac(statements, operands):
+    """Returns the TAC text of `generate_stress_program(statements, operands)`."""
+    lines = []
+    for temp in range(1, statements + 1):
+        lines += [f't{temp} = 1', f'a = t{temp}']
+    lines += ['b = a'] * statements
+    temp = statements + 1
+    lines.append(f't{temp} = a + a')
+    for temp in range(temp + 1, statements + operands):
+        lines.append(f't{temp} = t{temp - 1} + a')
+    lines += [f'a = t{temp}', 'return a']
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--statements', type=int, default=100000, help='statements of each block')
+    arguments.add_argument('--operands', type=int, default=100000, help='operands of the addition chain')
+    args = arguments.parse_args()
+
+    source = generate_stress_program(args.statements, args.operands)
+    start = time.perf_counter()
+    parser = Parser()
+    ast = parser.parse(source)
+    if ast is None:
+        sys.exit('\n'.join(map(str, parser.diagnostics)))
+    tacgenerator = TACGenerator(parser.symbol_table)
+    tacgenerator.generate_program_quadruples(ast)
+    output = io.StringIO()
+    tacgenerator.write_tac(output)
+    elapsed = time.perf_counter() - start
+
+    expected = expected_tac(args.statements, args.operands)
+    if output.getvalue() != expected:
+        for number, (line, expected_line) in enumerate(zip(output.getvalue().splitlines(), expected.splitlines()), 1):
+            if line != expected_line:
+                sys.exit(f'TAC line {number} is {line!r}, expected {expected_line!r}')
+        sys.exit('The TAC has a different number of lines than expected')
+    print(f'{len(tacgenerator.quadruples)} quadruples for {args.statements} statements per block and '
+          f'{args.operands} operands, as expected, in {elapsed:.2f}s (recursion limit {sys.getrecursionlimit()})')
+
+
+if __name__ == '__main__':
+    main()
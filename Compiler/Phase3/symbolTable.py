@@ -0,0 +1,136 @@
+import sys
+from array import array
+
+
+class Scope:
+    """
+    One level of the scope chain (the program, or a function and its parameters).
+
+    Attributes:
+        parent (Scope): The enclosing scope, or None for the global scope.
+        declarations (dict): Maps symbol handles to their declared type names.
+    """
+    __slots__ = ('parent', 'declarations')
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.declarations = {}
+
+
+class SymbolTable:
+    """
+    Symbol table shared by the lexer, parser and code generator.
+
+    Identifiers and literals are interned once and referred to by dense integer
+    handles, assigned in order of first appearance (the numbering written by
+    Phase 1). Each kind of symbol has its own pool, so e.g. the integer `1` and
+    the boolean `true` never share a handle, and a handle gives its kind and
+    value through two list lookups.
+
+    Attributes:
+        kinds (array): Kind of each handle (IDENTIFIER, INTEGER, REAL or BOOLEAN).
+        values (list): Interned name or literal value of each handle.
+        scope (Scope): The innermost open scope.
+    """
+
+    # Kinds of symbols.
+    IDENTIFIER = 0
+    INTEGER = 1
+    REAL = 2
+    BOOLEAN = 3
+
+    # Type name of each literal kind, as used by the grammar.
+    TYPE_NAMES = ('identifier', 'integer', 'real', 'boolean')
+
+    def __init__(self):
+        """Initializes an empty table with a single, global scope."""
+        self.clear()
+
+    def clear(self):
+        """Removes every symbol and scope, keeping the same table object."""
+        self.kinds = array('B')
+        self.values = []
+        self.pools = ({}, {}, {}, {})   # Per kind: lookup key -> handle.
+        self.scope = Scope()
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, kind, key, value):
+        """
+        Gets or assigns the handle of a symbol.
+        Args:
+            kind (int): Kind of the symbol.
+            key: Lookup key within the pool of that kind.
+            value: Value stored for a new symbol.
+        Returns:
+            int: The handle of the symbol.
+        """
+        pool = self.pools[kind]
+        handle = pool.get(key)
+        if handle is None:
+            handle = pool[key] = len(self.values)
+            self.kinds.append(kind)
+            self.values.append(value)
+        return handle
+
+    def identifier(self, name):
+        """Returns the handle of an identifier, interning its name."""
+        handle = self.pools[self.IDENTIFIER].get(name)
+        if handle is None:
+            name = sys.intern(name)
+            handle = self.intern(self.IDENTIFIER, name, name)
+        return handle
+
+    def integer(self, value):
+        """Returns the handle of an integer literal."""
+        return self.intern(self.INTEGER, value, value)
+
+    def real(self, text):
+        """Returns the handle of a real literal, keyed by its source text."""
+        return self.intern(self.REAL, text, float(text))
+
+    def boolean(self, value):
+        """Returns the handle of a boolean literal."""
+        return self.intern(self.BOOLEAN, value, value)
+
+    def lexeme(self, handle):
+        """Returns the printable text of a symbol."""
+        return str(self.values[handle])
+
+    def enter_scope(self):
+        """
+        Opens a new scope nested in the current one.
+        Returns:
+            Scope: The new scope.
+        """
+        self.scope = Scope(self.scope)
+        return self.scope
+
+    def exit_scope(self):
+        """
+        Closes the current scope and returns to the enclosing one.
+        Returns:
+            Scope: The closed scope.
+        """
+        scope = self.scope
+        self.scope = scope.parent
+        return scope
+
+    def declare(self, handle, type_name):
+        """Declares a symbol with the given type in the current scope."""
+        self.scope.declarations[handle] = type_name
+
+    def lookup(self, handle):
+        """
+        Finds the declared type of a symbol by walking the scope chain.
+        Returns:
+            str: The type name, or None if the symbol is not declared.
+        """
+        scope = self.scope
+        while scope is not None:
+            type_name = scope.declarations.get(handle)
+            if type_name is not None:
+                return type_name
+            scope = scope.parent
+        return None
@@ -0,0 +1,119 @@
+"""
+Generator of large, syntactically valid programs of grammar G, used by the benchmarks.
+
+Usage:
+    python synthetic.py STATEMENTS [--functions N] [--seed S] > program.txt
+"""
+import argparse
+import random
+
+TYPES = ('integer', 'real', 'boolean')
+RELOPS = ('<=', '=', '<>', '>=', '>')      # A bare '<' is not accepted by the lexer (t_LT_OP matches '=').
+ARITHMETIC = ('+', '-', '*', '/')
+
+
+class ProgramGenerator:
+    """
+    Builds random programs from a seeded generator, so the same arguments always
+    produce the same source text.
+    """
+
+    def __init__(self, seed=0, variables=16):
+        self.random = random.Random(seed)
+        self.variables = [f'v{index}' for index in range(variables)]
+
+    def expr(self, depth=2):
+        """Returns an arithmetic expression of at most `depth` levels."""
+        choice = self.random.random()
+        if depth == 0 or choice < 0.3:
+            return self.random.choice(self.variables)
+        if choice < 0.45:
+            return str(self.random.randint(1, 999))
+        if choice < 0.5:
+            return f'{self.random.randint(0, 99)}.{self.random.randint(0, 99)}'
+        op = self.random.choice(ARITHMETIC)
+        left, right = self.expr(depth - 1), self.expr(depth - 1)
+        return f'({left} {op} {right})' if self.random.random() < 0.3 else f'{left} {op} {right}'
+
+    def condition(self):
+        """Returns a relational (possibly combined) condition."""
+        condition = f'{self.expr(1)} {self.random.choice(RELOPS)} {self.expr(1)}'
+        if self.random.random() < 0.2:
+            condition += f' {self.random.choice(("and", "or"))} {self.random.choice(self.variables)} > 0'
+        return condition
+
+    def stmt(self, indent, depth):
+        """Returns the lines of one statement."""
+        pad = '    ' * indent
+        choice = self.random.random()
+        if depth == 0 or choice < 0.6:
+            return [f'{pad}{self.random.choice(self.variables)} := {self.expr()};']
+        if choice < 0.75:
+            lines = [f'{pad}if {self.condition()} then'] + self.stmt(indent + 1, depth - 1)
+            if self.random.random() < 0.5:
+                lines += [f'{pad}else'] + self.stmt(indent + 1, depth - 1)
+            return lines
+        if choice < 0.85:
+            return [f'{pad}while {self.condition()} do'] + self.block(indent, 3, depth - 1)
+        if choice < 0.95:
+            variable = self.random.choice(self.variables)
+            return [f'{pad}for {variable} := {self.expr(1)} to {self.expr(1)} do'] + self.stmt(indent + 1, depth - 1)
+        return self.block(indent, 2, depth - 1)
+
+    def block(self, indent, statements, depth=2):
+        """Returns the lines of a `begin ... end` block."""
+        pad = '    ' * indent
+        lines = [f'{pad}begin']
+        for _ in range(statements):
+            lines += self.stmt(indent + 1, depth)
+        return lines + [f'{pad}end']
+
+    def function(self, index, statements):
+        """Returns the lines of a function declaration."""
+        lines = [f'function f{index}(integer a; real b;):{self.random.choice(TYPES)}',
+                 f'integer {", ".join(self.variables)};']
+        lines += self.block(0, statements)
+        lines.insert(-1, f'    return {self.expr()};')
+        return lines + ['']
+
+    def program(self, statements, functions=0):
+        """
+        Returns the source text of a program.
+
+        Args:
+            statements (int): Number of top-level statements of the main block.
+            functions (int): Number of function declarations.
+        """
+        lines = ['program synthetic;', f'integer {", ".join(self.variables)};', '']
+        for index in range(functions):
+            lines += self.function(index, max(1, statements // max(1, functions * 4)))
+        lines += self.block(0, statements)
+        return '\n'.join(lines) + '\n'
+
+
+def generate_program(statements, functions=0, seed=0):
+    """Returns the source text of a random program (see `ProgramGenerator.program`)."""
+    return ProgramGenerator(seed).program(statements, functions)
+
+
+def generate_stress_program(statements, operands):
+    """
+    Returns the source text of a program with two blocks of `statements` assignments
+    (`a := 1;`, then `b := a;`) followed by `a := a + a + ... + a;` with `operands`
+    operands, whose AST is as long and as deep as asked.
+    """
+    lines = ['program stress;', 'integer a, b;', 'begin', '    begin']
+    lines += ['        a := 1;'] * statements
+    lines += ['    end', '    begin']
+    lines += ['        b := a;'] * statements
+    lines += ['    end', '    a := ' + ' + '.join(['a'] * operands) + ';', '    return a;', 'end']
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('statements', type=int, help='number of top-level statements')
+    arguments.add_argument('--functions', type=int, default=0, help='number of function declarations')
+    arguments.add_argument('--seed', type=int, default=0, help='random seed')
+    args = arguments.parse_args()
+    print(generate_program(args.statements, args.functions, args.seed), end='')
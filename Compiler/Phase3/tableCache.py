@@ -0,0 +1,147 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import ply
+import ply.lex as lex
+import ply.yacc as yacc
+
+# Bump when the layout of a cache directory changes.
+CACHE_VERSION = 1
+
+LEXTAB = 'lextab'                 # Module name of the cached lexer tables.
+PARSETAB = 'parsetab.pickle'      # File name of the cached LALR tables.
+
+
+class StaleTableError(Exception):
+    """Raised when cached tables do not match the grammar that tries to load them."""
+
+
+def grammar_hash(*specs):
+    """
+    Computes a stable hash of the lexer and grammar specifications.
+
+    The hash covers every `t_`/`p_` rule (its regular expression or docstring),
+    the token list, reserved words, precedence table and start symbol of each
+    given object, plus the PLY version and `CACHE_VERSION`.
+
+    Args:
+        specs: Lexer and/or Parser objects (or classes).
+
+    Returns:
+        str: A short hexadecimal digest.
+    """
+    digest = hashlib.sha256(f'{CACHE_VERSION}:{ply.__version__}'.encode())
+    for spec in specs:
+        for name in sorted(dir(spec)):
+            if name.startswith(('t_', 'p_')):
+                value = getattr(spec, name)
+                value = value.__doc__ if callable(value) else value
+            elif name in ('tokens', 'reserved', 'precedence', 'start'):
+                value = getattr(spec, name)
+            else:
+                continue
+            digest.update(f'{name}={value!r};'.encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_dir(root, *specs):
+    """
+    Returns the versioned cache directory for the given specifications.
+
+    Args:
+        root (str): Root directory of the table cache.
+        specs: Lexer and/or Parser objects whose grammar keys the directory.
+
+    Returns:
+        str: Path of the form `<root>/v<CACHE_VERSION>-<grammar hash>`.
+    """
+    return os.path.join(root, f'v{CACHE_VERSION}-{grammar_hash(*specs)}')
+
+
+def load_lextab(directory, tokens):
+    """
+    Loads the lexer tables cached in `directory`.
+
+    Args:
+        directory (str): Cache directory returned by `cache_dir`.
+        tokens (list): Token names the lexer is expected to produce.
+
+    Returns:
+        module: The lextab module, to be passed to `lex.lex(optimize=1, lextab=...)`.
+
+    Raises:
+        StaleTableError: If the cached tables are missing or were built for other tokens.
+    """
+    path = os.path.join(directory, LEXTAB + '.py')
+    spec = importlib.util.spec_from_file_location(f'{LEXTAB}_{os.path.basename(directory)}', path)
+    lextab = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(lextab)
+    except FileNotFoundError:
+        raise StaleTableError(f"Missing lexer tables in '{directory}'") from None
+
+    if getattr(lextab, '_tabversion', None) != lex.__tabversion__ or set(lextab._lextokens) != set(tokens):
+        raise StaleTableError(f"Lexer tables in '{directory}' are stale; remove the directory to rebuild them")
+    return lextab
+
+
+def load_parser(module, directory):
+    """
+    Loads the LALR parser of `module` from the tables cached in `directory`.
+
+    Args:
+        module: The Parser object that defines the grammar rules.
+        directory (str): Cache directory returned by `cache_dir`.
+
+    Returns:
+        The PLY parser object.
+
+    Raises:
+        StaleTableError: If the cached tables were built for another grammar.
+    """
+    pdict = {name: getattr(module, name) for name in dir(module)}
+    pinfo = yacc.ParserReflect(pdict, log=yacc.NullLogger())
+    pinfo.get_all()
+
+    tables = yacc.LRTable()
+    try:
+        signature = tables.read_pickle(os.path.join(directory, PARSETAB))
+    except (ImportError, yacc.VersionError):
+        raise StaleTableError(f"Missing or outdated parser tables in '{directory}'") from None
+    if signature != pinfo.signature():
+        raise StaleTableError(f"Parser tables in '{directory}' are stale; remove the directory to rebuild them")
+
+    tables.bind_callables(pinfo.pdict)
+    return yacc.LRParser(tables, pinfo.error_func)
+
+
+def build(lexer_module, parser_module, directory):
+    """
+    Builds the lexer and parser tables into `directory`, without any debug output.
+
+    The tables are written to a temporary directory first and then moved into
+    place, so concurrent builders never observe a half-written cache.
+
+    Args:
+        lexer_module: The Lexer object that defines the token rules.
+        parser_module: The Parser object that defines the grammar rules.
+        directory (str): Cache directory returned by `cache_dir`.
+    """
+    root = os.path.dirname(directory)
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.build-', dir=root)
+
+    lex.lex(module=lexer_module, optimize=1, lextab=LEXTAB, outputdir=staging)
+    sys.modules.pop(LEXTAB, None)
+    yacc.yacc(module=parser_module, debug=False, write_tables=False,
+              picklefile=os.path.join(staging, PARSETAB))
+
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Another process finished the same build first; keep its tables.
+        shutil.rmtree(staging)
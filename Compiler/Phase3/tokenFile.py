@@ -0,0 +1,265 @@
+"""
+Compact binary files of the tokens of a source file, written by Phase 1 so that
+the parsers of Phases 2 and 3 can read them back instead of lexing the source
+again.
+
+After a header (magic, version), a token file is a sequence of records, each
+starting with one byte:
+
+    type [| LINE_FLAG]  A token: the index of its type in `Lexer.tokens`, with
+                        LINE_FLAG set when it is on a later line than the
+                        previous token, followed by
+                        - the line delta, when LINE_FLAG is set,
+                        - its value: the symbol handle of an identifier or a
+                          number, the text of an illegal lexeme, nothing for a
+                          keyword or an operator,
+                        - the position delta from the previous token.
+    SYMBOL              The next symbol of the symbol table: its kind (one byte)
+                        and its text (the source text of a number).
+    END                 The end of the tokens, followed by the line and position
+                        deltas of the end of the source.
+
+Numbers are unsigned LEB128 varints (7 bits per byte, low bits first, the high
+bit set on all bytes but the last) and texts are a varint length followed by
+UTF-8. Symbols are written in handle order, just before the first token that
+refers to them, so the writer streams and the reader rebuilds the symbol table
+as it goes.
+"""
+import struct
+from itertools import islice
+from lexer import Lexer, Token
+from symbolTable import SymbolTable
+
+MAGIC = b'TOKS'
+VERSION = 1
+HEADER = struct.Struct('<4sB')  # Magic, version.
+
+LINE_FLAG = 0x40    # Set in the first byte of a token on a later line than the previous one.
+SYMBOL = 0xFE       # First byte of a symbol record.
+END = 0xFF          # First byte of the end record.
+
+BUFFER_SIZE = 1 << 16   # Bytes buffered by the writer before writing them out.
+
+
+def write_varint(buffer, value):
+    """Appends an unsigned integer to a bytearray as a varint."""
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, value):
+    """
+    Reads the rest of a varint.
+    Args:
+        data (iterator): The bytes that follow the first byte of the varint.
+        value (int): The first byte of the varint.
+    Returns:
+        int: The value of the varint.
+    """
+    value &= 0x7F
+    shift = 7
+    while True:
+        byte = next(data)
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value
+        shift += 7
+
+
+class TokenWriter:
+    """
+    Writes the tokens of a lexer to a token file as they are produced.
+
+    Attributes:
+        output (file): The binary file written to.
+        lexer (Lexer): The lexer of the tokens, whose symbols are written with them.
+        buffer (bytearray): Encoded records not written out yet.
+        symbols (int): Number of symbols written.
+    """
+
+    # Index of each token type in `Lexer.tokens`.
+    CODES = {name: code for code, name in enumerate(Lexer.tokens)}
+
+    def __init__(self, output, lexer):
+        """
+        Starts a token file with its header.
+        Args:
+            output (file): A file opened for writing in binary mode.
+            lexer (Lexer): The lexer that produces the tokens.
+        """
+        self.output = output
+        self.lexer = lexer
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION))
+        self.symbols = 0
+        self.lineno = 1     # Line and position of the previous token.
+        self.lexpos = 0
+
+    def write(self, token):
+        """Appends a token, after the symbols it is the first to refer to."""
+        buffer = self.buffer
+        code = self.CODES[token.type]
+        value = token.value
+        symbol = token.type in Lexer.SYMBOL_TYPES
+        if symbol and value >= self.symbols:
+            self._write_symbols(value + 1)
+        line = token.lineno - self.lineno
+        if line:
+            buffer.append(code | LINE_FLAG)
+            write_varint(buffer, line)
+        else:
+            buffer.append(code)
+        if symbol:
+            write_varint(buffer, value)
+        elif token.type == 'Illegal_Lexeme':
+            self._write_text(value)
+        write_varint(buffer, token.lexpos - self.lexpos)
+        self.lineno = token.lineno
+        self.lexpos = token.lexpos
+        if len(buffer) >= BUFFER_SIZE:
+            self.output.write(buffer)
+            buffer.clear()
+
+    def finish(self):
+        """Writes the remaining symbols and the end of the source, and flushes the buffer."""
+        self._write_symbols(len(self.lexer.symbol_table))
+        self.buffer.append(END)
+        write_varint(self.buffer, self.lexer.lexer.lineno - self.lineno)
+        write_varint(self.buffer, self.lexer.offset - self.lexpos)
+        self.output.write(self.buffer)
+        self.buffer.clear()
+
+    def _write_symbols(self, count):
+        """Writes the symbols of the table up to handle `count` - 1."""
+        symbol_table = self.lexer.symbol_table
+        kinds, values = symbol_table.kinds, symbol_table.values
+        reals = {}  # Source text of the new real literals, by handle (they are keyed by it).
+        for text, handle in reversed(symbol_table.pools[SymbolTable.REAL].items()):
+            if handle < self.symbols:
+                break
+            reals[handle] = text
+        for handle in range(self.symbols, count):
+            kind = kinds[handle]
+            value = values[handle]
+            self.buffer.append(SYMBOL)
+            self.buffer.append(kind)
+            if kind == SymbolTable.REAL:
+                self._write_text(reals[handle])
+            elif kind == SymbolTable.BOOLEAN:
+                self._write_text('true' if value else 'false')
+            else:
+                self._write_text(str(value))
+        self.symbols = max(self.symbols, count)
+
+    def _write_text(self, text):
+        """Appends a string as its varint length and UTF-8 bytes."""
+        data = text.encode()
+        write_varint(self.buffer, len(data))
+        self.buffer += data
+
+
+def record_tokens(path, tokens, lexer):
+    """
+    Writes tokens to a token file while passing them on.
+    Args:
+        path (str): Path of the token file.
+        tokens (iterable): Tokens produced by `lexer`.
+        lexer (Lexer): The lexer of the tokens.
+    Yields:
+        LexToken: Each of the tokens; the file is complete once they are all consumed.
+    """
+    with open(path, 'wb') as output:
+        writer = TokenWriter(output, lexer)
+        for token in tokens:
+            writer.write(token)
+            yield token
+        writer.finish()
+
+
+def read_tokens(data, lexer):
+    """
+    Decodes a token file held in memory, without copying it. Its symbols are
+    interned in the symbol table of the lexer, and the token values refer to
+    their handles there; at the end, the line number and position of the lexer
+    are those of the end of the source, as after lexing it.
+    Args:
+        data (bytes-like): The contents of a token file.
+        lexer (Lexer): The lexer standing for the one that produced the tokens.
+    Yields:
+        Token: The next token.
+    Raises:
+        ValueError: If the data is not a complete token file of this version.
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size or HEADER.unpack_from(view) != (MAGIC, VERSION):
+        raise ValueError('Not a token file of version %d' % VERSION)
+    symbol_table = lexer.symbol_table
+    interns = (
+        symbol_table.identifier,
+        lambda text: symbol_table.integer(int(text)),
+        symbol_table.real,
+        lambda text: symbol_table.boolean(text == 'true'),
+    )
+    names, constants = Lexer.tokens, Lexer.CONSTANT_VALUES
+    symbol_codes = {names.index(name) for name in Lexer.SYMBOL_TYPES}
+    illegal_code = names.index('Illegal_Lexeme')
+    handles = []    # Handle in the symbol table of each symbol of the file.
+    lineno, lexpos = 1, 0
+    data = iter(view[HEADER.size:])
+    try:
+        for byte in data:
+            if byte >= SYMBOL:
+                if byte == END:
+                    break
+                kind = next(data)
+                length = next(data)
+                if length & 0x80:
+                    length = read_varint(data, length)
+                handles.append(interns[kind](bytes(islice(data, length)).decode()))
+                continue
+            if byte & LINE_FLAG:
+                byte &= ~LINE_FLAG
+                line = next(data)
+                lineno += read_varint(data, line) if line & 0x80 else line
+            token = Token()
+            token.type = name = names[byte]
+            if byte in symbol_codes:
+                value = next(data)
+                token.value = handles[read_varint(data, value) if value & 0x80 else value]
+            elif byte == illegal_code:
+                length = next(data)
+                if length & 0x80:
+                    length = read_varint(data, length)
+                token.value = bytes(islice(data, length)).decode()
+            else:
+                token.value = constants[name]
+            position = next(data)
+            lexpos += read_varint(data, position) if position & 0x80 else position
+            token.lineno = lineno
+            token.lexpos = lexpos
+            yield token
+        line = next(data)   # Raises StopIteration as well when the END record is missing.
+        if line & 0x80:
+            line = read_varint(data, line)
+        position = next(data)
+        if position & 0x80:
+            position = read_varint(data, position)
+    except StopIteration:
+        raise ValueError('Truncated token file') from None
+    lexer.lexer.lineno = lineno + line
+    lexer.offset = lexpos + position
+
+
+def read_token_file(path, lexer):
+    """
+    Reads the tokens of a token file (see `read_tokens`).
+    Args:
+        path (str): Path of the token file.
+        lexer (Lexer): The lexer standing for the one that produced the tokens.
+    Yields:
+        Token: The next token.
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+    yield from read_tokens(data, lexer)
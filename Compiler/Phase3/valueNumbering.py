@@ -0,0 +1,239 @@
+"""
+Value numbering over the basic blocks of TAC: a binary quadruple computing a
+value already held by a name is replaced by the use of that name.
+
+Local value numbering scans each block once. Every name gets a value number
+when it is assigned (a copy passes its value number on, other quadruples get a
+new one), and every binary quadruple is looked up by (opcode, numbers of its
+operands), with the operands of commutative operators sorted and `a > b`,
+`a >= b` read as `b < a`, `b <= a`. A hit whose holder still has that number
+(it was not reassigned by `:=` or a later quadruple since) makes the quadruple
+redundant: when its result is a temp read only further on in the block, it is
+removed and those uses read the holder; otherwise it becomes a copy of the
+holder. A call gives new numbers to all program variables, since the called
+function may assign them.
+
+Global value numbering (`global_numbering=True`) walks the dominator tree and
+also lets a block reuse the values computed by the blocks dominating it. Only
+the values of stable names are shared this way: literals, and temps and locals
+assigned once, whose value cannot change between the dominating block and the
+block using it. They are kept in one dict for the whole walk, with an undo log
+of the entries each block adds, taken back when the walk leaves its subtree:
+lookups stay O(1) however deep the dominator tree is.
+
+Usage:
+    python valueNumbering.py [SOURCE ...]   (reports the quadruples reused by local and global numbering)
+"""
+from controlFlowGraph import ControlFlowGraph
+from liveness import Liveness, uses_and_def, DEFINING_OPCODES
+from quadStore import QuadStore, Opcode, BINARY_OPCODES, NONE, TEMP, VAR, CONST, LOCAL, KIND_MASK
+
+# Operators whose operands can be swapped.
+COMMUTATIVE = frozenset((Opcode.ADD, Opcode.MUL, Opcode.EQ, Opcode.NE, Opcode.AND, Opcode.OR))
+# Relations read with their operands swapped.
+MIRRORED = {Opcode.GT: Opcode.LT, Opcode.GE: Opcode.LE}
+# Kinds of the names that can be stable (assigned once in the whole program).
+STABLE_KINDS = (TEMP, LOCAL)
+
+
+class ValueNumbering:
+    """
+    Local (per basic block) or dominator-based value numbering of TAC.
+
+    Attributes:
+        global_numbering (bool): Whether blocks reuse the stable values of the blocks dominating them.
+        stats (dict): Result of the last `optimize`: 'reused' quadruples and 'removed' ones among them.
+    """
+
+    def __init__(self, global_numbering=False):
+        self.global_numbering = global_numbering
+        self.stats = {}
+
+    def optimize(self, quadruples):
+        """
+        Replaces the redundant computations of the quadruples.
+
+        Args:
+            quadruples (QuadStore): Quadruples to optimize (not modified).
+
+        Returns:
+            QuadStore: The optimized quadruples.
+        """
+        self.stats = {'reused': 0, 'removed': 0}
+        if not len(quadruples):
+            return quadruples
+        cfg = ControlFlowGraph(quadruples)
+        self.cfg, self.liveness, self.code = cfg, Liveness(cfg), list(quadruples)
+        self.removed = set()
+        self.counter = 0
+        assignments = {}
+        for quad in self.code:
+            _, definition = uses_and_def(quad)
+            if definition is not None:
+                assignments[definition] = assignments.get(definition, 0) + 1
+        self.stable = {name for name, count in assignments.items()
+                       if count == 1 and name & KIND_MASK in STABLE_KINDS}
+        self.numbers = {}   # Stable name -> value number.
+
+        if self.global_numbering:
+            children = cfg.dominator_tree()
+            for root, parent in enumerate(cfg.idom):
+                if parent != root:
+                    continue
+                scope, undo = {}, []    # Stable values of the dominating blocks; (key, previous entry) of each added one.
+                stack = [(root, None)]  # (block to number, None) or (None, length of `undo` before its subtree).
+                while stack:
+                    index, mark = stack.pop()
+                    if index is None:
+                        while len(undo) > mark:
+                            key, previous = undo.pop()
+                            if previous is None:
+                                del scope[key]
+                            else:
+                                scope[key] = previous
+                        continue
+                    stack.append((None, len(undo)))
+                    self.number_block(cfg.blocks[index], scope, undo)
+                    stack.extend((child, None) for child in children[index])
+        else:
+            for block in cfg.blocks:
+                self.number_block(block, None, None)
+        if not self.stats['reused']:
+            return quadruples
+
+        output = QuadStore()
+        for index, quad in enumerate(self.code):
+            if index not in self.removed:
+                output.append(*quad)
+        return output
+
+    def new_number(self):
+        self.counter += 1
+        return self.counter
+
+    def number_block(self, block, scope, undo):
+        """
+        Numbers the quadruples of one block, replacing the redundant ones.
+
+        Args:
+            block (BasicBlock): The block.
+            scope (dict): Stable values of the dominating blocks, extended with the ones
+                of this block (None for local numbering).
+            undo (list): (key, previous entry) of each entry added to `scope` (None for local numbering).
+        """
+        code, stable, numbers = self.code, self.stable, self.numbers
+        values, table = {}, {}      # Name -> value number; (opcode, number, number) -> (number, holder).
+
+        def number(name):
+            if name & KIND_MASK == CONST:
+                return ~name        # Negative, apart from the numbers given to names.
+            value = numbers.get(name) if name in stable else values.get(name)
+            if value is None:
+                value = assign(name, self.new_number())
+            return value
+
+        def assign(name, value):
+            if name in stable:
+                numbers[name] = value
+            else:
+                values[name] = value
+            return value
+
+        for index in range(block.start, block.end):
+            opcode, arg1, arg2, result = code[index]
+            if opcode in BINARY_OPCODES:
+                first, second = number(arg1), number(arg2)
+                if opcode in MIRRORED:
+                    opcode, first, second = MIRRORED[opcode], second, first
+                elif opcode in COMMUTATIVE and first > second:
+                    first, second = second, first
+                key = (opcode, first, second)
+                entry = table.get(key)
+                if entry is None and scope is not None:
+                    entry = scope.get(key)
+                if entry is not None and number(entry[1]) == entry[0]:
+                    assign(result, entry[0])
+                    self.reuse(block, index, entry[1])
+                    continue
+                value = assign(result, self.new_number())
+                table[key] = (value, result)
+                if scope is not None and result in stable and all(
+                        argument & KIND_MASK == CONST or argument in stable for argument in (arg1, arg2)):
+                    undo.append((key, scope.get(key)))
+                    scope[key] = (value, result)
+            elif opcode == Opcode.COPY:
+                assign(result, number(arg1))
+            elif opcode in DEFINING_OPCODES:
+                if opcode == Opcode.CALL:
+                    for name in [name for name in values if name & KIND_MASK == VAR]:
+                        del values[name]
+                assign(result, self.new_number())
+
+    def reuse(self, block, index, holder):
+        """
+        Replaces the redundant quadruple at `index` by the use of `holder`: its result is
+        renamed in the rest of the block when it is a temp read nowhere else and the holder
+        keeps its value until the last of these uses, otherwise the quadruple becomes a copy.
+        """
+        code, liveness = self.code, self.liveness
+        result = code[index][3]
+        self.stats['reused'] += 1
+        if result == holder:
+            self.removed.add(index)
+            self.stats['removed'] += 1
+            return
+        bit = liveness.bits.get(result)
+        if result & KIND_MASK == TEMP and result in self.stable and (
+                bit is None or not liveness.live_out[block.index] >> bit & 1):
+            uses, reassigned = [], False
+            for following in range(index + 1, block.end):
+                quad = code[following]
+                quad_uses, definition = uses_and_def(quad)
+                if result in quad_uses:
+                    if reassigned:
+                        break
+                    uses.append(following)
+                reassigned = reassigned or definition == holder or (
+                    quad[0] == Opcode.CALL and holder & KIND_MASK == VAR)
+            else:
+                for following in uses:
+                    opcode, arg1, arg2, quad_result = code[following]
+                    code[following] = (opcode, holder if arg1 == result else arg1,
+                                       holder if arg2 == result else arg2, quad_result)
+                self.removed.add(index)
+                self.stats['removed'] += 1
+                return
+        code[index] = (Opcode.COPY, holder, NONE, result)
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from codeGenerator import TACGenerator
+    from exampleSources import DEFAULT_SOURCES, HERE
+    from parser import Parser
+    from peephole import PeepholeOptimizer
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, metavar='SOURCE', help='source files')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    print(f"{'program':<32}{'quads':>8}{'local':>8}{'global':>8}{'removed':>9}")
+    for path in args.sources:
+        ast = parser.parse_file(path)
+        if ast is None:
+            for diagnostic in parser.diagnostics:
+                print(f'{os.path.relpath(path, HERE)}: {diagnostic}')
+            continue
+        tacgenerator = TACGenerator(parser.symbol_table, copy_literals=False)
+        tacgenerator.generate_program_quadruples(ast)
+        quadruples = PeepholeOptimizer().optimize(tacgenerator.quadruples)
+        counts = []
+        for global_numbering in (False, True):
+            numbering = ValueNumbering(global_numbering)
+            numbering.optimize(quadruples)
+            counts.append(numbering.stats['reused'])
+        print(f"{os.path.relpath(path, HERE):<32}{len(quadruples):>8}{counts[0]:>8}{counts[1]:>8}"
+              f"{numbering.stats['removed']:>9}")
@@ -0,0 +1,368 @@
+"""
+Virtual machine executing TAC quadruples.
+
+`load` translates a QuadStore once into a program for the machine:
+
+    - labels are resolved to instruction indexes and dropped (a jump goes to the
+      instruction that follows its label);
+    - every operand becomes an index into one flat register file holding the
+      temps, spill slots, variables and constants of the program (constants are
+      preloaded, variables start as the zero of their declared type, locals as 0);
+    - every quadruple becomes a (kind, operation, a, b, r) tuple, the operation of
+      a binary quadruple being taken from the `OPERATIONS` table indexed by opcode.
+
+Each function owns a contiguous region of the register file for its temps,
+spill slots, parameters and locals. A call saves the region of the called
+function (the frame of an activation still running, if any) with one slice
+copy, resets it, binds the arguments to the formal parameters and jumps to the
+function; its return restores the region and stores the returned value in the
+caller's result temp.
+
+The dispatch loop then only reads tuples and compares small ints. Values follow
+grammar G: integers and reals mix as in Python, except that the division of two
+integers truncates towards zero; relations and `and`/`or` give booleans.
+`return` in the main program stops it and gives its value (None when the
+program ends without one); a function ending without `return` gives None.
+
+Steps are counted per straight-line run (on every taken jump and at the end),
+not per instruction, so counting costs nothing in the common path.
+
+Usage:
+    python virtualMachine.py [SOURCE] [-O] [--registers K]   (runs a program, prints its result and variables)
+"""
+import operator
+
+from quadStore import (Opcode, BINARY_OPCODES, NONE, TEMP, LABEL, VAR, CONST, SPILL, LOCAL,
+                       operand_kind, operand_index)
+
+# Kinds of loaded instructions, the most frequent first.
+BINARY, COPY, IFFALSE, GOTO, IFGOTO, PARAM, CALL, RETURN = range(8)
+# Operand kinds held in the region of the function using them.
+FRAME_KINDS = (TEMP, SPILL, LOCAL)
+
+# Initial value of a variable of each type.
+ZEROS = {'integer': 0, 'real': 0.0, 'boolean': False}
+
+
+def divide(left, right):
+    """Divides two numbers, truncating towards zero when both are integers."""
+    if type(left) is int and type(right) is int:
+        quotient = left // right
+        if quotient < 0 and quotient * right != left:
+            quotient += 1
+        return quotient
+    return left / right
+
+
+def logical_and(left, right):
+    return left and right
+
+
+def logical_or(left, right):
+    return left or right
+
+
+# Operation of every binary opcode, indexed by opcode.
+OPERATIONS = [None] * len(Opcode)
+OPERATIONS[Opcode.ADD] = operator.add
+OPERATIONS[Opcode.SUB] = operator.sub
+OPERATIONS[Opcode.MUL] = operator.mul
+OPERATIONS[Opcode.DIV] = divide
+OPERATIONS[Opcode.AND] = logical_and
+OPERATIONS[Opcode.OR] = logical_or
+OPERATIONS[Opcode.LT] = operator.lt
+OPERATIONS[Opcode.LE] = operator.le
+OPERATIONS[Opcode.EQ] = operator.eq
+OPERATIONS[Opcode.NE] = operator.ne
+OPERATIONS[Opcode.GE] = operator.ge
+OPERATIONS[Opcode.GT] = operator.gt
+
+
+class VMError(Exception):
+    """Raised when a program cannot be loaded or fails while running."""
+
+
+class Function:
+    """
+    A loaded function.
+
+    Attributes:
+        entry (int): Index of its first instruction.
+        formals (list): Register file index of each parameter, in order.
+        low, high (int): Its region of the register file is registers[low:high].
+        image (list): Initial contents of its region.
+    """
+    __slots__ = ('entry', 'formals', 'low', 'high', 'image')
+
+    def __init__(self, entry, low):
+        self.entry = entry
+        self.formals = []
+        self.low = self.high = low
+        self.image = []
+
+
+class VirtualMachine:
+    """
+    Loads and runs TAC quadruples.
+
+    Attributes:
+        symbols (SymbolTable): Table the variable and constant operands refer to.
+        max_depth (int): Maximum number of active calls.
+        code (list): (kind, operation, a, b, r) tuple of each loaded instruction.
+        slots (dict): Operand handle (or (function, handle) for the operands of a function's
+            region) -> index in the register file.
+        functions (dict): FUNCTION operand handle -> Function.
+        registers (list): Register file of the last run (its initial contents before a run).
+        steps (int): Instructions executed by the last run.
+    """
+
+    def __init__(self, symbol_table, max_depth=10000):
+        self.symbols = symbol_table
+        self.max_depth = max_depth
+        self.code = []
+        self.slots = {}
+        self.functions = {}
+        self.initial = []
+        self.registers = []
+        self.steps = 0
+
+    def slot(self, function, handle):
+        """
+        Returns the register file index of an operand used in `function` (None for the main
+        program), giving it one the first time it is seen.
+        """
+        kind = operand_kind(handle)
+        key = (function, handle) if kind in FRAME_KINDS else handle
+        index = self.slots.get(key)
+        if index is None:
+            index = self.slots[key] = len(self.initial)
+            if kind == CONST:
+                self.initial.append(self.symbols.values[operand_index(handle)])
+            elif kind == VAR:
+                self.initial.append(ZEROS.get(self.symbols.lookup(operand_index(handle)), 0))
+            elif kind in FRAME_KINDS:
+                self.initial.append(0)
+            else:
+                raise VMError(f'Operand {handle} of kind {kind} does not hold a value')
+        return index
+
+    def load(self, quadruples):
+        """
+        Translates quadruples into the program of the machine.
+
+        Args:
+            quadruples (QuadStore): The quadruples to run.
+
+        Raises:
+            VMError: If a jump goes to an undefined label, a call to an undefined function or
+                with a wrong number of arguments, or an operand or opcode is invalid.
+        """
+        self.slots, self.initial, self.functions = {NONE: 0}, [None], {}
+        slot = self.slot
+
+        # Variables and constants come first, so that the slots of each function are contiguous.
+        for column in (quadruples.arg1, quadruples.arg2, quadruples.result):
+            for handle in column:
+                if operand_kind(handle) in (VAR, CONST):
+                    slot(None, handle)
+
+        # Labels and formal parameters are dropped, so they stand for the index of the next instruction kept.
+        labels, functions = {}, self.functions
+        position, function = 0, None
+        for opcode, arg1, arg2, result in quadruples:
+            if opcode == Opcode.LABEL:
+                labels[result] = position
+                continue
+            if opcode == Opcode.FUNC or opcode == Opcode.ENDFUNC:
+                if function is not None:
+                    functions[function].high = len(self.initial)
+                function = None
+                if opcode == Opcode.FUNC:
+                    function = result
+                    functions[function] = Function(position + 1, len(self.initial))
+            elif opcode == Opcode.FORMAL:
+                functions[function].formals.append(slot(function, result))
+                continue
+            for handle in (arg1, arg2, result):
+                if operand_kind(handle) in FRAME_KINDS:
+                    slot(function, handle)
+            position += 1
+        if function is not None:
+            functions[function].high = len(self.initial)
+        for function in functions.values():
+            function.image = self.initial[function.low:function.high]
+
+        def target(label):
+            if operand_kind(label) != LABEL or label not in labels:
+                raise VMError(f'Jump to undefined label {label}')
+            return labels[label]
+
+        code = []
+        function = None
+        for opcode, arg1, arg2, result in quadruples:
+            if opcode in BINARY_OPCODES:
+                code.append((BINARY, OPERATIONS[opcode], slot(function, arg1), slot(function, arg2),
+                             slot(function, result)))
+            elif opcode == Opcode.COPY:
+                code.append((COPY, None, slot(function, arg1), 0, slot(function, result)))
+            elif opcode == Opcode.IFFALSE:
+                code.append((IFFALSE, None, slot(function, arg1), target(arg2), 0))
+            elif opcode == Opcode.IFGOTO:
+                code.append((IFGOTO, None, slot(function, arg1), target(arg2), 0))
+            elif opcode == Opcode.GOTO:
+                code.append((GOTO, None, 0, target(result), 0))
+            elif opcode == Opcode.PARAM:
+                code.append((PARAM, None, slot(function, arg1), 0, 0))
+            elif opcode == Opcode.CALL:
+                callee = functions.get(arg1)
+                if callee is None:
+                    raise VMError(f'Call to undefined function {self.symbols.lexeme(operand_index(arg1))}')
+                count = self.symbols.values[operand_index(arg2)]
+                if count != len(callee.formals):
+                    raise VMError(f'Function {self.symbols.lexeme(operand_index(arg1))} takes '
+                                  f'{len(callee.formals)} arguments, not {count}')
+                code.append((CALL, callee, count, 0, slot(function, result)))
+            elif opcode == Opcode.RETURN:
+                code.append((RETURN, None, slot(function, arg1), 0, 0))
+            elif opcode == Opcode.FUNC or opcode == Opcode.ENDFUNC:
+                # Control reaching the entry of a function (from the end of the previous code) or
+                # the end of one returns None; these implicit returns are not counted as steps.
+                function = result if opcode == Opcode.FUNC else None
+                code.append((RETURN, None, 0, 1, 0))
+            elif opcode != Opcode.LABEL and opcode != Opcode.FORMAL:
+                raise VMError(f'Unknown opcode {opcode}')
+        code.append((RETURN, None, 0, 1, 0))    # Falling off the end returns None (register 0).
+        self.code = code
+        self.registers = list(self.initial)
+        return self
+
+    def run(self, max_steps=None):
+        """
+        Runs the loaded program from its first instruction with fresh registers.
+
+        Args:
+            max_steps (int): Stops with a VMError once more instructions than this have run
+                (checked on taken jumps, calls and returns, so a program may run a little past it).
+                None for no limit.
+
+        Returns:
+            The value of the `return` that ended the program, or None.
+
+        Raises:
+            VMError: On a division by zero, when `max_steps` is exceeded, or when more than
+                `max_depth` calls are active.
+        """
+        code = self.code
+        registers = self.registers = list(self.initial)
+        limit = float('inf') if max_steps is None else max_steps
+        max_depth = self.max_depth
+        arguments = []      # Values passed by `param`, not yet taken by a call.
+        frames = []         # (return index, result slot, callee, saved region) of each active call.
+        pc = start = steps = 0
+        try:
+            while True:
+                kind, operation, a, b, r = code[pc]
+                pc += 1
+                if kind == BINARY:
+                    registers[r] = operation(registers[a], registers[b])
+                elif kind == COPY:
+                    registers[r] = registers[a]
+                elif kind == IFFALSE:
+                    if not registers[a]:
+                        steps += pc - start
+                        if steps > limit:
+                            break
+                        pc = start = b
+                elif kind == GOTO:
+                    steps += pc - start
+                    if steps > limit:
+                        break
+                    pc = start = b
+                elif kind == IFGOTO:
+                    if registers[a]:
+                        steps += pc - start
+                        if steps > limit:
+                            break
+                        pc = start = b
+                elif kind == PARAM:
+                    arguments.append(registers[a])
+                elif kind == CALL:
+                    steps += pc - start
+                    if steps > limit:
+                        break
+                    if len(frames) == max_depth:
+                        raise VMError(f'More than {max_depth} active calls')
+                    low, high = operation.low, operation.high
+                    frames.append((pc, r, operation, registers[low:high]))
+                    registers[low:high] = operation.image
+                    if a:
+                        for formal, value in zip(operation.formals, arguments[-a:]):
+                            registers[formal] = value
+                        del arguments[-a:]
+                    pc = start = operation.entry
+                else:
+                    steps += pc - start - b     # b is 1 for an implicit return, which is not counted.
+                    value = registers[a]
+                    if not frames:
+                        self.steps = steps
+                        return value
+                    pc, r, callee, saved = frames.pop()
+                    registers[callee.low:callee.high] = saved
+                    registers[r] = value
+                    start = pc
+        except ZeroDivisionError:
+            self.steps = steps + pc - start
+            raise VMError(f'Division by zero at instruction {pc - 1}') from None
+        self.steps = steps
+        raise VMError(f'Program did not end within {max_steps} steps')
+
+    def execute(self, quadruples, max_steps=None):
+        """Loads and runs quadruples, returning the value of the program."""
+        return self.load(quadruples).run(max_steps)
+
+    def variables(self):
+        """Returns the value of each program variable after the last run, by name."""
+        return {self.symbols.lexeme(operand_index(handle)): self.registers[index]
+                for handle, index in self.slots.items() if type(handle) is int and operand_kind(handle) == VAR}
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from codeGenerator import TACGenerator
+    from optimizer import Optimizer
+    from parser import Parser
+    from registerAllocator import LinearScanAllocator
+
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('source', nargs='?', default='input.txt', help='source file (default: input.txt)')
+    arguments.add_argument('-O', '--optimize', action='store_true', help='optimize before running')
+    arguments.add_argument('--registers', type=int, metavar='K', help='allocate the temps onto K registers')
+    args = arguments.parse_args()
+
+    parser = Parser()
+    ast = parser.parse_file(args.source)
+    if ast is None:
+        for diagnostic in parser.diagnostics:
+            print(diagnostic)
+        sys.exit('Parsing failed, no TAC generated.')
+    optimizer = Optimizer(parser.symbol_table) if args.optimize else None
+    if optimizer:
+        optimizer.optimize_program(ast)
+    tacgenerator = TACGenerator(parser.symbol_table, copy_literals=not args.optimize)
+    tacgenerator.generate_program_quadruples(ast)
+    quadruples = tacgenerator.quadruples
+    if optimizer:
+        quadruples = optimizer.optimize_quadruples(quadruples)
+    if args.registers:
+        quadruples = LinearScanAllocator(args.registers).allocate(quadruples)
+
+    vm = VirtualMachine(parser.symbol_table)
+    try:
+        value = vm.execute(quadruples)
+    except VMError as error:
+        sys.exit(f'Runtime error: {error}')
+    print(f'returned {value} after {vm.steps} steps')
+    for name, value in vm.variables().items():
+        print(f'{name} = {value}')
@@ -0,0 +1,68 @@
+"""
+Startup benchmark for the Phase2 and Phase3 compilers.
+
+Every run starts a fresh Python process inside the phase directory and times
+the construction of `Parser`, which is what dominates short compiles:
+- default: PLY checks (or regenerates) parsetab.py in the phase directory.
+- cold:    `table_cache` points at an empty directory, so the tables are built.
+- warm:    `table_cache` points at the tables built by the cold run.
+
+Usage:
+    python bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PHASES = ('Phase2', 'Phase3')
+
+# Child process: construct one Parser and report the elapsed time in seconds.
+CHILD = '''
+import sys, time
+start = time.perf_counter()
+from parser import Parser
+Parser(table_cache=sys.argv[1] or None)
+print(time.perf_counter() - start)
+'''
+
+
+def measure(phase, table_cache):
+    """
+    Runs one child process and returns (parser startup, process wall time) in seconds.
+
+    Args:
+        phase (str): Phase directory to run in.
+        table_cache (str): Table cache root, or '' for the default PLY behavior.
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, table_cache], cwd=os.path.join(HERE, phase),
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1]), time.perf_counter() - start
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--runs', type=int, default=10, help='warm and default runs per phase (default: 10)')
+    args = arguments.parse_args()
+
+    print(f"{'phase':<8}{'mode':<9}{'parser ms':>12}{'process ms':>12}")
+    for phase in PHASES:
+        with tempfile.TemporaryDirectory() as root:
+            modes = [('default', '')] * args.runs + [('cold', root)] + [('warm', root)] * args.runs
+            samples = {}
+            for mode, table_cache in modes:
+                samples.setdefault(mode, []).append(measure(phase, table_cache))
+
+        for mode in ('default', 'cold', 'warm'):
+            parser_ms = statistics.median(sample[0] for sample in samples[mode]) * 1000
+            process_ms = statistics.median(sample[1] for sample in samples[mode]) * 1000
+            print(f'{phase:<8}{mode:<9}{parser_ms:>12.2f}{process_ms:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()